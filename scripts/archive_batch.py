@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Batched, journaled archive and merge operations.
+
+Scripts plan their archive moves and merged index.json writes into an
+ArchiveBatch first, without touching public/data, then apply the plan as one
+transaction:
+- archive destinations are public/data/_archived/<dev>/<slug>; a name that is
+  already taken (by an earlier archive or another move in the batch) gets a
+  -2, -3, ... suffix instead of failing mid-run
+- new index.json payloads are staged in .cache/archive-batch/current, and the
+  plan is journaled and fsynced there before anything changes
+- each write backs up the old file (a hard link) and renames the staged file
+  into place; each move is a single rename
+- a "commit" line ends the journal
+
+A run interrupted before the commit line is rolled back when the next batch
+is opened: moves are renamed back and replaced files restored, so public/data
+is as it was before the batch. The last committed batch is kept (journal and
+backups) in .cache/archive-batch/last and can be undone with --rollback.
+
+Usage: python scripts/archive_batch.py [--rollback]   # show the last batch, or undo it
+"""
+
+import argparse
+import os
+import shutil
+from pathlib import Path
+
+from jsonio import dumps, dumps_line, loads, same_bytes
+from manifest import default_manifest_path
+
+BATCH_VERSION = 1
+
+
+def default_batch_dir(data_dir):
+    """.cache/archive-batch, next to the pipeline manifest"""
+    return default_manifest_path(data_dir).parent / 'archive-batch'
+
+
+def rename(src, dst):
+    """Atomic rename, falling back to a copying move across filesystems"""
+    try:
+        os.rename(src, dst)
+    except OSError:
+        shutil.move(src, dst)
+
+
+def read_journal(batch_dir):
+    """(plan, committed) of a batch directory, or (None, False)"""
+    try:
+        with open(Path(batch_dir) / 'journal', 'r', encoding='utf-8') as f:
+            lines = [loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        return None, False
+    if not lines or lines[0].get('version') != BATCH_VERSION:
+        return None, False
+    return lines[0], any(line.get('commit') for line in lines[1:])
+
+
+def undo(plan, batch_dir):
+    """Undo whatever part of a plan was applied, newest operation first; returns the operations undone"""
+    undone = 0
+    for op in reversed(plan['ops']):
+        if 'move' in op:
+            src, dst = op['move']
+            if os.path.exists(dst) and not os.path.exists(src):
+                rename(dst, src)
+                undone += 1
+            continue
+        new, old = batch_dir / op['new'], op['old'] and batch_dir / op['old']
+        # Applied once the staged file was renamed into place; skipped if its project was moved since
+        if new.exists() or not os.path.isdir(os.path.dirname(op['path'])):
+            continue
+        if old and old.exists():
+            os.replace(old, op['path'])
+        elif not old and os.path.exists(op['path']):
+            os.remove(op['path'])
+        undone += 1
+    return undone
+
+
+class ArchiveBatch:
+    """Planned archive moves and index.json writes, applied as one transaction"""
+
+    def __init__(self, data_dir, state_dir=None):
+        self.data_dir = Path(data_dir)
+        self.archive_dir = self.data_dir / '_archived'
+        self.state_dir = Path(state_dir) if state_dir else default_batch_dir(data_dir)
+        self.writes = {}
+        self.moves = {}
+        self._targets = set()
+
+    @classmethod
+    def open(cls, data_dir, state_dir=None):
+        """A new, empty batch, after rolling back an interrupted one"""
+        batch = cls(data_dir, state_dir)
+        current = batch.state_dir / 'current'
+        plan, committed = read_journal(current)
+        if plan and committed:
+            batch._keep(current)
+        elif plan:
+            undone = undo(plan, current)
+            print(f"♻️  Rolled back an interrupted archive batch ({undone} of {len(plan['ops'])} operations)")
+            shutil.rmtree(current)
+        elif current.exists():
+            shutil.rmtree(current)
+        return batch
+
+    def __len__(self):
+        return len(self.writes) + len(self.moves)
+
+    def write(self, path, data):
+        """Plan writing data as path's JSON (only if the bytes change)"""
+        self.writes[str(path)] = data
+
+    def move(self, src, dst):
+        """Plan moving src to dst, or to dst-2, dst-3, ... if dst is taken; returns the destination"""
+        src, dst = str(src), Path(dst)
+        if src in self.moves:
+            return self.moves[src]
+        target, n = dst, 1
+        while target.exists() or str(target) in self._targets:
+            n += 1
+            target = dst.with_name(f"{dst.name}-{n}")
+        self.moves[src] = str(target)
+        self._targets.add(str(target))
+        return str(target)
+
+    def archive(self, project_dir):
+        """Plan archiving a project directory to _archived/<dev>/<slug>"""
+        project_dir = Path(project_dir)
+        return self.move(project_dir, self.archive_dir / project_dir.parent.parent.name / project_dir.name)
+
+    def plan_moves(self, moves):
+        """Add (src, dst) moves, e.g. deferred by pool workers (ProjectPool.run mover)"""
+        for src, dst in moves:
+            self.move(src, dst)
+
+    def apply(self):
+        """Apply every planned operation as one transaction; returns the operations applied"""
+        if not self:
+            return 0
+        current = self.state_dir / 'current'
+        if current.exists():
+            shutil.rmtree(current)
+        current.mkdir(parents=True)
+
+        # Stage new payloads and journal the plan before changing anything
+        ops = []
+        for i, (path, data) in enumerate(self.writes.items()):
+            payload = dumps(data)
+            if same_bytes(path, payload):
+                continue
+            new = current / f"{i}.new"
+            with open(new, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            ops.append({'path': path, 'new': new.name, 'old': f"{i}.old" if os.path.exists(path) else None})
+        for src, dst in self.moves.items():
+            if os.path.exists(src):
+                ops.append({'move': [src, dst]})
+        if not ops:
+            shutil.rmtree(current)
+            self.writes, self.moves, self._targets = {}, {}, set()
+            return 0
+        plan = {'version': BATCH_VERSION, 'ops': ops}
+        journal = open(current / 'journal', 'w', encoding='utf-8')
+        try:
+            journal.write(dumps_line(plan) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+        except BaseException:
+            journal.close()
+            shutil.rmtree(current)
+            raise
+
+        try:
+            for op in ops:
+                if 'move' in op:
+                    src, dst = op['move']
+                    os.makedirs(os.path.dirname(dst), exist_ok=True)
+                    rename(src, dst)
+                else:
+                    if op['old']:
+                        try:
+                            os.link(op['path'], current / op['old'])
+                        except OSError:
+                            shutil.copy2(op['path'], current / op['old'])
+                    os.replace(current / op['new'], op['path'])
+
+            journal.write(dumps_line({'commit': True}) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+        except Exception:
+            # One-step rollback: leave public/data as it was before the batch
+            journal.close()
+            undo(plan, current)
+            shutil.rmtree(current)
+            raise
+        journal.close()
+
+        self._keep(current)
+        self.writes, self.moves, self._targets = {}, {}, set()
+        return len(ops)
+
+    def _keep(self, current):
+        """Make a committed batch the one --rollback undoes"""
+        last = self.state_dir / 'last'
+        if last.exists():
+            shutil.rmtree(last)
+        os.replace(current, last)
+
+
+def rollback(data_dir, state_dir=None):
+    """Undo the last committed batch; returns the operations undone, or None if there is none"""
+    last = (Path(state_dir) if state_dir else default_batch_dir(data_dir)) / 'last'
+    plan, committed = read_journal(last)
+    if not plan or not committed:
+        return None
+    undone = undo(plan, last)
+    shutil.rmtree(last)
+    return undone
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show or undo the last archive/merge batch')
+    parser.add_argument('--rollback', action='store_true',
+                        help='undo the last batch (later edits to the files it wrote are lost)')
+    args = parser.parse_args()
+
+    data_dir = Path(__file__).resolve().parent.parent / 'public' / 'data'
+    ArchiveBatch.open(data_dir)
+    if args.rollback:
+        undone = rollback(data_dir)
+        print("ℹ️ No archive batch to roll back" if undone is None else f"↩️  Rolled back {undone} operations")
+        return
+
+    plan, _ = read_journal(default_batch_dir(data_dir) / 'last')
+    if not plan:
+        print("ℹ️ No archive batch recorded")
+        return
+    for op in plan['ops']:
+        if 'move' in op:
+            print(f"  📦 {op['move'][0]} -> {op['move'][1]}")
+        else:
+            print(f"  🔄 {op['path']}")
+    print(f"📊 {len(plan['ops'])} operations in the last batch")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark PropertyFinder matching: linear SequenceMatcher scan vs PFMatchIndex.
+
+Generates synthetic PF listings at 500, 5k and 50k titles and reports the
+match time per project for both strategies, checking they agree.
+
+Usage: python scripts/bench_pf_match.py [--queries 50] [--sizes 500,5000,50000]
+"""
+
+import argparse
+import random
+import time
+
+from pf_matcher import MATCH_THRESHOLD, PFMatchIndex, similar, slugify
+
+PREFIXES = ['', '', '', 'The ', 'Sobha ', 'Emaar ', 'DAMAC ', 'Binghatti ', 'Nakheel ']
+# Brand names are built from syllables so large catalogs stay realistically diverse
+SYLLABLES = [
+    've', 'lo', 'ra', 'zen', 'ta', 'mi', 'or', 'ca', 'sa', 'ni', 'qu', 'el', 'ar', 'is',
+    'ton', 'del', 'mar', 'ri', 'so', 'bel', 'ka', 'ly', 'an', 'ex', 'vo', 'cre', 'pal',
+]
+SUFFIXES = [
+    'Residences', 'Tower', 'Villas', 'Townhouses', 'Apartments', 'Heights', 'Gardens',
+    'Phase 2', 'at Dubai Creek Harbour', 'at The Valley', '', '',
+]
+
+
+def make_word(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+
+
+def make_title(rng):
+    words = ' '.join(make_word(rng) for _ in range(rng.randint(1, 2)))
+    return f"{rng.choice(PREFIXES)}{words} {rng.choice(SUFFIXES)}".strip()
+
+
+def make_listings(n, rng):
+    return [{'title': make_title(rng), 'startingPrice': rng.randint(800_000, 20_000_000)} for _ in range(n)]
+
+
+def make_queries(listings, n, rng):
+    """Mix of exact slug hits, near matches (typos/dropped words) and misses"""
+    queries = []
+    for i in range(n):
+        title = rng.choice(listings)['title']
+        kind = i % 3
+        if kind == 0:
+            queries.append(title)
+        elif kind == 1:
+            chars = list(title)
+            pos = rng.randrange(len(chars))
+            chars[pos] = rng.choice('aeiou')
+            queries.append(''.join(chars).replace(' Residences', ''))
+        else:
+            queries.append(make_title(rng) + ' Signature')
+    return queries
+
+
+def linear_match(project_name, pf_projects):
+    """Original O(N) scan from fix_all_issues.py, kept as the reference"""
+    if not project_name:
+        return None
+    project_name_clean = str(project_name).lower().strip()
+    best_match = None
+    best_score = 0
+    for pf in pf_projects:
+        pf_title = pf.get('title', '')
+        if slugify(pf_title) == slugify(project_name):
+            return pf
+        score = similar(project_name_clean, pf_title.lower())
+        if score > best_score and score > MATCH_THRESHOLD:
+            best_score = score
+            best_match = pf
+    return best_match
+
+
+def timed(fn, queries):
+    results = []
+    start = time.perf_counter()
+    for q in queries:
+        results.append(fn(q))
+    elapsed = time.perf_counter() - start
+    return results, elapsed / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='500,5000,50000')
+    parser.add_argument('--queries', type=int, default=30)
+    parser.add_argument('--linear-max', type=int, default=50000,
+                        help='skip the linear baseline above this many listings')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'listings':>10} {'build ms':>10} {'index ms/proj':>14} {'linear ms/proj':>15} {'speedup':>8} {'agree':>6}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        rng = random.Random(args.seed)
+        listings = make_listings(size, rng)
+        queries = make_queries(listings, args.queries, rng)
+
+        start = time.perf_counter()
+        index = PFMatchIndex(listings)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        indexed, index_ms = timed(index.match, queries)
+
+        if size <= args.linear_max:
+            linear, linear_ms = timed(lambda q: linear_match(q, listings), queries)
+            agree = sum(a is b for a, b in zip(indexed, linear))
+            print(f"{size:>10} {build_ms:>10.1f} {index_ms:>14.3f} {linear_ms:>15.3f} "
+                  f"{linear_ms / index_ms:>7.1f}x {agree:>3}/{len(queries)}")
+        else:
+            print(f"{size:>10} {build_ms:>10.1f} {index_ms:>14.3f} {'-':>15} {'-':>8} {'-':>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Benchmark the data scripts on synthetic catalogs at several sizes.
+
+For each scale (a multiple of the current catalog size, see synthetic_catalog.py)
+a synthetic tree with PF dumps is generated, then:
+1. Functions - translate_fields, standardize_project, merge_project_data,
+   fix_project_data and find_matching_pf_project run in-process over a sample
+   of the projects (PF indexes cover the whole catalog); reports projects/sec
+2. Scripts - cleanup_data.py, fix_all_issues.py, translate_files.py and
+   pipeline.py each run with --full on a fresh copy of the tree; reports
+   wall time, projects/sec and peak RSS (largest process, workers included).
+   translate_files.py only reads developer-level files, so its projects/sec
+   is per catalog project, not per file processed
+
+Results are written as JSON and compared with the previous results file, if
+any, so changes can be tracked run over run.
+
+Usage: python scripts/bench_scripts.py [--scales 1,10,100] [--workers 1] [--output PATH]
+"""
+
+import argparse
+import copy
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from cleanup_data import merge_project_data, standardize_project
+from fix_all_issues import PF_FILES, extract_pf_data, find_matching_pf_project, fix_project_data
+from jsonio import read_json, write_json
+from pf_matcher import build_match_indexes
+from synthetic_catalog import BASE_PROJECTS, generate_catalog
+from translate_files import translate_fields
+
+DEFAULT_OUTPUT = REPO_ROOT / 'report' / 'bench-scripts.json'
+
+# Script name -> path relative to the repo root
+SCRIPTS = {
+    'cleanup_data': 'scripts/cleanup_data.py',
+    'fix_all_issues': 'scripts/fix_all_issues.py',
+    'translate_files': 'translate_files.py',
+    'pipeline': 'scripts/pipeline.py',
+}
+
+
+def load_projects(data_dir):
+    """{dev: [project dict]} for every generated project"""
+    projects = {}
+    for dev in PF_FILES:
+        projects[dev] = [read_json(f) for f in sorted((data_dir / dev / 'projects').glob('*/index.json'))]
+    return projects
+
+
+def time_function(func, items):
+    """Seconds to run func over items (inputs are prepared before the clock starts)"""
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return time.perf_counter() - start
+
+
+def bench_functions(data_dir, sample, seed):
+    projects = load_projects(data_dir)
+    pf_index_map = build_match_indexes({
+        dev: extract_pf_data(data_dir / pf_file) for dev, pf_file in PF_FILES.items()
+    })
+    flat = [p for dev_projects in projects.values() for p in dev_projects]
+    if sample and len(flat) > sample:
+        flat = random.Random(seed).sample(flat, sample)
+    pairs = list(zip(flat, flat[1:]))
+
+    def translate(project):
+        try:
+            translate_fields(project)
+        except (KeyError, TypeError, AttributeError):
+            pass
+
+    def name_of(project):
+        name = project.get('projectName')
+        return (name.get('en') if isinstance(name, dict) else name) or project.get('name_en') or project['slug']
+
+    runs = {
+        'translate_fields': (translate, copy.deepcopy(flat)),
+        'standardize_project': (lambda p: standardize_project(p, p['slug']), copy.deepcopy(flat)),
+        'merge_project_data': (lambda pair: merge_project_data(*pair), copy.deepcopy(pairs)),
+        'fix_project_data': (lambda p: fix_project_data(p, pf_index_map), copy.deepcopy(flat)),
+        'find_matching_pf_project': (
+            lambda item: find_matching_pf_project(item[0], pf_index_map.get(item[1])),
+            [(name_of(p), p['developer']) for p in flat],
+        ),
+    }
+
+    results = {}
+    for name, (func, items) in runs.items():
+        seconds = time_function(func, items)
+        results[name] = {
+            'items': len(items),
+            'seconds': round(seconds, 4),
+            'perSec': round(len(items) / seconds, 1) if seconds else None,
+        }
+    return results
+
+
+# Runs a script as __main__ and records its peak RSS on exit. Measured inside the
+# child because a fork+exec child's ru_maxrss also counts the (large) benchmark parent.
+RSS_RUNNER = r"""
+import os, resource, runpy, sys
+script, out = sys.argv[1], sys.argv[2]
+sys.argv = [script] + sys.argv[3:]
+sys.path[0] = os.path.dirname(os.path.abspath(script))
+try:
+    runpy.run_path(script, run_name='__main__')
+finally:
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    try:
+        with open('/proc/self/status') as f:
+            own = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+    except (OSError, StopIteration):
+        pass
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    with open(out, 'w') as f:
+        f.write(f"{own} {children}")
+"""
+
+
+def peak_rss_mb(kib):
+    # ru_maxrss is in bytes on macOS (VmHWM and Linux ru_maxrss are KiB)
+    if sys.platform == 'darwin':
+        kib /= 1024
+    return round(kib / 1024, 1)
+
+
+def run_script(root, script, workers):
+    """Run one script with --full in root; returns (seconds, peak RSS MB, exit status)
+
+    Peak RSS is the largest single process: the script or one of its pool workers.
+    """
+    rss_file = root / '.rss'
+    cmd = [sys.executable, '-c', RSS_RUNNER, str(root / script), str(rss_file), '--full', '--workers', str(workers)]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    seconds = time.perf_counter() - start
+    if proc.returncode:
+        print(f"  ⚠️ {script} exited with {proc.returncode}:\n{proc.stderr.decode('utf-8', 'replace')[-2000:]}")
+    try:
+        rss = max(int(v) for v in rss_file.read_text().split())
+    except (OSError, ValueError):
+        rss = 0
+    return seconds, peak_rss_mb(rss), proc.returncode
+
+
+def prepare_tree(template, root):
+    """Fresh copy of the generated tree plus the scripts under test"""
+    if root.exists():
+        shutil.rmtree(root)
+    shutil.copytree(template / 'public', root / 'public')
+    shutil.copytree(REPO_ROOT / 'scripts', root / 'scripts',
+                    ignore=shutil.ignore_patterns('__pycache__', '*.ts'))
+    shutil.copy2(REPO_ROOT / 'translate_files.py', root / 'translate_files.py')
+
+
+def bench_scripts(template, work_dir, projects, scripts, workers):
+    results = {}
+    for name in scripts:
+        root = work_dir / f"run-{name}"
+        prepare_tree(template, root)
+        seconds, rss, status = run_script(root, SCRIPTS[name], workers)
+        results[name] = {
+            'projects': projects,
+            'seconds': round(seconds, 3),
+            'projectsPerSec': round(projects / seconds, 1),
+            'peakRssMB': rss,
+            'exitStatus': status,
+        }
+        shutil.rmtree(root)
+    return results
+
+
+def delta(current, previous):
+    if not previous:
+        return ''
+    return f"{(current - previous) / previous * 100:+.1f}%"
+
+
+def print_results(results, previous):
+    prev_scales = {entry['scale']: entry for entry in (previous or {}).get('scales', [])}
+    for entry in results['scales']:
+        prev = prev_scales.get(entry['scale'], {})
+        print(f"\n📊 {entry['scale']}x ({entry['projects']} projects)")
+        print(f"  {'function':<26} {'items/sec':>12} {'vs last':>9}")
+        for name, r in entry.get('functions', {}).items():
+            last = prev.get('functions', {}).get(name, {}).get('perSec')
+            print(f"  {name:<26} {r['perSec'] or 0:>12.1f} {delta(r['perSec'] or 0, last):>9}")
+        if entry.get('scripts'):
+            print(f"  {'script':<26} {'seconds':>9} {'proj/sec':>10} {'vs last':>9} {'peak RSS':>10} {'vs last':>9}")
+            for name, r in entry['scripts'].items():
+                last = prev.get('scripts', {}).get(name, {})
+                print(f"  {name:<26} {r['seconds']:>9.2f} {r['projectsPerSec']:>10.1f} "
+                      f"{delta(r['projectsPerSec'], last.get('projectsPerSec')):>9} "
+                      f"{r['peakRssMB']:>8.1f}MB {delta(r['peakRssMB'], last.get('peakRssMB')):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the data scripts on synthetic catalogs')
+    parser.add_argument('--scales', default='1,10,100',
+                        help=f'comma-separated multiples of the {BASE_PROJECTS}-project catalog')
+    parser.add_argument('--scripts', default=','.join(SCRIPTS),
+                        help='comma-separated scripts to run end to end (empty for functions only)')
+    parser.add_argument('--no-functions', action='store_true', help='skip the in-process function benchmarks')
+    parser.add_argument('--sample', type=int, default=5000,
+                        help='projects timed per function benchmark (0 = all)')
+    parser.add_argument('--workers', type=int, default=1, help='--workers passed to each script')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--work-dir', default=None, help='where to generate trees (default: a temp dir)')
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT), help='results JSON (compared with its previous contents)')
+    args = parser.parse_args()
+
+    scripts = [s for s in args.scripts.split(',') if s]
+    unknown = set(scripts) - set(SCRIPTS)
+    if unknown:
+        parser.error(f"unknown scripts: {', '.join(sorted(unknown))}")
+
+    output = Path(args.output)
+    previous = read_json(output) if output.exists() else None
+
+    results = {
+        'generatedAt': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'workers': args.workers,
+        'seed': args.seed,
+        'scales': [],
+    }
+
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix='bench-scripts-'))
+    try:
+        for scale in [float(s) for s in args.scales.split(',')]:
+            scale = int(scale) if scale.is_integer() else scale
+            template = work_dir / f"catalog-{scale}x"
+            if template.exists():
+                shutil.rmtree(template)
+            print(f"🏗️  Generating {scale}x catalog...")
+            counts = generate_catalog(template, scale, args.seed)
+            entry = {'scale': scale, 'projects': sum(counts.values())}
+
+            if not args.no_functions:
+                print(f"⏱️  Functions ({min(entry['projects'], args.sample or entry['projects'])} projects)...")
+                entry['functions'] = bench_functions(template / 'public' / 'data', args.sample, args.seed)
+            if scripts:
+                print(f"⏱️  Scripts ({', '.join(scripts)})...")
+                entry['scripts'] = bench_scripts(template, work_dir, entry['projects'], scripts, args.workers)
+
+            results['scales'].append(entry)
+            shutil.rmtree(template)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_results(results, previous)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    write_json(output, results)
+    print(f"\n✓ Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+SQLite catalog of the cleaned projects and communities, for ad-hoc queries.
+
+Loads every public/data/<dev>/projects/<slug>/index.json and
+public/data/<dev>/communities/<slug>/index.json into .cache/catalog.sqlite:
+- projects / communities: typed columns (prices as numbers, completion year,
+  coordinates) plus the full JSON document in "data"
+- project_bedrooms: one row per bedroom count, so "3 bedrooms" is an index lookup
+- indexes on developer, area, priceMin/priceMax, bedrooms and completionDate
+- projects_fts / communities_fts: FTS5 over the English and Arabic names and
+  descriptions. Arabic text is normalized before indexing and searching
+  (diacritics and tatweel removed, alef/yeh/teh marbuta/hamza forms unified)
+
+The build is incremental: each row keeps the sha256 of its file (hashed through
+the pipeline manifest's size/mtime cache), so only added or changed files are
+parsed and rows of removed files are deleted. A SCHEMA_VERSION change rebuilds
+the database.
+
+Usage: python scripts/catalog_db.py [--full] [--db PATH] [--search TEXT]
+
+Example query (Sobha, under 2M AED, 3 bedrooms, in Business Bay):
+    SELECT p.slug FROM projects p JOIN project_bedrooms b ON b.project_id = p.id
+    WHERE p.developer = 'sobha' AND p.price_min < 2000000 AND b.bedrooms = 3
+      AND p.area_en LIKE '%business bay%'
+"""
+
+import argparse
+import re
+import sqlite3
+from pathlib import Path
+
+from discovery import select_developers
+from jsonio import dumps_line, read_json
+from manifest import Manifest, add_manifest_arguments, default_manifest_path
+
+# Bump when the schema or the row extraction changes so the catalog is rebuilt
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+
+CREATE TABLE projects (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    sha256 TEXT NOT NULL,
+    developer TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    name_en TEXT,
+    name_ar TEXT,
+    area_en TEXT COLLATE NOCASE,
+    area_ar TEXT,
+    city TEXT,
+    status TEXT,
+    price_min REAL,
+    price_max REAL,
+    bedrooms_min INTEGER,
+    bedrooms_max INTEGER,
+    completion_date TEXT,
+    completion_year INTEGER,
+    lat REAL,
+    lng REAL,
+    hero_image TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX projects_developer ON projects (developer, slug);
+CREATE INDEX projects_area ON projects (area_en);
+CREATE INDEX projects_price_min ON projects (price_min);
+CREATE INDEX projects_price_max ON projects (price_max);
+CREATE INDEX projects_completion ON projects (completion_year, completion_date);
+
+CREATE TABLE project_bedrooms (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    bedrooms INTEGER NOT NULL
+);
+CREATE INDEX project_bedrooms_count ON project_bedrooms (bedrooms, project_id);
+CREATE INDEX project_bedrooms_project ON project_bedrooms (project_id);
+
+CREATE TABLE communities (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    sha256 TEXT NOT NULL,
+    developer TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    name_en TEXT,
+    name_ar TEXT,
+    district_en TEXT COLLATE NOCASE,
+    district_ar TEXT,
+    city TEXT,
+    lat REAL,
+    lng REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX communities_developer ON communities (developer, slug);
+CREATE INDEX communities_district ON communities (district_en);
+
+CREATE VIRTUAL TABLE projects_fts USING fts5 (
+    name_en, name_ar, description_en, description_ar, tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE communities_fts USING fts5 (
+    name_en, name_ar, description_en, description_ar, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Arabic normalization for indexing and search
+ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+ARABIC_LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+})
+NUMBER = re.compile(r'\d+(?:\.\d+)?')
+YEAR = re.compile(r'\b(20\d\d)\b')
+
+
+def default_db_path(data_dir):
+    """.cache/catalog.sqlite, next to the pipeline manifest"""
+    return default_manifest_path(data_dir).parent / 'catalog.sqlite'
+
+
+def normalize_arabic(text):
+    """Strip Arabic diacritics/tatweel and unify letter variants (e.g. إعمار -> اعمار)"""
+    return ARABIC_DIACRITICS.sub('', text or '').translate(ARABIC_LETTERS)
+
+
+def localized(doc, key):
+    """(en, ar) from {key: {en, ar}} or the legacy key_en / key_ar fields"""
+    value = doc.get(key)
+    if isinstance(value, dict):
+        en, ar = value.get('en'), value.get('ar')
+    elif isinstance(value, str) and value:
+        en, ar = value, None
+    else:
+        en, ar = doc.get(f"{key}_en"), doc.get(f"{key}_ar")
+    return (en if isinstance(en, str) else '') or None, (ar if isinstance(ar, str) else '') or None
+
+
+def to_number(value):
+    """Price as a number: 1500000, "1,500,000", "AED 1.5M" -> 1500000.0; None if absent"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).replace(',', '')
+    match = NUMBER.search(text)
+    if not match:
+        return None
+    number = float(match.group())
+    suffix = text[match.end():match.end() + 2].strip().lower()
+    if suffix.startswith('m'):
+        number *= 1_000_000
+    elif suffix.startswith('k'):
+        number *= 1_000
+    return number
+
+
+def bedroom_counts(value):
+    """Distinct bedroom counts from [1, "2", "3 BR", "Studio"] (studio = 0)"""
+    counts = set()
+    for item in value if isinstance(value, (list, tuple)) else [value]:
+        if isinstance(item, bool) or item is None:
+            continue
+        if isinstance(item, (int, float)):
+            counts.add(int(item))
+            continue
+        text = str(item).lower()
+        if 'studio' in text:
+            counts.add(0)
+        counts.update(int(n) for n in re.findall(r'\d+', text))
+    return sorted(counts)
+
+
+def coordinates(doc):
+    coords = doc.get('coordinates')
+    if isinstance(coords, dict):
+        try:
+            return float(coords.get('lat')), float(coords.get('lng'))
+        except (TypeError, ValueError):
+            pass
+    return None, None
+
+
+def text_value(value):
+    if isinstance(value, dict):
+        value = value.get('en')
+    return value if isinstance(value, str) and value else None
+
+
+def project_row(doc, developer, slug):
+    name_en, name_ar = localized(doc, 'projectName')
+    if not name_en and not name_ar:
+        name_en, name_ar = localized(doc, 'name')
+    area_en, area_ar = localized(doc, 'area')
+    bedrooms = bedroom_counts(doc.get('bedrooms'))
+    completion = text_value(doc.get('completionDate'))
+    year = YEAR.search(completion or '')
+    lat, lng = coordinates(doc)
+    hero = doc.get('heroImage') or doc.get('image_hero')
+    return {
+        'developer': developer,
+        'slug': slug,
+        'name_en': name_en,
+        'name_ar': name_ar,
+        'area_en': area_en,
+        'area_ar': area_ar,
+        'city': text_value(doc.get('city')),
+        'status': text_value(doc.get('status')),
+        'price_min': to_number(doc.get('priceMin')),
+        'price_max': to_number(doc.get('priceMax')),
+        'bedrooms_min': bedrooms[0] if bedrooms else None,
+        'bedrooms_max': bedrooms[-1] if bedrooms else None,
+        'completion_date': completion,
+        'completion_year': int(year.group(1)) if year else None,
+        'lat': lat,
+        'lng': lng,
+        'hero_image': hero if isinstance(hero, str) and hero else None,
+    }, bedrooms
+
+
+def community_row(doc, developer, slug):
+    name_en, name_ar = localized(doc, 'name')
+    district_en, district_ar = localized(doc, 'district')
+    city, _ = localized(doc, 'city')
+    lat, lng = coordinates(doc)
+    return {
+        'developer': developer,
+        'slug': slug,
+        'name_en': name_en,
+        'name_ar': name_ar,
+        'district_en': district_en,
+        'district_ar': district_ar,
+        'city': city,
+        'lat': lat,
+        'lng': lng,
+    }
+
+
+def fts_row(doc, row):
+    description_en, description_ar = localized(doc, 'description')
+    return (
+        row['name_en'] or '',
+        normalize_arabic(row['name_ar']),
+        description_en or '',
+        normalize_arabic(description_ar),
+    )
+
+
+def connect(path):
+    """Open the catalog, creating (or recreating, on a schema change) its tables"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA foreign_keys = ON')
+    try:
+        version = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+    except sqlite3.DatabaseError:
+        version = None
+    if version != (str(SCHEMA_VERSION),):
+        conn.close()
+        path.unlink(missing_ok=True)
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA foreign_keys = ON')
+        conn.executescript(SCHEMA)
+        conn.execute("INSERT INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+        conn.commit()
+    return conn
+
+
+def scan(data_dir, kind, developers):
+    """(developer, slug, index.json) of every document of a kind ('projects' / 'communities')"""
+    for dev in developers:
+        kind_dir = Path(data_dir) / dev / kind
+        if not kind_dir.exists():
+            continue
+        for folder in sorted(kind_dir.iterdir()):
+            index_file = folder / 'index.json'
+            if folder.is_dir() and not folder.name.startswith('_') and index_file.exists():
+                yield dev, folder.name, index_file
+
+
+def sync_table(conn, manifest, data_dir, kind, developers, full=False):
+    """Bring one table in line with the files on disk; returns (upserted, deleted)"""
+    table, fts = kind, f"{kind}_fts"
+    make_row = project_row if kind == 'projects' else community_row
+    existing = {path: (row_id, sha) for row_id, path, sha in conn.execute(f"SELECT id, path, sha256 FROM {table}")}
+
+    upserted = 0
+    seen = set()
+    for dev, slug, index_file in scan(data_dir, kind, developers):
+        key = manifest.key(index_file)
+        seen.add(key)
+        digest = manifest.file_hash(index_file)
+        old = existing.get(key)
+        if old and old[1] == digest and not full:
+            continue
+        try:
+            doc = read_json(index_file)
+        except Exception as e:
+            print(f"  ⚠️ Catalog skipped: {key}: {e}")
+            continue
+        if not isinstance(doc, dict):
+            continue
+
+        if kind == 'projects':
+            row, bedrooms = make_row(doc, dev, slug)
+        else:
+            row, bedrooms = make_row(doc, dev, slug), []
+        if old:
+            conn.execute(f"DELETE FROM {table} WHERE id = ?", (old[0],))
+            conn.execute(f"DELETE FROM {fts} WHERE rowid = ?", (old[0],))
+        columns = ['path', 'sha256', *row, 'data']
+        values = [key, digest, *row.values(), dumps_line(doc)]
+        cursor = conn.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", values)
+        row_id = cursor.lastrowid
+        conn.executemany("INSERT INTO project_bedrooms VALUES (?, ?)", [(row_id, n) for n in bedrooms])
+        conn.execute(f"INSERT INTO {fts} (rowid, name_en, name_ar, description_en, description_ar) "
+                     f"VALUES (?, ?, ?, ?, ?)", (row_id, *fts_row(doc, row)))
+        upserted += 1
+
+    # Rows of removed (archived / merged) documents of the scanned developers
+    deleted = 0
+    prefixes = tuple(f"{dev}/{kind}/" for dev in developers)
+    for key, (row_id, _) in existing.items():
+        if key not in seen and key.startswith(prefixes):
+            conn.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+            conn.execute(f"DELETE FROM {fts} WHERE rowid = ?", (row_id,))
+            deleted += 1
+    return upserted, deleted
+
+
+def build_catalog(data_dir, manifest, db_path=None, developers=None, full=False):
+    """Sync projects and communities into the catalog; returns {kind: (upserted, deleted)}"""
+    developers = select_developers(data_dir, developers)
+    conn = connect(db_path or default_db_path(data_dir))
+    try:
+        with conn:
+            counts = {kind: sync_table(conn, manifest, data_dir, kind, developers, full)
+                      for kind in ('projects', 'communities')}
+        if any(sum(c) for c in counts.values()):
+            conn.execute("INSERT INTO projects_fts (projects_fts) VALUES ('optimize')")
+            conn.execute("INSERT INTO communities_fts (communities_fts) VALUES ('optimize')")
+            conn.commit()
+    finally:
+        conn.close()
+    return counts
+
+
+def fts_query(text):
+    """FTS5 query for free text: each normalized word as a prefix term, all required"""
+    words = re.findall(r'\w+', normalize_arabic(text).lower())
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search(conn, text, kind='projects', limit=20):
+    """(developer, slug, name_en, name_ar) of the best FTS matches for text in either language"""
+    query = fts_query(text)
+    if not query:
+        return []
+    return conn.execute(
+        f"SELECT t.developer, t.slug, t.name_en, t.name_ar FROM {kind}_fts f "
+        f"JOIN {kind} t ON t.id = f.rowid WHERE {kind}_fts MATCH ? ORDER BY rank LIMIT ?",
+        (query, limit),
+    ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the SQLite catalog of projects and communities')
+    parser.add_argument('--db', default=None, help='catalog path (default: .cache/catalog.sqlite)')
+    parser.add_argument('--developers', default=None,
+                        help='comma-separated developers to sync')
+    parser.add_argument('--search', default=None, metavar='TEXT',
+                        help='after syncing, print projects matching TEXT (English or Arabic)')
+    add_manifest_arguments(parser)
+    args = parser.parse_args()
+
+    data_dir = Path(__file__).resolve().parent.parent / 'public' / 'data'
+    manifest = Manifest.load(data_dir, args.manifest)
+    db_path = Path(args.db) if args.db else default_db_path(data_dir)
+    developers = select_developers(data_dir, args.developers)
+
+    print(f"🗄️  Syncing catalog {db_path}...")
+    counts = build_catalog(data_dir, manifest, db_path, developers, args.full)
+    manifest.save()
+    for kind, (upserted, deleted) in counts.items():
+        print(f"  {kind}: {upserted} updated, {deleted} removed")
+
+    if args.search:
+        conn = sqlite3.connect(db_path)
+        try:
+            print(f"\n🔍 {args.search}")
+            for dev, slug, name_en, name_ar in search(conn, args.search):
+                print(f"  {dev}/{slug}: {name_en or ''} {name_ar or ''}".rstrip())
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Checkpoint journal for resumable runs of the data scripts.
+
+An append-only JSON-lines file next to the manifest records, in order:
+- the run header (script, transform version, input hashes)
+- each finished project ("done")
+
+If a run is interrupted, the next run skips the projects already done, so it
+ends in the same state as an uninterrupted run. A journal whose header no
+longer matches (new PF dump, new version) is started over. Archive moves are
+not journaled here: they go through an archive_batch.ArchiveBatch, and a
+project is marked done only once its batch is applied. The journal is deleted
+when a run completes.
+"""
+
+import os
+from pathlib import Path
+
+from jsonio import dumps_line, loads
+from manifest import default_manifest_path
+
+
+def default_journal_path(data_dir, name):
+    """.cache/<name>.journal, next to the pipeline manifest"""
+    return default_manifest_path(data_dir).parent / f"{name}.journal"
+
+
+def read_entries(path):
+    """Journal entries, ignoring a torn last line from a crash mid-write"""
+    entries = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(loads(line))
+                except ValueError:
+                    break
+    except OSError:
+        pass
+    return entries
+
+
+class CheckpointJournal:
+    """Progress journal for one script run"""
+
+    def __init__(self, path, header):
+        self.path = Path(path)
+        self.header = header
+        self.done = {}
+        self.resumed = False
+        self._file = None
+
+    @classmethod
+    def open(cls, path, header, restart=False):
+        """Open the journal, loading progress if header matches"""
+        journal = cls(path, header)
+        entries = read_entries(journal.path)
+
+        for entry in entries:
+            if 'done' in entry:
+                journal.done[entry['done']] = entry.get('valid', True)
+
+        journal.resumed = bool(entries) and not restart and entries[0].get('run') == header
+        if not journal.resumed:
+            journal.done = {}
+
+        journal.path.parent.mkdir(parents=True, exist_ok=True)
+        journal._file = open(journal.path, 'a' if journal.resumed else 'w', encoding='utf-8')
+        if not journal.resumed:
+            journal._append({'run': header})
+            journal.flush()
+        return journal
+
+    def _append(self, entry):
+        self._file.write(dumps_line(entry) + '\n')
+
+    def flush(self):
+        """Make everything journaled so far durable"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def is_done(self, key):
+        return key in self.done
+
+    def mark_done(self, key, valid=True):
+        """Record a finished project (durable at the next flush)"""
+        self.done[key] = valid
+        self._append({'done': key, 'valid': valid})
+
+    def close(self):
+        if self._file:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def complete(self):
+        """Run finished: drop the journal"""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def add_checkpoint_arguments(parser):
+    """Add the --restart / --checkpoint-every / --time-limit options"""
+    parser.add_argument('--restart', action='store_true',
+                        help='ignore the progress of an interrupted run')
+    parser.add_argument('--checkpoint-every', type=int, default=200,
+                        help='projects per batch between checkpoints')
+    parser.add_argument('--time-limit', type=float, default=None, metavar='SECONDS',
+                        help='stop at the first checkpoint after this long; rerun to resume')
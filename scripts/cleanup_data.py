@@ -2,27 +2,39 @@
 """
 Comprehensive cleanup and standardization script
 1. Remove invalid projects (projects, communities, test)
-2. Merge duplicates
+2. Merge duplicates (EXACT_DUPLICATES plus approved near_duplicates.py suggestions)
 3. Fix 3D tour links
 4. Standardize field names
-5. Remove duplicate images
+5. Remove duplicate images (and images link_checker.py found dead)
 6. Ensure hero is unique
+
+Steps 1 and 2 are planned first and applied as one journaled transaction
+(archive_batch.py): archive name conflicts get a suffix, and an interrupted
+run is rolled back by the next one.
 """
 
-import json
+import argparse
 import os
-import shutil
 from pathlib import Path
 from difflib import SequenceMatcher
 
+from archive_batch import ArchiveBatch
+from discovery import select_developers
+from facet_index import update_facets
+from jsonio import read_json, write_json
+from link_checker import dead_links_version, load_dead_urls
+from manifest import Manifest, add_manifest_arguments
+from near_duplicates import approved_merges
+import profiling
+from profiling import add_profile_arguments
+from project_pool import ProjectPool, add_pool_arguments
+
 def similar(a, b):
     if not a or not b:
         return 0
     return SequenceMatcher(None, str(a).lower().strip(), str(b).lower().strip()).ratio()
 
 base_dir = Path('public/data')
-archive_dir = base_dir / '_archived'
-archive_dir.mkdir(exist_ok=True)
 
 # Invalid project names to remove
 INVALID_NAMES = ['projects', 'communities', 'test', 'unknown', 'n/a']
@@ -35,7 +47,19 @@ INVALID_TOUR_URLS = [
     'http://sobha.cloud',
 ]
 
+# URLs the link checker found dead (404/410); installed per worker by set_dead_urls
+DEAD_URLS = frozenset()
+
+def set_dead_urls(urls):
+    global DEAD_URLS
+    DEAD_URLS = frozenset(urls)
+
+def standardize_deps():
+    """Manifest deps of the standardize stage: the dead-URL set, when there is one"""
+    return {'dead_links': dead_links_version(DEAD_URLS)} if DEAD_URLS else {}
+
 # Duplicate mapping: keep first, archive rest
+# Hand-reviewed; new duplicates come from near_duplicates.py suggestions
 EXACT_DUPLICATES = {
     # Sobha
     'sobha': {
@@ -47,9 +71,7 @@ EXACT_DUPLICATES = {
         'creek-vistas-grande': 'creek-vistas',  # Keep creek-vistas
         'creek-vistas-reserve': 'creek-vistas',  # Keep creek-vistas
         'skyscape-aura': 'aura',  # Keep aura
-        'skyvue-spectra': 'skyvue',  # Keep skyvue (main)
-        'skyvue-solair': 'skyvue',  # These are phases, not duplicates - KEEP BOTH
-        'skyvue-stellar': 'skyvue',  # These are phases, not duplicates - KEEP BOTH
+        # skyvue-spectra/solair/stellar are phases of skyvue, not duplicates
     },
     # Emaar
     'emaar': {
@@ -90,16 +112,8 @@ EXACT_DUPLICATES = {
     }
 }
 
-# Actually remove skyvue variants from duplicates (they are phases)
-# and sobha creek-vistas variants
-for dev in ['sobha']:
-    if dev in EXACT_DUPLICATES:
-        # Remove these - they are different phases
-        for key in ['skyvue-solair', 'skyvue-stellar', 'skyvue-spectra']:
-            if key in EXACT_DUPLICATES[dev]:
-                del EXACT_DUPLICATES[dev][key]
-
-developers = ['emaar', 'damac', 'sobha', 'nakheel', 'binghatti']
+# Bump when standardize_project changes so incremental runs reprocess every project
+STANDARDIZE_VERSION = 1
 
 def merge_project_data(main_data, dup_data):
     """Merge data from duplicate into main, preferring non-empty values"""
@@ -136,6 +150,18 @@ def standardize_project(project_data, slug):
         project_data.get('image_hero', None)
     )
     
+    # Drop images the link checker found dead
+    if gallery and DEAD_URLS:
+        live = [img for img in gallery if img not in DEAD_URLS]
+        if len(live) != len(gallery):
+            project_data['images_gallery'] = live
+            changes.append('removed_dead_images')
+            gallery = live
+    if hero and hero in DEAD_URLS:
+        project_data.pop('image_hero', None)
+        changes.append('removed_dead_hero')
+        hero = None
+    
     if gallery:
         # Remove duplicates while preserving order
         seen = set()
@@ -165,7 +191,10 @@ def standardize_project(project_data, slug):
     if tour_url:
         tour_clean = tour_url.strip().rstrip('/')
         # Check if it's just the base URL
-        is_invalid = any(tour_clean == inv.rstrip('/') for inv in INVALID_TOUR_URLS)
+        is_invalid = (
+            any(tour_clean == inv.rstrip('/') for inv in INVALID_TOUR_URLS)
+            or tour_url.strip() in DEAD_URLS
+        )
         if is_invalid:
             # Remove invalid tour URLs
             project_data.pop('tour_3d_url', None)
@@ -191,39 +220,70 @@ def standardize_project(project_data, slug):
     
     return project_data, changes
 
-def process_developer(dev):
-    """Process a single developer"""
-    projects_dir = base_dir / dev / 'projects'
-    dev_archive_dir = archive_dir / dev
-    dev_archive_dir.mkdir(exist_ok=True)
-    
-    if not projects_dir.exists():
-        return 0, 0, 0
+def remove_invalid(dev, projects_dir, batch, select=None):
+    """Plan archiving projects with placeholder names; returns the number planned
     
+    select, if given, limits the run to the slugs it accepts (e.g. one --shard).
+    """
     removed = 0
-    merged = 0
-    standardized = 0
-    
-    # Get list of project directories
-    project_dirs = [d for d in projects_dir.iterdir() if d.is_dir() and not d.name.startswith('_')]
-    
-    # First pass: remove invalid names
-    for proj_dir in project_dirs[:]:  # Copy list to allow modification
+    project_dirs = [
+        d for d in sorted(projects_dir.iterdir())
+        if d.is_dir() and not d.name.startswith('_') and (select is None or select(d.name))
+    ]
+    for proj_dir in project_dirs:
         slug = proj_dir.name.lower()
         
         if slug in INVALID_NAMES:
             print(f"  ❌ Removing invalid: {dev}/{slug}")
-            shutil.move(str(proj_dir), str(dev_archive_dir / proj_dir.name))
-            project_dirs.remove(proj_dir)
+            batch.archive(proj_dir)
             removed += 1
+    return removed
+
+def duplicate_map(dev):
+    """{duplicate slug: main slug}: approved suggestions, overridden by EXACT_DUPLICATES
     
-    # Second pass: merge duplicates
-    duplicates_for_dev = EXACT_DUPLICATES.get(dev, {})
-    for dup_slug, main_slug in duplicates_for_dev.items():
+    An approved pair that reverses an exact entry, or closes a cycle with the
+    pairs before it, is dropped with a warning: merge_root would stop inside
+    the cycle and every project on it would be archived.
+    """
+    exact = EXACT_DUPLICATES.get(dev, {})
+    graph = dict(exact)
+    approved = {}
+    for dup_slug, main_slug in approved_merges(dev).items():
+        if dup_slug in exact:
+            continue
+        if merge_root(graph, main_slug) == dup_slug:
+            print(f"  ⚠️ Ignoring approved merge {dev}/{dup_slug} -> {dev}/{main_slug}: "
+                  f"{dev}/{main_slug} already merges into {dev}/{dup_slug}")
+            continue
+        graph[dup_slug] = approved[dup_slug] = main_slug
+    approved.update(exact)
+    return approved
+
+def merge_root(merges, slug):
+    """The project slug ends up merged into, following chained duplicates"""
+    seen = {slug}
+    while slug in merges and merges[slug] not in seen:
+        slug = merges[slug]
+        seen.add(slug)
+    return slug
+
+def plan_merges(dev, projects_dir, batch, select=None):
+    """Plan merging the listed duplicates into their main projects
+    
+    Each main's merged index.json is planned as a batch write and each
+    duplicate directory as a batch archive; returns the number of duplicates.
+    select, as for remove_invalid, is applied to the duplicates.
+    """
+    merged = 0
+    
+    for dup_slug, main_slug in duplicate_map(dev).items():
+        if select is not None and not select(dup_slug):
+            continue
         dup_dir = projects_dir / dup_slug
         main_dir = projects_dir / main_slug
         
-        if not dup_dir.exists():
+        if str(dup_dir) in batch.moves or not dup_dir.exists():
             continue
         
         dup_index = dup_dir / 'index.json'
@@ -232,76 +292,133 @@ def process_developer(dev):
         if not dup_index.exists():
             continue
         
-        # Load duplicate data
-        try:
-            with open(dup_index, 'r') as f:
-                dup_data = json.load(f)
-        except:
-            continue
+        # Load duplicate data (including anything already merged into it)
+        if str(dup_index) in batch.writes:
+            dup_data = batch.writes[str(dup_index)]
+        else:
+            try:
+                dup_data = read_json(dup_index)
+            except:
+                continue
         
-        # If main exists, merge data
-        if main_index.exists():
+        # If main exists (and is not itself being archived), merge data
+        if str(main_dir) not in batch.moves and main_index.exists():
             try:
-                with open(main_index, 'r') as f:
-                    main_data = json.load(f)
+                main_data = batch.writes.get(str(main_index)) or read_json(main_index)
                 
-                # Merge data
-                merged_data = merge_project_data(main_data, dup_data)
-                
-                with open(main_index, 'w') as f:
-                    json.dump(merged_data, f, ensure_ascii=False, indent=2)
+                profiling.set_project(dev, main_slug)
+                with profiling.stage('merge_project_data'):
+                    batch.write(main_index, merge_project_data(main_data, dup_data))
                 
                 print(f"  🔄 Merged {dev}/{dup_slug} -> {dev}/{main_slug}")
             except Exception as e:
                 print(f"  ⚠️ Error merging: {e}")
         
-        # Archive duplicate
-        shutil.move(str(dup_dir), str(dev_archive_dir / dup_dir.name))
+        batch.archive(dup_dir)
         merged += 1
     
+    return merged
+
+def standardize_file(index_file):
+    """Standardize one project's index.json in place; returns the changes, or [] if the file was left untouched"""
+    dev = index_file.parent.parent.parent.name
+    profiling.set_project(dev, index_file.parent.name)
+    with profiling.stage('load'):
+        data = read_json(index_file)
+    
+    with profiling.stage('standardize_project'):
+        data, changes = standardize_project(data, index_file.parent.name)
+    
+    if not changes:
+        return []
+    with profiling.stage('write'):
+        written = write_json(index_file, data)
+    if not written:
+        return []
+    if 'removed_invalid_tour' in changes:
+        print(f"  🎮 Fixed tour: {dev}/{index_file.parent.name}")
+    return changes
+
+def process_developer(dev, pool, manifest, batch, full=False):
+    """Process a single developer"""
+    projects_dir = base_dir / dev / 'projects'
+    
+    if not projects_dir.exists():
+        return 0, 0, 0, 0
+    
+    standardized = 0
+    skipped = 0
+    
+    # First and second pass: plan removing invalid names and merging duplicates,
+    # then apply both as one transaction (see archive_batch.py)
+    removed = remove_invalid(dev, projects_dir, batch)
+    merged = plan_merges(dev, projects_dir, batch)
+    batch.apply()
+    
     # Third pass: standardize all remaining projects
-    for proj_dir in projects_dir.iterdir():
-        if not proj_dir.is_dir() or proj_dir.name.startswith('_'):
-            continue
-        
-        index_file = proj_dir / 'index.json'
-        if not index_file.exists():
+    index_files = [
+        proj_dir / 'index.json'
+        for proj_dir in sorted(projects_dir.iterdir())
+        if proj_dir.is_dir() and not proj_dir.name.startswith('_') and (proj_dir / 'index.json').exists()
+    ]
+    if not full:
+        pending = [f for f in index_files if not manifest.is_current('standardize', f, STANDARDIZE_VERSION, standardize_deps())]
+        skipped = len(index_files) - len(pending)
+        index_files = pending
+    
+    for result in pool.run(standardize_file, index_files):
+        if result.error:
+            print(f"  ⚠️ Error: {dev}/{result.item.parent.name}: {result.error}")
             continue
-        
-        try:
-            with open(index_file, 'r') as f:
-                data = json.load(f)
-            
-            data, changes = standardize_project(data, proj_dir.name)
-            
-            if changes:
-                with open(index_file, 'w') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                standardized += 1
-                if 'removed_invalid_tour' in changes:
-                    print(f"  🎮 Fixed tour: {dev}/{proj_dir.name}")
-        except Exception as e:
-            print(f"  ⚠️ Error: {dev}/{proj_dir.name}: {e}")
+        manifest.record('standardize', result.item, STANDARDIZE_VERSION, standardize_deps())
+        if result.value:
+            standardized += 1
     
-    return removed, merged, standardized
+    return removed, merged, standardized, skipped
 
-# Process all developers
-print("=" * 70)
-print("🧹 Comprehensive Data Cleanup")
-print("=" * 70)
-
-total_removed = 0
-total_merged = 0
-total_standardized = 0
-
-for dev in developers:
-    print(f"\n📁 Processing {dev}...")
-    removed, merged, standardized = process_developer(dev)
-    total_removed += removed
-    total_merged += merged
-    total_standardized += standardized
-    print(f"   Removed: {removed}, Merged: {merged}, Standardized: {standardized}")
+def main():
+    parser = argparse.ArgumentParser(description='Comprehensive data cleanup and standardization')
+    add_pool_arguments(parser)
+    add_manifest_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args)
+    
+    batch = ArchiveBatch.open(base_dir)
+    manifest = Manifest.load(base_dir, args.manifest)
+    # Results of the last link_checker.py run, if any
+    set_dead_urls(load_dead_urls(base_dir))
+    
+    print("=" * 70)
+    print("🧹 Comprehensive Data Cleanup")
+    print("=" * 70)
+    if DEAD_URLS:
+        print(f"🔗 {len(DEAD_URLS)} dead URLs from the link checker will be dropped")
+    
+    total_removed = 0
+    total_merged = 0
+    total_standardized = 0
+    total_skipped = 0
+    
+    with ProjectPool(args.workers, args.chunksize, initializer=set_dead_urls, initargs=(DEAD_URLS,)) as pool:
+        for dev in select_developers(base_dir):
+            print(f"\n📁 Processing {dev}...")
+            removed, merged, standardized, skipped = process_developer(dev, pool, manifest, batch, args.full)
+            total_removed += removed
+            total_merged += merged
+            total_standardized += standardized
+            total_skipped += skipped
+            print(f"   Removed: {removed}, Merged: {merged}, Standardized: {standardized}, Skipped (unchanged): {skipped}")
+    
+    facets_updated, facets_removed = update_facets(base_dir, manifest)
+    manifest.save()
+    
+    print("\n" + "=" * 70)
+    print(f"📊 Total: Removed {total_removed}, Merged {total_merged}, Standardized {total_standardized}, Skipped (unchanged) {total_skipped}")
+    print(f"   Facet counts: {facets_updated} projects updated, {facets_removed} removed")
+    print("=" * 70)
+    
+    profiling.finish(args)
 
-print("\n" + "=" * 70)
-print(f"📊 Total: Removed {total_removed}, Merged {total_merged}, Standardized {total_standardized}")
-print("=" * 70)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Developer discovery and project sharding for the data scripts.
+
+Developers are not listed in code: every folder under public/data that holds
+projects/ or communities/ (and does not start with "_" or ".") is one, so a
+new developer is picked up by adding its folder. Scripts take --developers to
+narrow the set and default to every discovered developer, in name order.
+
+--shard i/N (1 <= i <= N) splits the projects across N runs, e.g. on several
+machines: a project belongs to shard i when a stable hash (blake2b) of its
+"<developer>/<slug>" key is i - 1 modulo N. The hash does not depend on the
+machine, the Python version or the other projects, so every run agrees on
+the partition, and a project only moves between shards when N changes.
+(pipeline.py hashes a listed duplicate under the slug it merges into, so both
+land in the same shard.)
+"""
+
+import argparse
+import hashlib
+from collections import namedtuple
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'public' / 'data'
+
+
+def discover_developers(data_dir=DATA_DIR):
+    """Developer folders under data_dir, sorted by name"""
+    try:
+        folders = sorted(Path(data_dir).iterdir())
+    except OSError:
+        return []
+    return [
+        folder.name for folder in folders
+        if folder.is_dir() and not folder.name.startswith(('_', '.'))
+        and ((folder / 'projects').is_dir() or (folder / 'communities').is_dir())
+    ]
+
+
+def select_developers(data_dir=DATA_DIR, developers=None):
+    """developers as given (a list, or a comma-separated --developers value), else every discovered developer"""
+    if developers is None:
+        return discover_developers(data_dir)
+    if isinstance(developers, str):
+        return [dev for dev in developers.split(',') if dev]
+    return list(developers)
+
+
+def shard_hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class Shard(namedtuple('Shard', ['index', 'count'])):
+    """Shard index of count (1-based, as written on the command line)"""
+
+    def contains(self, key):
+        return shard_hash(key) % self.count == self.index - 1
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+
+def parse_shard(text):
+    """Shard from "i/N" (argparse type)"""
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {text!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {text} out of range (1 <= i <= N)")
+    return Shard(index, count)
+
+
+def add_shard_arguments(parser):
+    """Add the --shard option"""
+    parser.add_argument('--shard', type=parse_shard, default=None, metavar='i/N',
+                        help='process only shard i of N (projects partitioned by a stable hash)')
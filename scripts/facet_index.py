@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Facet counts for the filter panels, maintained by deltas.
+
+public/data/facets.json holds, for every facet (developer, area, bedrooms,
+price bucket, status, completion year), the number of projects per value.
+Statuses are counted in the app's form (under_construction, completed, ...),
+whatever their case in the project files. Like the listing shards, the file
+is generated and not committed.
+
+The counts are not recomputed from scratch: .cache/facet-state.json keeps each
+project's contribution (its facet values and the sha256 of its index.json).
+A sync compares the current file hashes (through the manifest's size/mtime
+cache) with the stored ones and, for each project that was added, changed,
+merged away or archived since, subtracts its old contribution and adds the
+new one. cleanup_data.py, fix_all_issues.py and the pipeline's facets stage
+sync after they run, so only the projects they touched are re-read.
+
+Usage: python scripts/facet_index.py [--full]
+"""
+
+import argparse
+import hashlib
+import re
+from collections import Counter
+from pathlib import Path
+
+from catalog_db import YEAR, bedroom_counts, localized, text_value, to_number
+from discovery import select_developers
+from jsonio import dumps, read_json, write_cache, write_json
+from manifest import Manifest, add_manifest_arguments, default_manifest_path
+
+# Bump when facet_values changes so the state is rebuilt
+FACET_VERSION = 2
+
+FACETS = ('developer', 'area', 'bedrooms', 'price', 'status', 'completionYear')
+
+# (upper bound in AED, bucket) on priceMin; the last bucket is open-ended
+PRICE_BUCKETS = [
+    (1_000_000, 'under-1m'),
+    (2_000_000, '1m-2m'),
+    (5_000_000, '2m-5m'),
+    (10_000_000, '5m-10m'),
+    (None, '10m-plus'),
+]
+
+
+# Spaces and hyphens in status values ("Under Construction", "under-construction")
+STATUS_SEPARATORS = re.compile(r'[\s\-]+')
+
+
+def default_state_path(data_dir):
+    """.cache/facet-state.json, next to the pipeline manifest"""
+    return default_manifest_path(data_dir).parent / 'facet-state.json'
+
+
+def facets_path(data_dir):
+    return Path(data_dir) / 'facets.json'
+
+
+def price_bucket(value):
+    price = to_number(value)
+    if price is None or price <= 0:
+        return None
+    for bound, bucket in PRICE_BUCKETS:
+        if bound is None or price < bound:
+            return bucket
+
+
+def status_value(text):
+    """Status in the app's form: lowercase, words joined by "_" ("Under Construction" -> under_construction)"""
+    return STATUS_SEPARATORS.sub('_', text.strip().lower()) if text and text.strip() else None
+
+
+def facet_values(project, developer):
+    """{facet: [values]} contributed by one project (bedrooms may have several)"""
+    area, _ = localized(project, 'area')
+    completion = YEAR.search(text_value(project.get('completionDate')) or '')
+    status = status_value(text_value(project.get('status')))
+    bucket = price_bucket(project.get('priceMin'))
+    values = {
+        'developer': [developer],
+        'area': [area.strip()] if area and area.strip() else [],
+        'bedrooms': [str(n) for n in bedroom_counts(project.get('bedrooms'))],
+        'price': [bucket] if bucket else [],
+        'status': [status] if status else [],
+        'completionYear': [completion.group(1)] if completion else [],
+    }
+    return {facet: found for facet, found in values.items() if found}
+
+
+class FacetIndex:
+    """Facet counts plus the per-project contributions they were built from"""
+
+    def __init__(self, path, projects=None, counts=None):
+        self.path = Path(path)
+        self.projects = projects or {}
+        self.counts = {facet: Counter((counts or {}).get(facet, {})) for facet in FACETS}
+
+    @classmethod
+    def load(cls, data_dir, path=None):
+        path = Path(path) if path else default_state_path(data_dir)
+        try:
+            state = read_json(path)
+            if state.get('version') == FACET_VERSION:
+                return cls(path, state.get('projects'), state.get('counts'))
+        except (OSError, ValueError):
+            pass
+        return cls(path)
+
+    def _add(self, values, sign):
+        for facet, found in values.items():
+            counter = self.counts[facet]
+            for value in found:
+                counter[value] += sign
+                if counter[value] <= 0:
+                    del counter[value]
+
+    def apply(self, key, digest, values):
+        """Replace a project's contribution"""
+        old = self.projects.get(key)
+        if old:
+            self._add(old['values'], -1)
+        self._add(values, 1)
+        self.projects[key] = {'sha256': digest, 'values': values}
+
+    def remove(self, key):
+        old = self.projects.pop(key, None)
+        if old:
+            self._add(old['values'], -1)
+
+    def sync(self, data_dir, manifest, developers=None):
+        """Apply the deltas of added, changed and removed projects; returns (updated, removed)"""
+        developers = select_developers(data_dir, developers)
+        seen = set()
+        updated = 0
+        for dev in developers:
+            projects_dir = Path(data_dir) / dev / 'projects'
+            if not projects_dir.exists():
+                continue
+            for folder in sorted(projects_dir.iterdir()):
+                index_file = folder / 'index.json'
+                if not folder.is_dir() or folder.name.startswith('_') or not index_file.exists():
+                    continue
+                key = manifest.key(index_file)
+                seen.add(key)
+                digest = manifest.file_hash(index_file)
+                old = self.projects.get(key)
+                if old and old['sha256'] == digest:
+                    continue
+                try:
+                    project = read_json(index_file)
+                except Exception as e:
+                    print(f"  ⚠️ Facets skipped: {key}: {e}")
+                    continue
+                self.apply(key, digest, facet_values(project, dev))
+                updated += 1
+
+        prefixes = tuple(f"{dev}/projects/" for dev in developers)
+        gone = [key for key in self.projects if key.startswith(prefixes) and key not in seen]
+        for key in gone:
+            self.remove(key)
+        return updated, len(gone)
+
+    def document(self):
+        """The published facets.json document"""
+        facets = {
+            facet: dict(sorted(self.counts[facet].items(), key=lambda item: (-item[1], item[0])))
+            for facet in FACETS
+        }
+        return {
+            'version': hashlib.sha256(dumps(facets)).hexdigest()[:16],
+            'projects': len(self.projects),
+            'facets': facets,
+        }
+
+    def save(self, data_dir):
+        """Write the state and publish facets.json (only if its counts changed)"""
+        write_cache(self.path, {
+            'version': FACET_VERSION,
+            'counts': {facet: dict(counter) for facet, counter in self.counts.items()},
+            'projects': self.projects,
+        })
+        return write_json(facets_path(data_dir), self.document())
+
+
+def update_facets(data_dir, manifest, developers=None, full=False):
+    """Sync the facet counts with the project files and publish them; returns (updated, removed)"""
+    developers = select_developers(data_dir, developers)
+    facets = FacetIndex.load(data_dir)
+    if full:
+        prefixes = tuple(f"{dev}/projects/" for dev in developers)
+        for key in [key for key in facets.projects if key.startswith(prefixes)]:
+            facets.remove(key)
+    updated, removed = facets.sync(data_dir, manifest, developers)
+    if full or updated or removed or not facets_path(data_dir).exists():
+        facets.save(data_dir)
+    return updated, removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Update the facet counts used by the filter panels')
+    parser.add_argument('--developers', default=None,
+                        help='comma-separated developers to sync')
+    add_manifest_arguments(parser)
+    args = parser.parse_args()
+
+    data_dir = Path(__file__).resolve().parent.parent / 'public' / 'data'
+    manifest = Manifest.load(data_dir, args.manifest)
+    developers = select_developers(data_dir, args.developers)
+
+    updated, removed = update_facets(data_dir, manifest, developers, args.full)
+    manifest.save()
+    print(f"📊 Facets: {updated} projects updated, {removed} removed")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,109 +6,111 @@ Comprehensive fix script for Imperium Gate:
 3. Enrich with PropertyFinder data
 4. Clean duplicate gallery images
 5. Fix mixed language issues
+
+Progress is journaled (see checkpoint.py): an interrupted or --time-limit run
+resumes where it stopped when run again. Archive moves are applied at each
+checkpoint as one transaction (see archive_batch.py). PropertyFinder dumps are parsed only
+for the developers being processed, and reused from .cache/pf-snapshots while
+unchanged (see pf_snapshot.py).
 """
 
-import re
-import json
+import argparse
 import os
-import shutil
+import sys
+import time
 from pathlib import Path
-from difflib import SequenceMatcher
 
-def similar(a, b):
-    if not a or not b:
-        return 0
-    return SequenceMatcher(None, str(a).lower(), str(b).lower()).ratio()
+from archive_batch import ArchiveBatch
+from checkpoint import CheckpointJournal, add_checkpoint_arguments, default_journal_path
+from discovery import select_developers
+from facet_index import update_facets
+from jsonio import read_json, write_json
+from manifest import Manifest, add_manifest_arguments
+import profiling
+from pf_extract import iter_pf_projects
+from pf_matcher import PFMatchIndex
+from pf_snapshot import cached_extract, default_snapshot_dir
+from profiling import add_profile_arguments
+from project_pool import ProjectPool, add_pool_arguments, defer_move
+import translation_memory
+
+# Bump when fix_project or PF matching changes so incremental runs reprocess every project
+FIX_VERSION = 1
+
+# PropertyFinder dump per developer, under public/data
+PF_FILES = {
+    'emaar': 'emaar.md',
+    'damac': 'damac.md',
+    'sobha': 'sobha.md',
+    'nakheel': 'nakheel.md',
+    'binghatti': 'binghati.md',
+}
 
-def slugify(text):
-    if not text:
-        return ""
-    text = str(text).lower()
-    text = re.sub(r'[^\w\s-]', '', text)
-    text = re.sub(r'[-\s]+', '-', text)
-    return text.strip('-')
+# PropertyFinder fields used for enrichment; the rest of each listing is dropped at load
+PF_FIELDS = ('title', 'startingPrice', 'paymentPlans', 'amenities', 'location', 'deliveryDate', 'bedrooms', 'images')
 
 def extract_pf_data(filepath):
-    """Extract PropertyFinder JSON data from HTML file"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Method 1: Try devResult.projects.data pattern
-        match = re.search(r'<script id="__NEXT_DATA__" type="application/json">\s*(\{.*?\})\s*</script>', content, re.DOTALL)
-        if match:
-            try:
-                data = json.loads(match.group(1))
-                projects = data.get('props', {}).get('pageProps', {}).get('devResult', {}).get('projects', {}).get('data', [])
-                if projects:
-                    return projects
-            except:
-                pass
-        
-        # Method 2: Recursively search for projects array
-        scripts = re.findall(r'<script[^>]*type="application/json"[^>]*>(.*?)</script>', content, re.DOTALL)
-        
-        def find_projects(obj):
-            if isinstance(obj, dict):
-                for k, v in obj.items():
-                    if k == 'projects' and isinstance(v, list) and v and isinstance(v[0], dict) and 'title' in v[0]:
-                        return v
-                    result = find_projects(v)
-                    if result:
-                        return result
-            elif isinstance(obj, list):
-                for item in obj:
-                    result = find_projects(item)
-                    if result:
-                        return result
-            return None
-        
-        for script in scripts:
-            try:
-                data = json.loads(script)
-                projects = find_projects(data)
-                if projects:
-                    return projects
-            except:
-                pass
-                
-    except Exception as e:
-        print(f"Error extracting from {filepath}: {e}")
-    return []
+    """Extract PropertyFinder projects from an HTML dump (streamed, one project at a time)"""
+    return [{k: pf[k] for k in PF_FIELDS if k in pf} for pf in iter_pf_projects(filepath)]
 
-def find_matching_pf_project(project_name, pf_projects):
-    """Find matching PropertyFinder project"""
-    if not project_name:
-        return None
+class PFIndexMap:
+    """Per-developer PFMatchIndex, parsed (or read from its snapshot) on first use
+
+    Behaves like the {dev: PFMatchIndex} dict for get(); developers without a
+    dump map to None. Load a developer in the parent before forking workers so
+    they share the index instead of each parsing the dump.
+    """
     
-    project_name_clean = str(project_name).lower().strip()
+    def __init__(self, data_dir, pf_hashes, snapshot_dir=None):
+        self.data_dir = Path(data_dir)
+        self.pf_hashes = pf_hashes
+        self.snapshot_dir = snapshot_dir or default_snapshot_dir(data_dir)
+        self._indexes = {}
     
-    best_match = None
-    best_score = 0
+    def load(self, dev):
+        if dev in self._indexes:
+            return self._indexes[dev]
+        index = None
+        pf_path = self.data_dir / PF_FILES[dev] if dev in PF_FILES else None
+        if pf_path is not None and pf_path.exists():
+            profiling.set_project(dev)
+            with profiling.stage('pf_extraction'):
+                pf_projects, from_snapshot = cached_extract(
+                    pf_path, extract_pf_data, PF_FIELDS, self.snapshot_dir, self.pf_hashes.get(dev))
+                index = PFMatchIndex(pf_projects)
+            print(f"  📥 PropertyFinder: {len(pf_projects)} projects{' (snapshot)' if from_snapshot else ''}")
+        self._indexes[dev] = index
+        return index
     
-    for pf in pf_projects:
-        pf_title = pf.get('title', '')
-        
-        # Direct slug match
-        if slugify(pf_title) == slugify(project_name):
-            return pf
-        
-        # Similarity match
-        score = similar(project_name_clean, pf_title.lower())
-        if score > best_score and score > 0.6:
-            best_score = score
-            best_match = pf
+    def get(self, dev, default=None):
+        index = self.load(dev)
+        return default if index is None else index
     
-    return best_match
+    def release(self, dev):
+        """Drop a developer's index once its projects are done"""
+        self._indexes.pop(dev, None)
+
+def load_pf_indexes(data_dir, manifest, developers=None):
+    """Hash the PropertyFinder dumps of the selected developers; returns (pf_index_map, pf_hashes)
 
-def fix_project(project_path, pf_data_map, archived_dir):
-    """Fix a single project and return True if valid, False if archived"""
+    The dumps themselves are parsed lazily, per developer (see PFIndexMap).
+    """
+    pf_hashes = {}
+    for dev, pf_file in PF_FILES.items():
+        pf_path = data_dir / pf_file
+        if (developers is None or dev in developers) and pf_path.exists():
+            pf_hashes[dev] = manifest.file_hash(pf_path)
     
-    try:
-        with open(project_path, 'r', encoding='utf-8') as f:
-            project = json.load(f)
-    except:
-        return False
+    return PFIndexMap(data_dir, pf_hashes), pf_hashes
+
+def find_matching_pf_project(project_name, pf_index):
+    """Find matching PropertyFinder project using the developer's prebuilt match index"""
+    if not project_name or pf_index is None:
+        return None
+    return pf_index.match(project_name)
+
+def fix_project_data(project, pf_index_map):
+    """Fix and enrich a project dict in place; returns (valid, changes), valid is False if it should be archived"""
     
     slug = project.get('slug', '')
     changes = []
@@ -182,8 +184,9 @@ def fix_project(project_path, pf_data_map, archived_dir):
     name = project.get('name_en', '') or (project.get('projectName', {}).get('en', '') if isinstance(project.get('projectName'), dict) else project.get('projectName', ''))
     developer = project.get('developer', '').lower()
     
-    pf_projects = pf_data_map.get(developer, [])
-    pf_match = find_matching_pf_project(name or slug, pf_projects)
+    pf_index = pf_index_map.get(developer)
+    with profiling.stage('pf_matching'):
+        pf_match = find_matching_pf_project(name or slug, pf_index)
     
     if pf_match:
         # Price
@@ -194,7 +197,7 @@ def fix_project(project_path, pf_data_map, archived_dir):
         # Payment plans
         pf_plans = pf_match.get('paymentPlans', [])
         if pf_plans and not project.get('paymentPlan'):
-            project['paymentPlan'] = ', '.join(list(set(pf_plans)))
+            project['paymentPlan'] = ', '.join(dict.fromkeys(pf_plans))
             changes.append('paymentPlan')
         
         # Amenities
@@ -216,7 +219,9 @@ def fix_project(project_path, pf_data_map, archived_dir):
             new_amenities = []
             for amenity in pf_amenities:
                 if amenity.lower() not in existing_names:
-                    new_amenities.append({'name': {'en': amenity, 'ar': amenity}})
+                    # Arabic from the translation memory; the English is kept until a translator sets it
+                    arabic = translation_memory.lookup('amenity_name', amenity, translation_memory.keep_english)
+                    new_amenities.append({'name': {'en': amenity, 'ar': arabic}})
             
             if new_amenities:
                 project['amenities'] = existing + new_amenities
@@ -269,50 +274,90 @@ def fix_project(project_path, pf_data_map, archived_dir):
         project.get('description')
     )
     
-    if not has_name:
-        # Archive this project
-        shutil.move(str(project_path.parent), archived_dir / project_path.parent.name)
-        return False
+    return bool(has_name), changes
+
+def fix_project(project_path, pf_index_map, archived_dir):
+    """Fix a single project and return (valid, changes); valid is False if archived"""
+    
+    try:
+        with profiling.stage('load'):
+            project = read_json(project_path)
+    except:
+        return False, []
+    
+    with profiling.stage('fix_project'):
+        valid, changes = fix_project_data(project, pf_index_map)
+    
+    if not valid:
+        # Archive this project (planned into the parent's archive batch, in project order)
+        defer_move(project_path.parent, archived_dir / project_path.parent.name)
+        return False, changes
     
-    # Save changes
-    if changes:
-        with open(project_path, 'w', encoding='utf-8') as f:
-            json.dump(project, f, ensure_ascii=False, indent=2)
-        print(f"  ✓ {slug}: {', '.join(changes)}")
+    # Save changes (skipped when the serialized bytes are identical)
+    if not changes:
+        return True, changes
+    with profiling.stage('write'):
+        written = write_json(project_path, project)
+    if written:
+        print(f"  ✓ {project.get('slug', '')}: {', '.join(changes)}")
     
-    return True
+    return True, changes
+
+# PF match indexes, installed once per worker process
+_worker_pf_index_map = {}
+
+def init_worker(pf_index_map):
+    global _worker_pf_index_map
+    _worker_pf_index_map = pf_index_map
+
+def fix_project_task(task):
+    """Pool entry point: fix one (index_file, archived_dir) with the worker's PF indexes"""
+    index_file, archived_dir = task
+    profiling.set_project(index_file.parent.parent.parent.name, index_file.parent.name)
+    return fix_project(index_file, _worker_pf_index_map, archived_dir)
 
 def main():
+    parser = argparse.ArgumentParser(description='Fix, enrich and archive project data')
+    add_pool_arguments(parser)
+    add_manifest_arguments(parser)
+    add_profile_arguments(parser)
+    add_checkpoint_arguments(parser)
+    parser.add_argument('--developers', default=None,
+                        help='comma-separated developers to process')
+    args = parser.parse_args()
+    profiling.start(args)
+    started = time.monotonic()
+    
     base_dir = Path(__file__).parent.parent
     data_dir = base_dir / 'public' / 'data'
+    developers = select_developers(data_dir, args.developers)
+    manifest = Manifest.load(data_dir, args.manifest)
     
     # Create archive directory
     archived_dir = data_dir / '_archived'
     archived_dir.mkdir(exist_ok=True)
     
-    # Load PropertyFinder data
-    pf_data_map = {}
-    pf_files = {
-        'emaar': 'emaar.md',
-        'damac': 'damac.md',
-        'sobha': 'sobha.md',
-        'nakheel': 'nakheel.md',
-        'binghatti': 'binghati.md',
-    }
+    # PropertyFinder dumps are hashed now, parsed per developer below
+    pf_index_map, pf_hashes = load_pf_indexes(data_dir, manifest, developers)
+    # Loaded before the pools start so forked workers share it
+    translation_memory.load()
     
-    print("📥 Loading PropertyFinder data...")
-    for dev, pf_file in pf_files.items():
-        pf_path = data_dir / pf_file
-        if pf_path.exists():
-            pf_projects = extract_pf_data(pf_path)
-            pf_data_map[dev] = pf_projects
-            print(f"  {dev}: {len(pf_projects)} projects")
+    # Roll back an interrupted archive batch, then resume the interrupted run
+    batch = ArchiveBatch.open(data_dir)
+    journal = CheckpointJournal.open(
+        default_journal_path(data_dir, 'fix_all_issues'),
+        {'script': 'fix_all_issues', 'version': FIX_VERSION, 'pf': pf_hashes, 'full': args.full},
+        restart=args.restart,
+    )
+    if journal.resumed:
+        print(f"⏯️  Resuming: {len(journal.done)} projects already done")
     
     # Process each developer
-    developers = ['emaar', 'damac', 'sobha', 'nakheel', 'binghatti']
-    
     total_fixed = 0
     total_archived = 0
+    total_skipped = 0
+    total_resumed = 0
+    stopped = False
     
     for dev in developers:
         projects_dir = data_dir / dev / 'projects'
@@ -328,29 +373,90 @@ def main():
         
         fixed = 0
         archived = 0
+        skipped = 0
+        deps = {'pf_dump': pf_hashes.get(dev)}
         
-        for project_folder in projects_dir.iterdir():
-            if not project_folder.is_dir():
-                continue
-            if project_folder.name.startswith('_'):
-                continue
-            
-            index_file = project_folder / 'index.json'
-            if not index_file.exists():
-                continue
-            
-            if fix_project(index_file, pf_data_map, dev_archived_dir):
-                fixed += 1
-            else:
-                archived += 1
+        tasks = [
+            (project_folder / 'index.json', dev_archived_dir)
+            for project_folder in sorted(projects_dir.iterdir())
+            if project_folder.is_dir()
+            and not project_folder.name.startswith('_')
+            and (project_folder / 'index.json').exists()
+        ]
+        if journal.resumed:
+            pending = [t for t in tasks if not journal.is_done(manifest.key(t[0]))]
+            total_resumed += len(tasks) - len(pending)
+            tasks = pending
+        if not args.full:
+            pending = [t for t in tasks if not manifest.is_current('fix', t[0], FIX_VERSION, deps)]
+            skipped = len(tasks) - len(pending)
+            tasks = pending
+        
+        # Parsed in the parent (only if needed) so forked workers share the index
+        if tasks:
+            pf_index_map.load(dev)
+        
+        # Checkpoint after each chunk: its archive moves are applied as one batch first,
+        # and archived projects are marked done only once they are moved
+        with ProjectPool(args.workers, args.chunksize, initializer=init_worker, initargs=(pf_index_map,)) as pool:
+            for start in range(0, len(tasks), max(1, args.checkpoint_every)):
+                chunk = tasks[start:start + max(1, args.checkpoint_every)]
+                moved = []
+                for result in pool.run(fix_project_task, chunk, mover=batch.plan_moves):
+                    index_file = result.item[0]
+                    if result.error:
+                        print(f"  ⚠️ Error: {dev}/{index_file.parent.name}: {result.error}")
+                        continue
+                    valid, changes = result.value
+                    if valid:
+                        journal.mark_done(manifest.key(index_file), valid)
+                        fixed += 1
+                        manifest.record('fix', index_file, FIX_VERSION, deps)
+                    else:
+                        moved.append(manifest.key(index_file))
+                        archived += 1
+                        manifest.forget(index_file)
+                batch.apply()
+                for key in moved:
+                    journal.mark_done(key, False)
+                journal.flush()
+                
+                if args.time_limit and time.monotonic() - started > args.time_limit:
+                    stopped = True
+                    break
+        
+        pf_index_map.release(dev)
         
-        print(f"\n{dev}: Fixed {fixed}, Archived {archived}")
+        print(f"\n{dev}: Fixed {fixed}, Archived {archived}, Skipped (unchanged) {skipped}")
         total_fixed += fixed
         total_archived += archived
+        total_skipped += skipped
+        if stopped:
+            break
+    
+    facets_updated, facets_removed = update_facets(data_dir, manifest, developers)
+    manifest.save()
+    translation_memory.save()
+    if stopped:
+        journal.close()
+    else:
+        journal.complete()
     
     print(f"\n{'='*60}")
-    print(f"📊 Total: Fixed {total_fixed}, Archived {total_archived}")
+    print(f"📊 Total: Fixed {total_fixed}, Archived {total_archived}, Skipped (unchanged) {total_skipped}")
+    if total_resumed:
+        print(f"   Done in the interrupted run: {total_resumed}")
+    print(f"   Facet counts: {facets_updated} projects updated, {facets_removed} removed")
+    print(f"   {translation_memory.summary()}")
+    if stopped:
+        print(f"⏸️  Time limit reached; run again to resume")
     print(f"{'='*60}")
+    
+    profiling.finish(args)
+    
+    # Non-zero so time-boxed jobs know there is more to do
+    if stopped:
+        sys.exit(3)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Content-addressed deduplication of project gallery and hero images.
+
+URL dedup in standardize_project / fix_project misses the same image served
+under different URLs. Images are grouped here when any of these match:
+- the URL variant: PropertyFinder /medium.webp vs /original.webp, WordPress
+  -1024x768 size suffixes, Drupal image styles, imgix/Contentful size params
+- the sha256 of the file
+- the perceptual hash (difference hash, Hamming distance <= PHASH_DISTANCE)
+
+Each group collapses to its highest-resolution variant (known pixel size,
+then the variant rank of the URL), kept at the position of its first image.
+The hero image is replaced by the best variant of its group, and that group
+appears at most once in the gallery, under the same URL, so browsers fetch it
+once.
+
+Content and perceptual hashes need the image bytes: they come from files under
+public/ (site-relative URLs) or a local mirror laid out as <mirror>/<host>/<path>
+(default .cache/media-mirror). --hash scans the catalog's images and stores
+sha256, pixel size and perceptual hash in .cache/image-hashes.json, keyed by URL
+and revalidated by file size/mtime and the ETag recorded by link_checker.py.
+The dedup itself (--apply or the pipeline's dedup stage) only reads that cache,
+so images without a local copy are matched by URL variant alone.
+
+Perceptual hashes need Pillow; without it only exact content and URL variants
+are matched.
+
+Usage: python scripts/image_dedup.py --hash [--mirror DIR] [--workers N]
+       python scripts/image_dedup.py --apply [--developers emaar] [--full]
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import re
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+from discovery import select_developers
+from jsonio import read_json, write_cache, write_json
+from link_checker import LinkCache
+from manifest import Manifest, add_manifest_arguments, default_manifest_path
+from project_pool import ProjectPool, add_pool_arguments
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Bump when the cached hash format changes so every image is re-hashed
+IMAGE_CACHE_VERSION = 1
+# Bump when dedupe_images changes so incremental runs reprocess every project
+DEDUP_VERSION = 2
+
+GALLERY_FIELDS = ('galleryImages', 'images_gallery')
+HERO_FIELDS = ('heroImage', 'image_hero')
+
+# Max differing bits between two 64-bit difference hashes of the same picture
+PHASH_DISTANCE = 6
+
+PF_VARIANT = re.compile(r'/(original|large|medium|small|thumbnail)\.(webp|jpe?g|png)$', re.I)
+PF_RANKS = {'original': math.inf, 'large': 3, 'medium': 2, 'small': 1, 'thumbnail': 0}
+WP_SIZE = re.compile(r'-(\d+)x(\d+)(\.[a-z0-9]+)$', re.I)
+DRUPAL_STYLE = re.compile(r'/styles/[^/]+/public/')
+# Drupal serves "photo.jpg.webp" for a style of "photo.jpg"
+DOUBLE_EXTENSION = re.compile(r'(\.(?:jpe?g|png))\.webp$', re.I)
+# Query parameters that only select a size or encoding of the same image (crop and fit
+# select a different part of it, so they stay in the key)
+SIZE_PARAMS = {'w', 'h', 'width', 'height', 'q', 'quality', 'auto', 'fm', 'format', 'dpr', 'itok'}
+
+
+def default_cache_path(data_dir):
+    """.cache/image-hashes.json, next to the pipeline manifest"""
+    return default_manifest_path(data_dir).parent / 'image-hashes.json'
+
+
+def default_mirror_dir(data_dir):
+    return default_manifest_path(data_dir).parent / 'media-mirror'
+
+
+def url_variant(url):
+    """(variant key, rank): URLs with the same key are sizes of one image; higher rank is larger"""
+    parts = urlsplit(url.strip())
+    path = parts.path
+    rank = math.inf
+
+    match = PF_VARIANT.search(path)
+    if match:
+        path = path[:match.start()]
+        rank = PF_RANKS[match.group(1).lower()]
+    else:
+        match = WP_SIZE.search(path)
+        if match:
+            path = path[:match.start()] + match.group(3)
+            rank = int(match.group(1)) * int(match.group(2))
+        if DRUPAL_STYLE.search(path):
+            path = DOUBLE_EXTENSION.sub(r'\1', DRUPAL_STYLE.sub('/', path))
+            rank = min(rank, 0)
+
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    kept = sorted((k, v) for k, v in query if k.lower() not in SIZE_PARAMS)
+    if len(kept) != len(query):
+        sizes = {k.lower(): v for k, v in query}
+        width, height = sizes.get('w') or sizes.get('width'), sizes.get('h') or sizes.get('height')
+        if width and width.isdigit():
+            rank = min(rank, int(width) * int(height if height and height.isdigit() else width))
+        else:
+            rank = min(rank, 0)
+
+    key = f"{parts.netloc.lower()}{unquote(path)}"
+    return (f"{key}?{urlencode(kept)}" if kept else key), rank
+
+
+def local_path(url, public_dir, mirror_dir):
+    """Local copy of an image URL, or None"""
+    url = url.strip()
+    if url.startswith('/') and not url.startswith('//'):
+        path = Path(public_dir) / unquote(urlsplit(url).path).lstrip('/')
+    elif url.lower().startswith(('http://', 'https://')):
+        parts = urlsplit(url)
+        path = Path(mirror_dir) / parts.netloc.lower() / unquote(parts.path).lstrip('/')
+    else:
+        return None
+    return path if path.is_file() else None
+
+
+def image_size(data):
+    """(width, height) from a PNG, GIF, WebP or JPEG header, or None"""
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        return int.from_bytes(data[16:20], 'big'), int.from_bytes(data[20:24], 'big')
+    if data[:4] == b'GIF8' and len(data) >= 10:
+        return int.from_bytes(data[6:8], 'little'), int.from_bytes(data[8:10], 'little')
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP' and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b'VP8 ':
+            return int.from_bytes(data[26:28], 'little') & 0x3FFF, int.from_bytes(data[28:30], 'little') & 0x3FFF
+        if chunk == b'VP8L':
+            bits = int.from_bytes(data[21:25], 'little')
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b'VP8X':
+            return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+        return None
+    if data[:2] == b'\xff\xd8':
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                return None
+            marker = data[i + 1]
+            if marker == 0xFF:
+                i += 1
+                continue
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                return int.from_bytes(data[i + 7:i + 9], 'big'), int.from_bytes(data[i + 5:i + 7], 'big')
+            i += 2 + int.from_bytes(data[i + 2:i + 4], 'big')
+    return None
+
+
+def difference_hash(path):
+    """64-bit difference hash as 16 hex digits (None without Pillow or for undecodable files)"""
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            pixels = list(img.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+    except Exception:
+        return None
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+
+def hash_image(path):
+    """Pool entry point: hashes and size of one local image file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    size = image_size(data)
+    return {
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'phash': difference_hash(path),
+        'width': size[0] if size else None,
+        'height': size[1] if size else None,
+    }
+
+
+class ImageHashCache:
+    """Hashes of locally available images by URL"""
+
+    def __init__(self, path, images=None):
+        self.path = Path(path)
+        self.images = images or {}
+
+    @classmethod
+    def load(cls, data_dir, path=None):
+        path = Path(path) if path else default_cache_path(data_dir)
+        try:
+            data = read_json(path)
+            if data.get('version') == IMAGE_CACHE_VERSION:
+                return cls(path, data.get('images'))
+        except (OSError, ValueError):
+            pass
+        return cls(path)
+
+    def is_current(self, url, local, etag):
+        entry = self.images.get(url)
+        if not entry:
+            return False
+        st = os.stat(local)
+        return entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns and entry.get('etag') == etag
+
+    def version(self):
+        """Short hash of the cached hashes, for manifest deps"""
+        digest = hashlib.sha256()
+        for url in sorted(self.images):
+            entry = self.images[url]
+            digest.update(f"{url}\t{entry['sha256']}\t{entry.get('phash')}\t{entry.get('width')}x{entry.get('height')}\n"
+                          .encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def save(self):
+        write_cache(self.path, {'version': IMAGE_CACHE_VERSION, 'images': self.images})
+
+
+def project_images(project):
+    """Hero and gallery image URLs of a project, in order, without repeats"""
+    urls = {}
+    for field in HERO_FIELDS:
+        if isinstance(project.get(field), str) and project[field].strip():
+            urls.setdefault(project[field], None)
+    for field in GALLERY_FIELDS:
+        if isinstance(project.get(field), list):
+            for url in project[field]:
+                if isinstance(url, str) and url.strip():
+                    urls.setdefault(url, None)
+    return list(urls)
+
+
+def update_hashes(data_dir, cache, pool, developers=None, mirror_dir=None, etags=None):
+    """Hash the catalog's locally available images that changed; returns (hashed, local, total)"""
+    developers = select_developers(data_dir, developers)
+    public_dir = Path(data_dir).parent
+    mirror_dir = mirror_dir or default_mirror_dir(data_dir)
+    etags = etags or {}
+    urls = {}
+    for dev in developers:
+        for index_file in sorted((Path(data_dir) / dev / 'projects').glob('*/index.json')):
+            if index_file.parent.name.startswith('_'):
+                continue
+            try:
+                project = read_json(index_file)
+            except Exception as e:
+                print(f"  ⚠️ Error: {dev}/{index_file.parent.name}: {e}")
+                continue
+            for url in project_images(project):
+                urls.setdefault(url, None)
+
+    local = {url: local_path(url, public_dir, mirror_dir) for url in urls}
+    local = {url: path for url, path in local.items() if path}
+    stale = [url for url, path in local.items() if not cache.is_current(url, path, etags.get(url))]
+
+    hashed = 0
+    for url, result in zip(stale, pool.run(hash_image, [local[url] for url in stale])):
+        if result.error:
+            print(f"  ⚠️ Error: {url}: {result.error}")
+            continue
+        st = os.stat(local[url])
+        cache.images[url] = {**result.value, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'etag': etags.get(url)}
+        hashed += 1
+    return hashed, len(local), len(urls)
+
+
+def hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+def group_images(urls, hashes):
+    """{url: best url of its group} over the given URLs"""
+    parent = list(range(len(urls)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        parent[find(j)] = find(i)
+
+    variants = [url_variant(url) for url in urls]
+    entries = [hashes.get(url) or {} for url in urls]
+    first_by_key = {}
+    for i, url in enumerate(urls):
+        for key in (('variant', variants[i][0]), ('sha256', entries[i].get('sha256'))):
+            if key[1] is None:
+                continue
+            if key in first_by_key:
+                union(first_by_key[key], i)
+            else:
+                first_by_key[key] = i
+    phashed = [i for i, entry in enumerate(entries) if entry.get('phash')]
+    for n, i in enumerate(phashed):
+        for j in phashed[n + 1:]:
+            if find(i) != find(j) and hamming(entries[i]['phash'], entries[j]['phash']) <= PHASH_DISTANCE:
+                union(i, j)
+
+    def score(i):
+        pixels = (entries[i].get('width') or 0) * (entries[i].get('height') or 0)
+        return pixels, variants[i][1], -i
+
+    best = {}
+    for i in range(len(urls)):
+        root = find(i)
+        if root not in best or score(i) > score(best[root]):
+            best[root] = i
+    return {url: urls[best[find(i)]] for i, url in enumerate(urls)}
+
+
+def dedupe_images(project, hashes):
+    """Collapse duplicate gallery images and make the hero unique; returns the changes"""
+    urls = project_images(project)
+    if len(urls) < 2:
+        return []
+    best = group_images(urls, hashes)
+    changes = []
+
+    for field in HERO_FIELDS:
+        hero = project.get(field)
+        if isinstance(hero, str) and hero in best and best[hero] != hero:
+            project[field] = best[hero]
+            changes.append(f'{field}_upgraded')
+
+    for field in GALLERY_FIELDS:
+        gallery = project.get(field)
+        if not isinstance(gallery, list):
+            continue
+        seen = set()
+        clean = []
+        for url in gallery:
+            if not isinstance(url, str) or url not in best:
+                clean.append(url)
+                continue
+            if best[url] in seen:
+                continue
+            seen.add(best[url])
+            clean.append(best[url])
+        if clean != gallery:
+            project[field] = clean
+            changes.append(f'{field}_dedup({len(gallery)}->{len(clean)})')
+    return changes
+
+
+def dedupe_developer(data_dir, dev, cache, manifest, full=False):
+    """Dedup a developer's project images; returns (projects updated, skipped)"""
+    projects_dir = Path(data_dir) / dev / 'projects'
+    if not projects_dir.exists():
+        return 0, 0
+    deps = {'image_hashes': cache.version()}
+    updated = skipped = 0
+    for index_file in sorted(projects_dir.glob('*/index.json')):
+        if index_file.parent.name.startswith('_'):
+            continue
+        if not full and manifest.is_current('dedup', index_file, DEDUP_VERSION, deps):
+            skipped += 1
+            continue
+        try:
+            project = read_json(index_file)
+        except Exception as e:
+            print(f"  ⚠️ Error: {dev}/{index_file.parent.name}: {e}")
+            continue
+        changes = dedupe_images(project, cache.images)
+        if changes and write_json(index_file, project):
+            updated += 1
+            print(f"  🖼️  {dev}/{index_file.parent.name}: {', '.join(changes)}")
+        manifest.record('dedup', index_file, DEDUP_VERSION, deps)
+    return updated, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hash catalog images and collapse duplicate gallery images')
+    parser.add_argument('--hash', action='store_true', help='hash the locally available images')
+    parser.add_argument('--apply', action='store_true', help='dedup gallery and hero images in the project files')
+    parser.add_argument('--mirror', default=None, help='local mirror of remote images (default: .cache/media-mirror)')
+    parser.add_argument('--developers', default=None, help='comma-separated developers')
+    add_pool_arguments(parser)
+    add_manifest_arguments(parser)
+    args = parser.parse_args()
+    if not args.hash and not args.apply:
+        parser.error('nothing to do: pass --hash and/or --apply')
+
+    data_dir = Path(__file__).resolve().parent.parent / 'public' / 'data'
+    manifest = Manifest.load(data_dir, args.manifest)
+    developers = select_developers(data_dir, args.developers)
+    cache = ImageHashCache.load(data_dir)
+
+    if args.hash:
+        if Image is None:
+            print("⚠️ Pillow is not installed: perceptual hashes are skipped")
+        etags = {url: entry.get('etag') for url, entry in LinkCache.load(data_dir).results.items()}
+        with ProjectPool(args.workers, args.chunksize) as pool:
+            hashed, local, total = update_hashes(data_dir, cache, pool, developers, args.mirror, etags)
+        cache.save()
+        print(f"🔑 {total} images, {local} available locally, {hashed} hashed")
+
+    if args.apply:
+        total = 0
+        for dev in developers:
+            updated, skipped = dedupe_developer(data_dir, dev, cache, manifest, args.full)
+            print(f"  {dev}: {updated} updated, {skipped} skipped (unchanged)")
+            total += updated
+        print(f"\n📊 Images deduplicated in {total} projects")
+
+    manifest.save()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Responsive image derivatives and per-project image metadata.
+
+For every hero and gallery image available locally (files under public/, e.g.
+public/images and public/media, or the mirror used by image_dedup.py):
+- resized WebP/AVIF derivatives are written at each width of WIDTHS below the
+  original's width, to public/images/derived/<content hash>/<width>.<format>
+- width, height, a blurhash placeholder and the srcset of each format are
+  recorded in the project's index.json under "imageMeta", keyed by image URL,
+  so pages can reserve space, paint a placeholder and pick a size without
+  probing images at runtime
+
+Derivatives are content addressed: .cache/image-derivatives.json maps each
+source file (size/mtime) to its sha256 and each sha256 to what was generated
+from it, so an unchanged image is never decoded or re-encoded again, and
+images shared by several projects are encoded once. Encoding runs on the
+project pool.
+
+Encoding and blurhash need Pillow (AVIF needs a Pillow build with AVIF
+support); without it only width and height, read from the file header, are
+recorded.
+
+Usage: python scripts/image_derivatives.py [--developers emaar] [--mirror DIR] [--workers N]
+"""
+
+import argparse
+import hashlib
+import math
+import os
+from pathlib import Path
+
+from discovery import select_developers
+from image_dedup import default_mirror_dir, image_size, local_path, project_images
+from jsonio import read_json, write_cache, write_json
+from manifest import default_manifest_path
+from project_pool import ProjectPool, add_pool_arguments
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Bump when derivative settings change so every image is re-encoded
+DERIVATIVES_VERSION = 1
+
+WIDTHS = (320, 640, 960, 1280, 1920)
+FORMATS = ('avif', 'webp')
+QUALITY = {'avif': 50, 'webp': 75}
+DERIVED_URL = '/images/derived'
+
+# Blurhash components (x, y) and the size the image is reduced to first
+BLURHASH_COMPONENTS = (4, 3)
+BLURHASH_SAMPLE = 32
+BASE83 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+
+def default_cache_path(data_dir):
+    """.cache/image-derivatives.json, next to the pipeline manifest"""
+    return default_manifest_path(data_dir).parent / 'image-derivatives.json'
+
+
+def available_formats():
+    """Derivative formats the installed Pillow can write"""
+    if Image is None:
+        return ()
+    extensions = Image.registered_extensions()
+    return tuple(fmt for fmt in FORMATS if f'.{fmt}' in extensions and extensions[f'.{fmt}'] in Image.SAVE)
+
+
+def encoder_key():
+    """What a cache entry was produced with; entries made with anything else are redone"""
+    return f"v{DERIVATIVES_VERSION}:{','.join(available_formats()) or 'header-only'}"
+
+
+def base83(value, length):
+    return ''.join(BASE83[value // 83 ** (length - 1 - i) % 83] for i in range(length))
+
+
+def srgb_to_linear(value):
+    v = value / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def linear_to_srgb(value):
+    v = max(0.0, min(1.0, value))
+    return int(v * 12.92 * 255 + 0.5) if v <= 0.0031308 else int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash(pixels, width, height, components=BLURHASH_COMPONENTS):
+    """Blurhash of row-major RGB pixels"""
+    x_components, y_components = components
+    linear = [tuple(srgb_to_linear(c) for c in pixel[:3]) for pixel in pixels]
+    factors = []
+    for j in range(y_components):
+        for i in range(x_components):
+            norm = 1 if i == j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                cos_y = math.cos(math.pi * j * y / height)
+                for x in range(width):
+                    basis = norm * math.cos(math.pi * i * x / width) * cos_y
+                    pr, pg, pb = linear[y * width + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = 1 / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = base83((x_components - 1) + (y_components - 1) * 9, 1)
+    if ac:
+        quantized = max(0, min(82, int(max(abs(v) for f in ac for v in f) * 166 - 0.5)))
+        max_ac = (quantized + 1) / 166
+        result += base83(quantized, 1)
+    else:
+        max_ac = 1
+        result += base83(0, 1)
+    result += base83((linear_to_srgb(dc[0]) << 16) + (linear_to_srgb(dc[1]) << 8) + linear_to_srgb(dc[2]), 4)
+
+    def quantize(v):
+        return max(0, min(18, int(math.copysign(abs(v / max_ac) ** 0.5, v) * 9 + 9.5)))
+
+    for r, g, b in ac:
+        result += base83(quantize(r) * 19 * 19 + quantize(g) * 19 + quantize(b), 2)
+    return result
+
+
+def derived_dir(public_dir, sha):
+    return Path(public_dir) / DERIVED_URL.lstrip('/') / sha[:16]
+
+
+def encode_image(task):
+    """Pool entry point: derivatives and metadata of one source image
+
+    task is (source path, sha256, public dir). Returns {width, height,
+    blurhash, derivatives: {format: [widths]}}.
+    """
+    path, sha, public_dir = task
+    if Image is None:
+        with open(path, 'rb') as f:
+            size = image_size(f.read())
+        return {'width': size[0] if size else None, 'height': size[1] if size else None,
+                'blurhash': None, 'derivatives': {}}
+
+    with Image.open(path) as img:
+        img = img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+        width, height = img.size
+        sample = img.convert('RGB')
+        sample.thumbnail((BLURHASH_SAMPLE, BLURHASH_SAMPLE))
+        placeholder = blurhash(list(sample.getdata()), *sample.size)
+
+        widths = [w for w in WIDTHS if w < width] or [width]
+        out_dir = derived_dir(public_dir, sha)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        derivatives = {}
+        for fmt in available_formats():
+            for w in widths:
+                out = out_dir / f"{w}.{fmt}"
+                if not out.exists():
+                    resized = img if w == width else img.resize((w, max(1, round(height * w / width))), Image.LANCZOS)
+                    tmp = out.with_suffix(f'.tmp.{fmt}')
+                    resized.save(tmp, quality=QUALITY[fmt])
+                    os.replace(tmp, out)
+            derivatives[fmt] = widths
+    return {'width': width, 'height': height, 'blurhash': placeholder, 'derivatives': derivatives}
+
+
+class DerivativeCache:
+    """Source file hashes by path and generated metadata by content hash"""
+
+    def __init__(self, path, sources=None, images=None):
+        self.path = Path(path)
+        self.sources = sources or {}
+        self.images = images or {}
+
+    @classmethod
+    def load(cls, data_dir, path=None):
+        path = Path(path) if path else default_cache_path(data_dir)
+        try:
+            data = read_json(path)
+            if data.get('version') == DERIVATIVES_VERSION:
+                return cls(path, data.get('sources'), data.get('images'))
+        except (OSError, ValueError):
+            pass
+        return cls(path)
+
+    def source_hash(self, path):
+        """sha256 of a source image, reusing the cached hash while size and mtime are unchanged"""
+        st = os.stat(path)
+        key = str(Path(path).resolve())
+        cached = self.sources.get(key)
+        if cached and cached['size'] == st.st_size and cached['mtime_ns'] == st.st_mtime_ns:
+            return cached['sha256']
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        self.sources[key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': h.hexdigest()}
+        return h.hexdigest()
+
+    def is_current(self, sha, public_dir):
+        entry = self.images.get(sha)
+        if not entry or entry.get('encoder') != encoder_key():
+            return False
+        out_dir = derived_dir(public_dir, sha)
+        return all((out_dir / f"{w}.{fmt}").exists() for fmt, widths in entry['derivatives'].items() for w in widths)
+
+    def save(self):
+        write_cache(self.path, {'version': DERIVATIVES_VERSION, 'sources': self.sources, 'images': self.images})
+
+
+def image_meta(sha, entry):
+    """imageMeta record of one image"""
+    meta = {'width': entry['width'], 'height': entry['height']}
+    if entry.get('blurhash'):
+        meta['blurhash'] = entry['blurhash']
+    if entry['derivatives']:
+        base = f"{DERIVED_URL}/{sha[:16]}"
+        meta['srcset'] = {
+            fmt: ', '.join(f"{base}/{w}.{fmt} {w}w" for w in widths)
+            for fmt, widths in entry['derivatives'].items()
+        }
+    return meta
+
+
+def update_image_meta(data_dir, pool, developers=None, mirror_dir=None, cache=None, write=write_json):
+    """Encode new local images and refresh imageMeta; returns (images encoded, projects updated)
+
+    write(index_file, project) writes an updated project (write_json by default).
+    """
+    developers = select_developers(data_dir, developers)
+    public_dir = Path(data_dir).parent
+    mirror_dir = mirror_dir or default_mirror_dir(data_dir)
+    cache = cache or DerivativeCache.load(data_dir)
+
+    # Local sources of every project's images
+    projects = []
+    for dev in developers:
+        for index_file in sorted((Path(data_dir) / dev / 'projects').glob('*/index.json')):
+            if index_file.parent.name.startswith('_'):
+                continue
+            try:
+                project = read_json(index_file)
+            except Exception as e:
+                print(f"  ⚠️ Error: {dev}/{index_file.parent.name}: {e}")
+                continue
+            sources = {}
+            for url in project_images(project):
+                path = local_path(url, public_dir, mirror_dir)
+                if path:
+                    sources[url] = (path, cache.source_hash(path))
+            projects.append((index_file, project, sources))
+
+    pending = {}
+    for _, _, sources in projects:
+        for path, sha in sources.values():
+            if sha not in pending and not cache.is_current(sha, public_dir):
+                pending[sha] = (str(path), sha, str(public_dir))
+
+    encoded = 0
+    for result in pool.run(encode_image, list(pending.values())):
+        sha = result.item[1]
+        if result.error:
+            print(f"  ⚠️ Error: {result.item[0]}: {result.error}")
+            continue
+        cache.images[sha] = {**result.value, 'encoder': encoder_key()}
+        encoded += 1
+
+    updated = 0
+    for index_file, project, sources in projects:
+        meta = {url: image_meta(sha, cache.images[sha]) for url, (_, sha) in sources.items() if sha in cache.images}
+        if meta == project.get('imageMeta') or (not meta and 'imageMeta' not in project):
+            continue
+        if meta:
+            project['imageMeta'] = meta
+        else:
+            del project['imageMeta']
+        if write(index_file, project):
+            updated += 1
+            print(f"  🖼️  {index_file.parent.parent.parent.name}/{index_file.parent.name}: {len(meta)} images")
+    cache.save()
+    return encoded, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate responsive image derivatives and record imageMeta')
+    parser.add_argument('--developers', default=None, help='comma-separated developers')
+    parser.add_argument('--mirror', default=None, help='local mirror of remote images (default: .cache/media-mirror)')
+    add_pool_arguments(parser)
+    args = parser.parse_args()
+
+    data_dir = Path(__file__).resolve().parent.parent / 'public' / 'data'
+    developers = select_developers(data_dir, args.developers)
+    if Image is None:
+        print("⚠️ Pillow is not installed: recording width/height only, no derivatives or blurhash")
+
+    with ProjectPool(args.workers, args.chunksize) as pool:
+        encoded, updated = update_image_meta(data_dir, pool, developers, args.mirror)
+    print(f"\n📊 {encoded} images encoded, imageMeta updated in {updated} projects")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+JSON reading and writing shared by the data scripts.
+
+Every script loads and writes JSON through this module. The codec backend is
+picked at import: orjson when it is installed, else the stdlib json module
+(JSONIO_BACKEND=json forces the stdlib). Both produce the repo's canonical
+format, byte for byte: UTF-8, indent=2, ensure_ascii=False, no trailing
+newline. Documents orjson would write differently (floats the stdlib writes
+in exponent form: 1e+16 and up, and anything below 1e-4, e.g. 1e-05, which
+orjson writes as 0.00001; integers beyond 64 bits, non-string keys) or reads
+differently (NaN literals, lone surrogates) go through the stdlib instead.
+The one exception is NaN/Infinity, which orjson writes as null; they are not
+valid JSON and none of the data files hold them.
+
+Cache and state files under .cache/ are written with write_cache, as one
+compact line. write_json compares the canonical bytes with those already on disk:
+- Unchanged files are not touched, so mtimes and Next.js caches survive
+- Changed files are written to a temp file in the same directory and renamed
+  into place, so an interrupted run never leaves a truncated index.json
+
+read_json(path, into=...) decodes straight into a typed record, e.g.
+records.ProjectRecord, which validates the document as it is built and
+raises SchemaError for a malformed one.
+"""
+
+import json
+import os
+import re
+import shutil
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if os.environ.get('JSONIO_BACKEND') == 'json':
+    orjson = None
+
+BACKEND = 'orjson' if orjson else 'json'
+
+# A number token the stdlib writes in exponent form: orjson writes 1e16 where the stdlib
+# writes 1e+16, and 0.00001 (or 1e-5) for 1e-05; any float with abs(x) < 1e-4 qualifies
+EXPONENT = re.compile(rb'(?:^|[\s\[:])-?(?:\d+(?:\.\d+)?e-?\d+(?=[\s,\]}]|$)|0\.0000\d)')
+
+
+class SchemaError(ValueError):
+    """A document that does not fit the record type it is decoded into"""
+
+
+def _stdlib_dumps(data):
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def dumps(data):
+    """Canonical bytes for a JSON document"""
+    if orjson is None:
+        return _stdlib_dumps(data)
+    try:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    except TypeError:
+        return _stdlib_dumps(data)
+    if EXPONENT.search(payload):
+        return _stdlib_dumps(data)
+    return payload
+
+
+def dumps_line(data):
+    """One-line text for JSONL journals and database columns"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(data):
+    """Decode JSON text or bytes"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode('utf-8')
+    return json.loads(data)
+
+
+def same_bytes(path, payload):
+    """True if the file at path already holds exactly payload"""
+    try:
+        if os.path.getsize(path) != len(payload):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == payload
+    except OSError:
+        return False
+
+
+def write_bytes_atomic(path, payload):
+    """Write payload to a sibling temp file and rename it over path"""
+    path = os.fspath(path)
+    tmp = os.path.join(os.path.dirname(path) or '.', f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def write_json(path, data):
+    """Write data as JSON only if the bytes differ; returns True if the file was written"""
+    payload = dumps(data)
+    if same_bytes(path, payload):
+        return False
+    write_bytes_atomic(path, payload)
+    return True
+
+
+def write_cache(path, data):
+    """Write a cache or state file: one compact line, parent directories created, renamed into place"""
+    os.makedirs(os.path.dirname(os.fspath(path)) or '.', exist_ok=True)
+    write_bytes_atomic(path, dumps_line(data).encode('utf-8'))
+
+
+def read_json(path, into=None):
+    """Load a JSON file; with into (a callable such as a record's from_dict), return into(document)"""
+    with open(path, 'rb') as f:
+        data = loads(f.read())
+    if into is None:
+        return data
+    try:
+        return into(data)
+    except SchemaError as e:
+        raise SchemaError(f"{path}: {e}") from None
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Keyword rule tables compiled into a single-pass matcher.
+
+A rule table is an ordered list of (keywords, value): the first rule with any
+keyword contained in the text wins, exactly like an if/elif chain of `in`
+tests. All keywords are compiled into one Aho-Corasick automaton, so a lookup
+scans the text once no matter how many rules the table holds, and results are
+memoized per distinct text.
+"""
+
+_NO_RULE = float('inf')
+
+# Distinct texts remembered per matcher before the memo is reset
+CACHE_SIZE = 4096
+
+
+class KeywordMatcher:
+    """First-matching-rule lookup over a table of (keywords, value) rules"""
+
+    def __init__(self, rules, default=None):
+        self.values = [value for _, value in rules]
+        self.default = default
+        self._cache = {}
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [_NO_RULE]
+
+        for index, (keywords, _) in enumerate(rules):
+            if isinstance(keywords, str):
+                keywords = (keywords,)
+            for keyword in keywords:
+                state = 0
+                for ch in keyword:
+                    nxt = self._goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[state][ch] = nxt
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._best.append(_NO_RULE)
+                    state = nxt
+                self._best[state] = min(self._best[state], index)
+
+        # Breadth-first failure links; each state's best rule includes its suffixes'
+        goto = self._goto
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = goto[fail].get(ch, 0)
+                self._best[nxt] = min(self._best[nxt], self._best[self._fail[nxt]])
+                queue.append(nxt)
+
+    def rule_index(self, text):
+        """Index of the first rule with a keyword in text, or None"""
+        goto, fail, best_of = self._goto, self._fail, self._best
+        state = 0
+        best = best_of[0]
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if best_of[state] < best:
+                best = best_of[state]
+                if best == 0:
+                    break
+        return None if best == _NO_RULE else best
+
+    def match(self, text):
+        """Value of the first matching rule, or the default (memoized per text)"""
+        try:
+            return self._cache[text]
+        except KeyError:
+            pass
+        index = self.rule_index(text)
+        value = self.default if index is None else self.values[index]
+        if len(self._cache) >= CACHE_SIZE:
+            self._cache.clear()
+        self._cache[text] = value
+        return value
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Async link and media checker for the project catalog.
+
+Checks every heroImage, gallery image, videoUrl, brochureUrl and 3D tour URL
+and records its HTTP status, content type, size and ETag:
+- asyncio connections, pooled and kept alive per host, with a global and a
+  per-host concurrency limit
+- HEAD first; when a server rejects HEAD (or drops the connection), a ranged
+  GET for the first byte instead, so no media is downloaded
+- redirects are followed (MAX_REDIRECTS) and the final URL recorded
+
+Results are kept in .cache/link-cache.json. A URL is re-checked only once its
+result is older than --ttl hours (failed checks after RETRY_AFTER), so repeat
+runs only hit stale URLs.
+
+URLs answering 404/410 are dead: cleanup_data.py (and the pipeline's
+standardize stage) drops them from galleries, picks another hero image and
+removes dead 3D tours. Timeouts and server errors never mark a URL dead, so an
+offline run does not wipe the media.
+
+Usage: python scripts/link_checker.py [--developers emaar] [--ttl 168] [--concurrency 32] [--per-host 4]
+       python scripts/link_checker.py --urls urls.txt   # check a list, e.g. against a local test server
+"""
+
+import argparse
+import asyncio
+import hashlib
+import ssl
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from discovery import select_developers
+from jsonio import read_json, write_cache
+from manifest import default_manifest_path
+
+# Bump when the result format changes so every URL is re-checked
+LINK_CACHE_VERSION = 1
+
+# Project fields holding a URL or a list of URLs (current and legacy names)
+LINK_FIELDS = ('heroImage', 'image_hero', 'galleryImages', 'images_gallery',
+               'videoUrl', 'brochureUrl', '3D_TourLink', 'tour_3d_url')
+
+# Statuses that prove a URL is gone; anything else (timeouts, 5xx, 403) is not
+DEAD_STATUSES = (404, 410)
+# HEAD answers that mean "try a ranged GET instead"
+HEAD_UNSUPPORTED = (400, 403, 405, 501)
+REDIRECTS = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+# Response bodies up to this size are read so the connection can be reused
+MAX_DRAIN = 64 * 1024
+# Failed checks (no HTTP status) are retried after this many seconds
+RETRY_AFTER = 3600
+
+USER_AGENT = 'Mozilla/5.0 (compatible; catalog-link-checker/1.0)'
+
+
+def default_cache_path(data_dir):
+    """.cache/link-cache.json, next to the pipeline manifest"""
+    return default_manifest_path(data_dir).parent / 'link-cache.json'
+
+
+class LinkCache:
+    """Check results by URL, with the time each was checked"""
+
+    def __init__(self, path, results=None):
+        self.path = Path(path)
+        self.results = results or {}
+
+    @classmethod
+    def load(cls, data_dir, path=None):
+        path = Path(path) if path else default_cache_path(data_dir)
+        try:
+            data = read_json(path)
+            if data.get('version') == LINK_CACHE_VERSION:
+                return cls(path, data.get('results'))
+        except (OSError, ValueError):
+            pass
+        return cls(path)
+
+    def is_fresh(self, url, ttl, now=None):
+        entry = self.results.get(url)
+        if not entry:
+            return False
+        max_age = ttl if entry.get('status') else min(ttl, RETRY_AFTER)
+        return (now or time.time()) - entry.get('checkedAt', 0) < max_age
+
+    def dead_urls(self):
+        return frozenset(url for url, entry in self.results.items() if entry.get('status') in DEAD_STATUSES)
+
+    def save(self):
+        write_cache(self.path, {'version': LINK_CACHE_VERSION, 'results': self.results})
+
+
+def load_dead_urls(data_dir, path=None):
+    """URLs the last check found dead (empty if the checker never ran)"""
+    return LinkCache.load(data_dir, path).dead_urls()
+
+
+def dead_links_version(dead_urls):
+    """Short hash of a dead-URL set, for manifest deps"""
+    return hashlib.sha256('\n'.join(sorted(dead_urls)).encode('utf-8')).hexdigest()[:16]
+
+
+def project_urls(project):
+    """http(s) URLs referenced by a project, in field order"""
+    found = []
+    for field in LINK_FIELDS:
+        value = project.get(field)
+        for url in value if isinstance(value, list) else [value]:
+            if isinstance(url, str) and url.strip().lower().startswith(('http://', 'https://')):
+                found.append(url.strip())
+    return found
+
+
+def catalog_urls(data_dir, developers=None):
+    """Unique URLs of every project, in catalog order"""
+    developers = select_developers(data_dir, developers)
+    urls = {}
+    for dev in developers:
+        projects_dir = Path(data_dir) / dev / 'projects'
+        if not projects_dir.exists():
+            continue
+        for index_file in sorted(projects_dir.glob('*/index.json')):
+            if index_file.parent.name.startswith('_'):
+                continue
+            try:
+                project = read_json(index_file)
+            except Exception as e:
+                print(f"  ⚠️ Error: {dev}/{index_file.parent.name}: {e}")
+                continue
+            for url in project_urls(project):
+                urls.setdefault(url, None)
+    return list(urls)
+
+
+class HostPool:
+    """Keep-alive connections to one scheme://host:port, at most `limit` in use"""
+
+    def __init__(self, scheme, host, port, limit, timeout, ssl_context):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.ssl_context = ssl_context if scheme == 'https' else None
+        self.semaphore = asyncio.Semaphore(limit)
+        self.idle = []
+
+    async def _connect(self):
+        return await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.ssl_context,
+                                    server_hostname=self.host if self.ssl_context else None),
+            self.timeout)
+
+    async def _exchange(self, conn, request, method):
+        reader, writer = conn
+        writer.write(request)
+        await writer.drain()
+        status, headers = await asyncio.wait_for(read_head(reader), self.timeout)
+        reusable = await asyncio.wait_for(drain_body(reader, method, status, headers), self.timeout)
+        return status, headers, reusable
+
+    async def request(self, method, target, extra_headers=()):
+        """Send one request; returns (status, headers) with lower-case header names"""
+        host = self.host if self.port in (80, 443) else f"{self.host}:{self.port}"
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host}", f"User-Agent: {USER_AGENT}",
+                 'Accept: */*', 'Connection: keep-alive', *extra_headers]
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        async with self.semaphore:
+            # An idle connection may have been closed by the server; retry once on a fresh one
+            while self.idle:
+                conn = self.idle.pop()
+                try:
+                    result = await self._exchange(conn, request, method)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn[1].close()
+                    break
+                except Exception:
+                    conn[1].close()
+                    raise
+                return self._release(conn, result)
+
+            conn = await self._connect()
+            try:
+                result = await self._exchange(conn, request, method)
+            except Exception:
+                conn[1].close()
+                raise
+            return self._release(conn, result)
+
+    def _release(self, conn, result):
+        status, headers, reusable = result
+        if reusable:
+            self.idle.append(conn)
+        else:
+            conn[1].close()
+        return status, headers
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+async def read_head(reader):
+    """Status code and headers of a response"""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionResetError('connection closed before the response')
+    parts = line.decode('latin-1').split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+        raise ValueError(f"bad status line: {line[:80]!r}")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return int(parts[1]), headers
+
+
+async def drain_body(reader, method, status, headers):
+    """Consume a short body so the connection can be reused; returns whether it can"""
+    if headers.get('connection', '').lower() == 'close':
+        return False
+    if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+        return True
+    length = headers.get('content-length')
+    if 'transfer-encoding' in headers or not length or not length.isdigit() or int(length) > MAX_DRAIN:
+        return False
+    await reader.readexactly(int(length))
+    return True
+
+
+def response_size(method, headers):
+    """Full size of the resource from Content-Range (ranged GET) or Content-Length"""
+    content_range = headers.get('content-range', '')
+    total = content_range.rpartition('/')[2]
+    if total.isdigit():
+        return int(total)
+    length = headers.get('content-length', '')
+    if length.isdigit() and (method == 'HEAD' or 'content-range' not in headers):
+        return int(length)
+    return None
+
+
+class LinkChecker:
+    """Checks URLs concurrently over per-host connection pools"""
+
+    def __init__(self, concurrency=32, per_host=4, timeout=15.0):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.ssl_context = ssl.create_default_context()
+        self.pools = {}
+
+    def pool(self, url):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        if key not in self.pools:
+            self.pools[key] = HostPool(scheme, parts.hostname, port, self.per_host, self.timeout, self.ssl_context)
+        return self.pools[key]
+
+    async def fetch(self, url):
+        """HEAD, falling back to a one-byte ranged GET; returns (method, status, headers)"""
+        parts = urlsplit(url)
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        pool = self.pool(url)
+        try:
+            status, headers = await pool.request('HEAD', target)
+            if status not in HEAD_UNSUPPORTED:
+                return 'HEAD', status, headers
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        status, headers = await pool.request('GET', target, ('Range: bytes=0-0',))
+        return 'GET', status, headers
+
+    async def check(self, url):
+        """Result entry for one URL, following redirects"""
+        entry = {'status': None, 'contentType': None, 'size': None}
+        async with self.semaphore:
+            try:
+                current = url
+                for _ in range(MAX_REDIRECTS + 1):
+                    method, status, headers = await self.fetch(current)
+                    if status in REDIRECTS and headers.get('location'):
+                        current = urljoin(current, headers['location'])
+                        continue
+                    break
+                entry['status'] = status
+                entry['contentType'] = headers.get('content-type', '').split(';')[0].strip() or None
+                entry['size'] = response_size(method, headers)
+                if headers.get('etag'):
+                    entry['etag'] = headers['etag']
+                if current != url:
+                    entry['finalUrl'] = current
+            except Exception as e:
+                entry['error'] = f"{type(e).__name__}: {e}"
+        entry['checkedAt'] = int(time.time())
+        return url, entry
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
+
+
+async def check_urls(urls, cache, concurrency=32, per_host=4, timeout=15.0, progress_every=200):
+    """Check the URLs and store the results in the cache; returns the number checked"""
+    checker = LinkChecker(concurrency, per_host, timeout)
+    done = 0
+    try:
+        for future in asyncio.as_completed([checker.check(url) for url in urls]):
+            url, entry = await future
+            cache.results[url] = entry
+            done += 1
+            if progress_every and done % progress_every == 0:
+                print(f"  ... {done}/{len(urls)} checked")
+    finally:
+        checker.close()
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that media and tour URLs in the catalog are alive')
+    parser.add_argument('--developers', default=None, help='comma-separated developers to check')
+    parser.add_argument('--urls', default=None, help='file with one URL per line to check instead of the catalog')
+    parser.add_argument('--ttl', type=float, default=168, help='hours before a result is re-checked (default: 168)')
+    parser.add_argument('--full', action='store_true', help='re-check every URL, ignoring the cache')
+    parser.add_argument('--concurrency', type=int, default=32, help='requests in flight overall')
+    parser.add_argument('--per-host', type=int, default=4, help='connections per host')
+    parser.add_argument('--timeout', type=float, default=15.0, help='seconds per connect/response')
+    parser.add_argument('--cache', default=None, help='cache path (default: .cache/link-cache.json)')
+    args = parser.parse_args()
+
+    data_dir = Path(__file__).resolve().parent.parent / 'public' / 'data'
+    cache = LinkCache.load(data_dir, args.cache)
+
+    if args.urls:
+        with open(args.urls, 'r', encoding='utf-8') as f:
+            urls = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+    else:
+        urls = catalog_urls(data_dir, select_developers(data_dir, args.developers))
+
+    now = time.time()
+    stale = urls if args.full else [url for url in urls if not cache.is_fresh(url, args.ttl * 3600, now)]
+    print(f"🔗 {len(urls)} URLs, {len(stale)} to check ({len(urls) - len(stale)} cached)")
+
+    started = time.perf_counter()
+    checked = asyncio.run(check_urls(stale, cache, args.concurrency, args.per_host, args.timeout))
+    cache.save()
+
+    results = [cache.results[url] for url in urls if url in cache.results]
+    dead = sum(1 for entry in results if entry.get('status') in DEAD_STATUSES)
+    failed = sum(1 for entry in results if not entry.get('status'))
+    print(f"\n📊 Checked {checked} in {time.perf_counter() - started:.1f}s: "
+          f"{len(results) - dead - failed} alive, {dead} dead, {failed} unreachable")
+    for url in urls:
+        entry = cache.results.get(url, {})
+        if entry.get('status') in DEAD_STATUSES:
+            print(f"   ❌ {entry['status']} {url}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Sharded listing indexes built from the per-project index.json files.
+
+Listing pages and filters only need a few fields of each project, so instead
+of opening every projects/<slug>/index.json they can read:
+- public/data/<dev>/listings.json - one shard per developer
+- public/data/listings.json       - every developer's rows in one file
+
+Each file holds the projected rows (LISTING_FIELDS) and a "version" hash of its
+content, which changes only when a listed field changes. The global file also
+lists the version of each shard it was built from.
+
+Builds are incremental through the pipeline manifest ("listings" stage): a
+developer shard is rebuilt only when a member project was added, removed or
+changed since the last build, and only the changed projects are re-read (the
+other rows come from the existing shard). The global file is rebuilt from the
+shards only when one of them changed or the developer order did (or --full).
+
+The listing files are generated, like the caches, and are not committed.
+
+Usage: python scripts/listing_index.py [--developers emaar,damac] [--full]
+"""
+
+import argparse
+import hashlib
+from pathlib import Path
+
+from discovery import select_developers
+from jsonio import dumps, read_json, write_json
+from manifest import Manifest, add_manifest_arguments
+
+# Bump when LISTING_FIELDS or the row format changes so every shard is rebuilt
+LISTING_VERSION = 2
+
+LISTING_FIELDS = ('slug', 'projectName', 'area', 'priceMin', 'priceMax', 'bedrooms', 'heroImage', 'coordinates')
+
+SHARD_NAME = 'listings.json'
+
+
+def shard_path(data_dir, dev):
+    return Path(data_dir) / dev / SHARD_NAME
+
+
+def global_path(data_dir):
+    return Path(data_dir) / SHARD_NAME
+
+
+def content_version(rows):
+    """Short hash of the rows as they are written"""
+    return hashlib.sha256(dumps(rows)).hexdigest()[:16]
+
+
+def listing_row(project, slug):
+    """Projected listing fields of one project; slug is its folder name (the URL slug)"""
+    row = {field: project.get(field) for field in LISTING_FIELDS}
+    row['slug'] = slug
+    # Legacy and standardized files (cleanup_data moves heroImage to image_hero), as catalog_db reads them
+    if row['heroImage'] is None:
+        row['heroImage'] = project.get('image_hero')
+    for field, legacy in (('projectName', 'name'), ('area', 'area')):
+        if row[field] is None and (project.get(f"{legacy}_en") or project.get(f"{legacy}_ar")):
+            row[field] = {'en': project.get(f"{legacy}_en"), 'ar': project.get(f"{legacy}_ar")}
+    return row
+
+
+def member_files(data_dir, dev):
+    """index.json of every listed project of a developer, by folder name"""
+    projects_dir = Path(data_dir) / dev / 'projects'
+    if not projects_dir.exists():
+        return {}
+    return {
+        folder.name: folder / 'index.json'
+        for folder in sorted(projects_dir.iterdir())
+        if folder.is_dir() and not folder.name.startswith('_') and (folder / 'index.json').exists()
+    }
+
+
+def read_shard(path):
+    try:
+        shard = read_json(path)
+    except (OSError, ValueError):
+        return None
+    return shard if isinstance(shard, dict) and isinstance(shard.get('projects'), list) else None
+
+
+def build_developer_shard(data_dir, dev, manifest, full=False):
+    """Rebuild the developer's shard if its members changed; returns (rows re-read, shard written)"""
+    path = shard_path(data_dir, dev)
+    members = member_files(data_dir, dev)
+    if not members:
+        return 0, False
+
+    shard = None if full else read_shard(path)
+    # Rows of the previous build, by project folder
+    previous = {}
+    if shard and shard.get('developer') == dev:
+        previous = {row.get('slug'): row for row in shard['projects']}
+
+    stale = [
+        name for name, index_file in members.items()
+        if name not in previous or not manifest.is_current('listings', index_file, LISTING_VERSION)
+    ]
+    if not stale and set(previous) == set(members):
+        return 0, False
+
+    rows = []
+    reread = 0
+    for name, index_file in members.items():
+        if name in previous and name not in stale:
+            rows.append(previous[name])
+            continue
+        try:
+            project = read_json(index_file)
+        except Exception as e:
+            print(f"  ⚠️ Listing skipped: {dev}/{name}: {e}")
+            continue
+        rows.append(listing_row(project, name))
+        reread += 1
+        manifest.record('listings', index_file, LISTING_VERSION)
+
+    written = write_json(path, {
+        'version': content_version(rows),
+        'developer': dev,
+        'count': len(rows),
+        'projects': rows,
+    })
+    return reread, written
+
+
+def build_global_index(data_dir, developers=None, full=False):
+    """Combine the developer shards into the global listing file if any shard changed (always if full)"""
+    developers = select_developers(data_dir, developers)
+    shards = {}
+    for dev in developers:
+        shard = read_shard(shard_path(data_dir, dev))
+        if shard:
+            shards[dev] = shard
+
+    path = global_path(data_dir)
+    versions = {dev: shard.get('version') for dev, shard in shards.items()}
+    current = read_shard(path)
+    # Compared as item lists, so a new developer order also rebuilds the file
+    if not full and current and list(current.get('shards', {}).items()) == list(versions.items()):
+        return False
+
+    rows = [
+        {'developer': dev, **row}
+        for dev, shard in shards.items()
+        for row in shard['projects']
+    ]
+    return write_json(path, {
+        'version': content_version(rows),
+        'count': len(rows),
+        'shards': versions,
+        'projects': rows,
+    })
+
+
+def build_listing_indexes(data_dir, manifest, developers=None, full=False):
+    """Refresh the selected developers' shards, then the global file; returns {rebuilt dev: rows re-read}"""
+    developers = select_developers(data_dir, developers)
+    rebuilt = {}
+    for dev in developers:
+        count, written = build_developer_shard(data_dir, dev, manifest, full)
+        if written:
+            rebuilt[dev] = count
+            print(f"  🗂️  {dev}/{SHARD_NAME}: {count} projects re-read")
+    if build_global_index(data_dir, full=full):
+        print(f"  🗂️  {SHARD_NAME}: rebuilt from developer shards")
+    return rebuilt
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the per-developer and global listing shards')
+    parser.add_argument('--developers', default=None,
+                        help='comma-separated developers to refresh')
+    add_manifest_arguments(parser)
+    args = parser.parse_args()
+
+    data_dir = Path(__file__).resolve().parent.parent / 'public' / 'data'
+    manifest = Manifest.load(data_dir, args.manifest)
+    developers = select_developers(data_dir, args.developers)
+
+    print("🗂️  Building listing indexes...")
+    rebuilt = build_listing_indexes(data_dir, manifest, developers, args.full)
+    manifest.save()
+    print(f"\n📊 {len(rebuilt)} of {len(developers)} shards rebuilt, {sum(rebuilt.values())} projects re-read")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Content-hash manifest for incremental runs of the data scripts.
+
+Records, per stage, the hash of each project file as the stage last left it,
+the stage's transform version and the hashes of any other inputs (such as the
+developer's PropertyFinder dump). A project is skipped when none of these
+changed since the last run.
+
+File hashes are cached by (size, mtime_ns), so unchanged files are not re-read.
+A sharded run (pipeline.py --shard) hands its projects' entries to the
+reducer as a partial manifest (extract/merge).
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+from jsonio import read_json, write_cache
+
+MANIFEST_VERSION = 1
+
+
+def default_manifest_path(data_dir):
+    """.cache/pipeline-manifest.json at the repo root (data_dir is <root>/public/data)"""
+    return Path(data_dir).resolve().parent.parent / '.cache' / 'pipeline-manifest.json'
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Manifest:
+    """Persistent per-stage record of processed inputs"""
+
+    def __init__(self, path, data_dir, files=None, stages=None):
+        self.path = Path(path)
+        self.data_dir = Path(data_dir).resolve()
+        self.files = files or {}
+        self.stages = stages or {}
+
+    @classmethod
+    def load(cls, data_dir, path=None):
+        path = Path(path) if path else default_manifest_path(data_dir)
+        try:
+            data = read_json(path)
+            if data.get('version') == MANIFEST_VERSION:
+                return cls(path, data_dir, data.get('files'), data.get('stages'))
+        except (OSError, ValueError):
+            pass
+        return cls(path, data_dir)
+
+    def key(self, path):
+        """Manifest key: path relative to the data dir when inside it"""
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.data_dir).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def file_hash(self, path):
+        """sha256 of a file, reusing the cached hash while size and mtime are unchanged"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = self.key(path)
+        cached = self.files.get(key)
+        if cached and cached['size'] == st.st_size and cached['mtime_ns'] == st.st_mtime_ns:
+            return cached['sha256']
+        digest = sha256_file(path)
+        self.files[key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest}
+        return digest
+
+    def is_current(self, stage, path, version, deps=None):
+        """True if the stage already processed this exact file with the same version and deps"""
+        entry = self.stages.get(stage, {}).get(self.key(path))
+        if not entry:
+            return False
+        if entry['version'] != version or entry.get('deps') != (deps or {}):
+            return False
+        return entry['sha256'] == self.file_hash(path)
+
+    def recorded_deps(self, stage, path):
+        """Deps the stage last recorded for the file ({} if none)"""
+        entry = self.stages.get(stage, {}).get(self.key(path))
+        return (entry or {}).get('deps') or {}
+
+    def record(self, stage, path, version, deps=None):
+        """Remember the file as the stage left it"""
+        digest = self.file_hash(path)
+        if digest is None:
+            self.forget(path)
+            return
+        self.stages.setdefault(stage, {})[self.key(path)] = {
+            'sha256': digest,
+            'version': version,
+            'deps': deps or {},
+        }
+
+    def rewrite(self, stage, path, write):
+        """Call write() (which rewrites the file, returning True if it did) and keep the
+        stage's entry current if it was before, e.g. for a step that runs after the stage"""
+        entry = self.stages.get(stage, {}).get(self.key(path))
+        current = bool(entry) and entry['sha256'] == self.file_hash(path)
+        written = write()
+        if written and current:
+            self.record(stage, path, entry['version'], entry.get('deps'))
+        return written
+
+    def forget(self, path):
+        """Drop a file (e.g. archived) from every stage"""
+        key = self.key(path)
+        self.files.pop(key, None)
+        for entries in self.stages.values():
+            entries.pop(key, None)
+
+    def extract(self, keys, stages):
+        """Partial manifest (files and the given stages) for the keys, e.g. one shard's projects"""
+        keys = set(keys)
+        return {
+            'files': {key: entry for key, entry in self.files.items() if key in keys},
+            'stages': {
+                stage: {key: entry for key, entry in self.stages.get(stage, {}).items() if key in keys}
+                for stage in stages
+            },
+        }
+
+    def merge(self, partial):
+        """Take over the entries of a partial manifest from extract"""
+        self.files.update(partial['files'])
+        for stage, entries in partial['stages'].items():
+            self.stages.setdefault(stage, {}).update(entries)
+
+    def prune(self):
+        """Drop entries for files that no longer exist"""
+        for key in list(self.files):
+            if not (self.data_dir / key).exists():
+                self.forget(self.data_dir / key)
+
+    def save(self):
+        self.prune()
+        write_cache(self.path, {'version': MANIFEST_VERSION, 'files': self.files, 'stages': self.stages})
+
+
+def add_manifest_arguments(parser):
+    """Add the --full / --manifest options shared by the data scripts"""
+    parser.add_argument('--full', action='store_true',
+                        help='process every project, ignoring the incremental manifest')
+    parser.add_argument('--manifest', default=None,
+                        help='manifest path (default: .cache/pipeline-manifest.json)')
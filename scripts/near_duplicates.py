@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate project detection with MinHash/LSH.
+
+Each project's slug and projectName are reduced to character trigrams
+(developer brand words and "by-<developer>" removed). A densified
+one-permutation MinHash signature is computed per project, and LSH banding
+yields candidate pairs in near-linear time across all developers. Only
+candidates are scored in full, using the trigrams, coordinates and
+gallery/hero image URLs:
+- name containment (the shorter name's trigrams found in the longer one)
+  must reach NAME_CONTAINMENT; community-wide galleries make shared images
+  alone no evidence
+- distance between coordinates lowers the score, shared images raise it
+
+Slugs with different variant markers (-phase-N, -marine-N, frond letters,
+building numbers) are never paired, so phases of one development stay
+distinct. Nor is a master community name ("Sobha Hartland") paired with the
+projects named after it ("Hartland Estates", "Hartland Greens", ...).
+
+Same-developer pairs are grouped into clusters, and the most complete project
+is proposed as the main one (never one EXACT_DUPLICATES merges away). Suggestions are written for review to
+report/duplicate-suggestions.json. Clusters marked "approved": true there are
+merged by cleanup_data.py (merge_project_data) along with EXACT_DUPLICATES.
+Approvals survive regeneration.
+
+Usage: python scripts/near_duplicates.py [--threshold 0.8] [--output PATH]
+"""
+
+import argparse
+import hashlib
+import math
+import re
+from pathlib import Path
+
+from discovery import discover_developers
+from jsonio import read_json, write_json
+from records import iter_records
+
+DEFAULT_SUGGESTIONS = Path(__file__).resolve().parent.parent / 'report' / 'duplicate-suggestions.json'
+
+# Signature size and LSH banding: 16 bands of 2 rows catch name pairs with
+# Jaccard 0.3 (e.g. "orania" / "orania-at-the-valley") ~80% of the time, 0.5+ ~always
+NUM_BINS = 32
+BAND_ROWS = 2
+# Buckets larger than this hold only very common trigrams; skipped
+MAX_BUCKET = 200
+# Keeps densified bins distinct from real minimums borrowed from another bin
+_ROTATION = 1 << 64
+# Pairs further apart than this are never duplicates
+MAX_DISTANCE_KM = 3.0
+# Share of the shorter name's trigrams that must appear in the longer name
+NAME_CONTAINMENT = 0.9
+# Names with fewer trigrams than this ("may", "june") only match exactly
+MIN_NAME_GRAMS = 5
+# A name contained in this many other names of its developer ("hartland": Hartland
+# Estates, Hartland Greens, ...) is a master community; its pairs are no evidence
+MASTER_NAMES = 3
+
+# Slug tokens that tell variants apart: numbers, roman numerals, single letters
+VARIANT_TOKEN = re.compile(r'^(?:\d+|[ivx]+|[a-z])$')
+BRAND_WORDS = {'emaar', 'damac', 'sobha', 'nakheel', 'binghatti', 'binghati', 'properties', 'by', 'the', 'at'}
+WORD_SPLIT = re.compile(r'[^a-z0-9]+')
+
+# BRAND_WORDS plus every discovered developer folder name, built on first use
+_brand_words = None
+
+
+def brand_words():
+    global _brand_words
+    if _brand_words is None:
+        _brand_words = BRAND_WORDS | set(discover_developers())
+    return _brand_words
+
+
+def variant_markers(slug):
+    """Sorted variant tokens of a slug ('phase-2' -> ('2',)); pairs must have identical markers"""
+    brands = brand_words()
+    return tuple(sorted(
+        token.lstrip('0') or '0'
+        for token in slug.lower().split('-')
+        if VARIANT_TOKEN.match(token) and token not in brands
+    ))
+
+
+def name_key(text):
+    """Lowercased words without developer brand words, joined by spaces"""
+    brands = brand_words()
+    return ' '.join(w for w in WORD_SPLIT.split(str(text).lower()) if w and w not in brands)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Record:
+    """Features of one project used for matching"""
+
+    __slots__ = ('developer', 'slug', 'name', 'grams', 'images', 'coords', 'variants', 'completeness')
+
+    def __init__(self, developer, slug, project):
+        self.developer = developer
+        self.slug = slug
+        self.name = name_key(project.name_en or '') or name_key(slug)
+        self.grams = trigrams(name_key(slug)) | trigrams(self.name)
+        self.images = {url for url in project.images if isinstance(url, str)}
+        coords = project.lat_lng
+        self.coords = coords if coords and (coords[0] or coords[1]) else None
+        self.variants = variant_markers(slug)
+        self.completeness = project.filled_fields() + len(self.images)
+
+
+def feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def signature(features):
+    """Densified one-permutation MinHash over NUM_BINS bins
+
+    Each bin keeps the minimum hash of the features falling into it; empty
+    bins borrow from the next non-empty bin (rotation), so short names still
+    fill every band.
+    """
+    bins = [None] * NUM_BINS
+    for feature in features:
+        h = feature_hash(feature)
+        b = h % NUM_BINS
+        if bins[b] is None or h < bins[b]:
+            bins[b] = h
+    if all(value is None for value in bins):
+        return bins
+    dense = list(bins)
+    for b in range(NUM_BINS):
+        step = 0
+        while bins[(b + step) % NUM_BINS] is None:
+            step += 1
+        if step:
+            dense[b] = bins[(b + step) % NUM_BINS] + step * _ROTATION
+    return dense
+
+
+def candidate_pairs(signatures):
+    """Index pairs sharing at least one LSH band"""
+    pairs = set()
+    for start in range(0, NUM_BINS, BAND_ROWS):
+        buckets = {}
+        for i, sig in enumerate(signatures):
+            band = tuple(sig[start:start + BAND_ROWS])
+            if None in band:
+                continue
+            buckets.setdefault(band, []).append(i)
+        for members in buckets.values():
+            if 1 < len(members) <= MAX_BUCKET:
+                for x in range(len(members)):
+                    for y in range(x + 1, len(members)):
+                        pairs.add((members[x], members[y]))
+    return pairs
+
+
+def haversine_km(a, b):
+    lat1, lng1, lat2, lng2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(h))
+
+
+def score_pair(a, b):
+    """Similarity details for a candidate pair, or None if it cannot be a duplicate"""
+    if a.variants != b.variants:
+        return None
+    distance = haversine_km(a.coords, b.coords) if a.coords and b.coords else None
+    if distance is not None and distance > MAX_DISTANCE_KM:
+        return None
+
+    smaller = min(len(a.grams), len(b.grams))
+    if smaller < MIN_NAME_GRAMS and a.grams != b.grams:
+        return None
+    name = len(a.grams & b.grams) / (smaller or 1)
+    if name < NAME_CONTAINMENT:
+        return None
+    images = len(a.images & b.images) / len(a.images | b.images) if a.images and b.images else 0.0
+    score = name * (1 - (distance or 0) / (4 * MAX_DISTANCE_KM)) + 0.1 * images
+    return {
+        'score': round(min(score, 1.0), 3),
+        'name': round(name, 3),
+        'images': round(images, 3),
+        'distanceKm': None if distance is None else round(distance, 3),
+    }
+
+
+def contained_in(a, b):
+    """True if a's name is part of b's longer, different name (same developer and variants)"""
+    return (a.developer == b.developer and a.variants == b.variants and len(a.grams) < len(b.grams)
+            and len(a.grams & b.grams) >= NAME_CONTAINMENT * len(a.grams))
+
+
+def find_pairs(records, threshold):
+    """Scored candidate pairs at or above threshold, as (i, j, details)"""
+    signatures = [signature(r.grams) for r in records]
+    candidates = candidate_pairs(signatures)
+    containing = [0] * len(records)
+    for i, j in candidates:
+        for x, y in ((i, j), (j, i)):
+            if contained_in(records[x], records[y]):
+                containing[x] += 1
+    pairs = []
+    for i, j in candidates:
+        if any(containing[x] >= MASTER_NAMES and contained_in(records[x], records[y]) for x, y in ((i, j), (j, i))):
+            continue
+        details = score_pair(records[i], records[j])
+        if details and details['score'] >= threshold:
+            pairs.append((min(i, j), max(i, j), details))
+    return sorted(pairs, key=lambda p: (p[0], p[1]))
+
+
+def cluster_pairs(records, pairs):
+    """Union-find over same-developer pairs; returns lists of record indexes"""
+    parent = list(range(len(records)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j, _ in pairs:
+        if records[i].developer == records[j].developer:
+            parent[find(i)] = find(j)
+
+    groups = {}
+    for i, _, _ in pairs:
+        groups.setdefault(find(i), set())
+    for i in range(len(records)):
+        root = find(i)
+        if root in groups:
+            groups[root].add(i)
+    return [sorted(members) for members in groups.values() if len(members) > 1]
+
+
+def load_records(data_dir, developers=None):
+    return [
+        Record(index_file.parent.parent.parent.name, index_file.parent.name, project)
+        for index_file, project in iter_records(data_dir, 'projects', developers)
+    ]
+
+
+def build_suggestions(records, threshold, previous=None, exact=None):
+    """Suggestion document: clusters (with main/duplicates) and cross-developer pairs
+
+    exact is EXACT_DUPLICATES ({developer: {duplicate: main}}); a member it
+    already merges away is not proposed as a main, so an approved cluster
+    never reverses one of its entries.
+    """
+    pairs = find_pairs(records, threshold)
+    approved = {
+        (c['developer'], tuple(sorted([c['main']] + c['duplicates']))): c
+        for c in (previous or {}).get('clusters', []) if c.get('approved')
+    }
+
+    clusters = []
+    for members in cluster_pairs(records, pairs):
+        member_set = set(members)
+        dev = records[members[0]].developer
+        merged = (exact or {}).get(dev, {})
+        kept = [i for i in members if records[i].slug not in merged] or members
+        main = max(kept, key=lambda i: (records[i].completeness, -len(records[i].slug), records[i].slug))
+        key = (dev, tuple(sorted(records[i].slug for i in members)))
+        reviewed = approved.get(key)
+        clusters.append({
+            'developer': dev,
+            'main': reviewed['main'] if reviewed else records[main].slug,
+            'duplicates': sorted(records[i].slug for i in members if i != main) if not reviewed else reviewed['duplicates'],
+            'approved': bool(reviewed),
+            'pairs': [
+                {'a': records[i].slug, 'b': records[j].slug, **details}
+                for i, j, details in pairs if i in member_set and j in member_set
+            ],
+        })
+    clusters.sort(key=lambda c: (c['developer'], c['main']))
+
+    cross = [
+        {'a': f"{records[i].developer}/{records[i].slug}", 'b': f"{records[j].developer}/{records[j].slug}", **details}
+        for i, j, details in pairs if records[i].developer != records[j].developer
+    ]
+    return {
+        'threshold': threshold,
+        'projects': len(records),
+        'clusters': clusters,
+        'crossDeveloper': cross,
+    }
+
+
+def approved_merges(dev, path=DEFAULT_SUGGESTIONS):
+    """{duplicate slug: main slug} for the developer's approved suggestion clusters"""
+    try:
+        suggestions = read_json(path)
+    except (OSError, ValueError):
+        return {}
+    merges = {}
+    for cluster in suggestions.get('clusters', []):
+        if cluster.get('approved') and cluster.get('developer') == dev:
+            for dup in cluster.get('duplicates', []):
+                merges[dup] = cluster['main']
+    return merges
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Suggest near-duplicate project clusters for review')
+    parser.add_argument('--threshold', type=float, default=0.8, help='minimum pair score to suggest')
+    parser.add_argument('--output', default=str(DEFAULT_SUGGESTIONS), help='suggestions JSON (approvals are kept)')
+    args = parser.parse_args()
+
+    data_dir = Path(__file__).resolve().parent.parent / 'public' / 'data'
+    output = Path(args.output)
+    previous = read_json(output) if output.exists() else None
+
+    print("🔍 Finding near-duplicate projects...")
+    # Imported here: cleanup_data imports this module
+    from cleanup_data import EXACT_DUPLICATES
+
+    records = load_records(data_dir)
+    suggestions = build_suggestions(records, args.threshold, previous, EXACT_DUPLICATES)
+
+    for cluster in suggestions['clusters']:
+        mark = '✅' if cluster['approved'] else '❔'
+        print(f"  {mark} {cluster['developer']}: {', '.join(cluster['duplicates'])} -> {cluster['main']}")
+    for pair in suggestions['crossDeveloper']:
+        print(f"  ↔️  {pair['a']} ~ {pair['b']} ({pair['score']})")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    write_json(output, suggestions)
+    print(f"\n📊 {len(records)} projects, {len(suggestions['clusters'])} clusters, "
+          f"{len(suggestions['crossDeveloper'])} cross-developer pairs")
+    print(f"   Review and set \"approved\": true in {output} to merge with cleanup_data.py")
+
+
+if __name__ == '__main__':
+    main()
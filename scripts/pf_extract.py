@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Streaming PropertyFinder project extractor for large HTML/.md dumps.
+
+The dump is memory-mapped and scanned incrementally:
+1. Locate the __NEXT_DATA__ script tag without reading the file into memory
+2. Walk props.pageProps.devResult.projects.data, skipping unrelated subtrees
+   structurally (strings and brackets only, nothing is decoded)
+3. Decode the projects array through a small sliding text window, one
+   project at a time
+
+Peak memory is bounded by the window and the project being decoded, not the
+dump size (the HTML around them is never decoded).
+Before anything is decoded, the projects array is skipped over structurally
+to check that it is complete. If the dump has no usable __NEXT_DATA__
+payload, or it breaks off part-way, each application/json script is decoded
+on its own and searched for a projects array, as before.
+"""
+
+import codecs
+import json
+import mmap
+import re
+
+from jsonio import loads
+
+NEXT_DATA_PATH = ('props', 'pageProps', 'devResult', 'projects', 'data')
+
+# Bytes decoded at a time while reading the projects array
+WINDOW_SIZE = 1 << 20
+
+_NEXT_DATA_TAG = b'id="__NEXT_DATA__"'
+_JSON_SCRIPT = re.compile(rb'<script[^>]*type="application/json"[^>]*>')
+_SCRIPT_END = b'</script>'
+
+_STRUCT = re.compile(rb'["{}\[\]]')
+# Rest of a JSON string after its opening quote, up to and including the closing quote
+_STRING_REST = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_WHITESPACE = re.compile(rb'[ \t\r\n]*')
+_SCALAR = re.compile(rb'[^,}\]\s]*')
+_TEXT_WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+_QUOTE, _COMMA, _COLON = ord('"'), ord(','), ord(':')
+_OPEN_OBJ, _CLOSE_OBJ = ord('{'), ord('}')
+_OPEN_ARR, _CLOSE_ARR = ord('['), ord(']')
+
+
+def _skip_ws(buf, pos):
+    return _WHITESPACE.match(buf, pos).end()
+
+
+def _expect(buf, pos, char):
+    if pos >= len(buf) or buf[pos] != char:
+        raise ValueError(f"expected {chr(char)!r} at byte {pos}")
+
+
+def _string_end(buf, pos):
+    """End of a JSON string whose opening quote is at pos"""
+    m = _STRING_REST.match(buf, pos + 1)
+    if not m:
+        raise ValueError(f"unterminated string at byte {pos}")
+    return m.end()
+
+
+def _skip_value(buf, pos):
+    """End of the JSON value starting at pos, without decoding it"""
+    char = buf[pos]
+    if char == _QUOTE:
+        return _string_end(buf, pos)
+    if char not in (_OPEN_OBJ, _OPEN_ARR):
+        return _SCALAR.match(buf, pos).end()
+
+    depth = 0
+    while True:
+        m = _STRUCT.search(buf, pos)
+        if not m:
+            raise ValueError(f"unterminated container at byte {pos}")
+        char = buf[m.start()]
+        if char == _QUOTE:
+            pos = _string_end(buf, m.start())
+            continue
+        pos = m.end()
+        if char in (_OPEN_OBJ, _OPEN_ARR):
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def _object_member(buf, pos, key):
+    """Position of the value for key in the object at pos, or None"""
+    pos = _skip_ws(buf, pos)
+    if pos >= len(buf) or buf[pos] != _OPEN_OBJ:
+        return None
+    pos = _skip_ws(buf, pos + 1)
+    if buf[pos] == _CLOSE_OBJ:
+        return None
+
+    while True:
+        _expect(buf, pos, _QUOTE)
+        end = _string_end(buf, pos)
+        name = loads(buf[pos:end])
+        pos = _skip_ws(buf, end)
+        _expect(buf, pos, _COLON)
+        pos = _skip_ws(buf, pos + 1)
+        if name == key:
+            return pos
+
+        pos = _skip_ws(buf, _skip_value(buf, pos))
+        if buf[pos] == _COMMA:
+            pos = _skip_ws(buf, pos + 1)
+        else:
+            _expect(buf, pos, _CLOSE_OBJ)
+            return None
+
+
+class _TextWindow:
+    """Decoded text over a slice of the byte buffer, refilled chunk by chunk"""
+
+    def __init__(self, buf, offset):
+        self.buf = buf
+        self.offset = offset
+        self.text = ''
+        self.pos = 0
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.decoder = json.JSONDecoder()
+
+    def fill(self, size=WINDOW_SIZE):
+        """Drop consumed text and append up to size more bytes; False at end of buffer"""
+        if self.offset >= len(self.buf):
+            return False
+        end = min(self.offset + size, len(self.buf))
+        chunk = self.utf8.decode(self.buf[self.offset:end], final=end == len(self.buf))
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        self.offset = end
+        return True
+
+    def skip_ws(self):
+        while True:
+            self.pos = _TEXT_WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or not self.fill():
+                return
+
+    def peek(self):
+        return self.text[self.pos] if self.pos < len(self.text) else ''
+
+    def decode(self):
+        """Decode the value at the cursor, growing the window if it is cut off"""
+        size = WINDOW_SIZE
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                value, end = None, None
+
+            # A value ending exactly at the window edge may itself be truncated
+            if end is not None and end < len(self.text):
+                self.pos = end
+                return value
+            if not self.fill(size):
+                if end is None:
+                    raise ValueError(f"truncated JSON value near byte {self.offset}")
+                self.pos = end
+                return value
+            size *= 2
+
+
+def _iter_array(buf, pos):
+    """Decode and yield the elements of the array at pos one by one"""
+    pos = _skip_ws(buf, pos)
+    if pos >= len(buf) or buf[pos] != _OPEN_ARR:
+        return
+
+    window = _TextWindow(buf, pos + 1)
+    window.skip_ws()
+    if window.peek() == ']':
+        return
+
+    while True:
+        yield window.decode()
+        window.skip_ws()
+        char = window.peek()
+        if char == ',':
+            window.pos += 1
+            window.skip_ws()
+        elif char == ']':
+            return
+        else:
+            raise ValueError(f"expected ',' or ']' near byte {window.offset}")
+
+
+def next_data_array(buf):
+    """Position of the __NEXT_DATA__ devResult.projects.data array, or None"""
+    tag = buf.find(_NEXT_DATA_TAG)
+    if tag < 0:
+        return None
+    pos = buf.find(b'>', tag)
+    if pos < 0:
+        return None
+
+    pos += 1
+    for key in NEXT_DATA_PATH:
+        pos = _object_member(buf, pos, key)
+        if pos is None:
+            return None
+    pos = _skip_ws(buf, pos)
+    return pos if pos < len(buf) and buf[pos] == _OPEN_ARR else None
+
+
+def iter_next_data_projects(buf):
+    """Yield projects from the __NEXT_DATA__ devResult.projects.data array"""
+    pos = next_data_array(buf)
+    if pos is not None:
+        yield from _iter_array(buf, pos)
+
+
+def find_projects(obj):
+    """Recursively search a decoded payload for a projects array"""
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            if k == 'projects' and isinstance(v, list) and v and isinstance(v[0], dict) and 'title' in v[0]:
+                return v
+            result = find_projects(v)
+            if result:
+                return result
+    elif isinstance(obj, list):
+        for item in obj:
+            result = find_projects(item)
+            if result:
+                return result
+    return None
+
+
+def iter_script_projects(buf):
+    """Fallback: decode each application/json script on its own and search it for projects"""
+    for m in _JSON_SCRIPT.finditer(buf):
+        end = buf.find(_SCRIPT_END, m.end())
+        if end < 0:
+            return
+        try:
+            projects = find_projects(loads(buf[m.end():end]))
+        except ValueError:
+            continue
+        if projects:
+            yield from projects
+            return
+
+
+def iter_pf_projects(filepath):
+    """Stream PropertyFinder projects out of an HTML/.md dump"""
+    try:
+        with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            # The whole array is skipped over structurally first (nothing decoded), so a
+            # payload that breaks off part-way falls back to method 2 before any project
+            # is passed on
+            try:
+                pos = next_data_array(buf)
+                if pos is not None:
+                    _skip_value(buf, pos)
+            except (ValueError, IndexError):
+                pos = None
+
+            found = False
+            if pos is not None:
+                try:
+                    for project in _iter_array(buf, pos):
+                        found = True
+                        yield project
+                except (ValueError, IndexError) as e:
+                    print(f"Error extracting from {filepath}: {e}")
+            if not found:
+                yield from iter_script_projects(buf)
+    except (OSError, ValueError) as e:
+        # ValueError: mmap of an empty file
+        print(f"Error extracting from {filepath}: {e}")
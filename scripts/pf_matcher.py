@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Indexed PropertyFinder project matcher.
+
+Replaces the linear SequenceMatcher scan over every PropertyFinder listing:
+1. Exact slug lookup (hash)
+2. Character-trigram inverted index to narrow candidates
+3. Cheap length / character-count bounds before the full similarity ratio
+
+Matching semantics are the same as the original scan: the first listing whose
+slug equals the project slug wins, otherwise the first listing with the best
+similarity ratio above 0.6.
+"""
+
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+
+MATCH_THRESHOLD = 0.6
+
+# Candidates must share at least this trigram Dice coefficient with the query.
+# Name variants scoring above MATCH_THRESHOLD (typos, dropped or merged words,
+# added suffixes) practically never fall below it.
+MIN_TRIGRAM_DICE = 0.1
+
+
+def similar(a, b):
+    if not a or not b:
+        return 0
+    return SequenceMatcher(None, str(a).lower(), str(b).lower()).ratio()
+
+
+def slugify(text):
+    if not text:
+        return ""
+    text = str(text).lower()
+    text = re.sub(r'[^\w\s-]', '', text)
+    text = re.sub(r'[-\s]+', '-', text)
+    return text.strip('-')
+
+
+def trigrams(text):
+    """Character trigrams of a lowercased title, padded so short words still index"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PFMatchIndex:
+    """Prebuilt match index over one developer's PropertyFinder projects"""
+
+    def __init__(self, pf_projects):
+        self.projects = list(pf_projects)
+        self.titles = []
+        self.gram_counts = []
+        self.by_slug = {}
+        self.postings = {}
+
+        for pos, pf in enumerate(self.projects):
+            title = (pf.get('title') or '').lower()
+            self.titles.append(title)
+
+            # Keep the first listing per slug, like the original scan
+            slug = slugify(title)
+            if slug and slug not in self.by_slug:
+                self.by_slug[slug] = pos
+
+            grams = trigrams(title)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(pos)
+
+    def __len__(self):
+        return len(self.projects)
+
+    def candidates(self, name):
+        """Positions of listings whose trigram Dice with name reaches MIN_TRIGRAM_DICE, most overlap first"""
+        grams = trigrams(name)
+        shared = Counter()
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting:
+                shared.update(posting)
+
+        query_count = len(grams)
+        gram_counts = self.gram_counts
+        return [
+            pos for pos, count in shared.most_common()
+            if 2.0 * count >= MIN_TRIGRAM_DICE * (query_count + gram_counts[pos])
+        ]
+
+    def match(self, project_name):
+        """Find matching PropertyFinder project"""
+        if not project_name or not self.projects:
+            return None
+
+        pos = self.by_slug.get(slugify(project_name))
+        if pos is not None:
+            return self.projects[pos]
+
+        name = str(project_name).lower().strip()
+        if not name:
+            return None
+
+        # quick_ratio is symmetric, so bound with the query as seq2 (its tables are
+        # built once) and only score survivors in the original (name, title) order
+        bound = SequenceMatcher(None, '', name)
+        name_len = len(name)
+
+        best_pos = None
+        best_score = MATCH_THRESHOLD
+
+        # Candidates come most-overlap first so the bar rises early; ties still go
+        # to the earliest listing, like the original scan
+        for pos in self.candidates(name):
+            title = self.titles[pos]
+            if not title:
+                continue
+
+            # Upper bound from lengths alone: 2*min/(la+lb)
+            title_len = len(title)
+            if 2.0 * min(name_len, title_len) / (name_len + title_len) < best_score:
+                continue
+
+            bound.set_seq1(title)
+            if bound.quick_ratio() < best_score:
+                continue
+
+            score = SequenceMatcher(None, name, title).ratio()
+            if score <= MATCH_THRESHOLD:
+                continue
+            if best_pos is None or score > best_score or (score == best_score and pos < best_pos):
+                best_score = score
+                best_pos = pos
+
+        return self.projects[best_pos] if best_pos is not None else None
+
+
+def build_match_indexes(pf_data_map):
+    """Build one PFMatchIndex per developer"""
+    return {dev: PFMatchIndex(projects) for dev, projects in pf_data_map.items()}
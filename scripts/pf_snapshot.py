@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Parsed-snapshot cache for PropertyFinder dumps.
+
+Parsing a dump's HTML is the slowest part of loading PF data. The extracted
+listings are pickled to .cache/pf-snapshots/<dump>.pickle together with the
+dump's size, mtime and sha256. A snapshot is reused while the size and mtime
+are unchanged, or while the content hash still matches (e.g. after a touch or
+a re-download of identical bytes). A snapshot written for other PF_FIELDS or
+another SNAPSHOT_VERSION is ignored.
+"""
+
+import os
+import pickle
+from pathlib import Path
+
+from manifest import default_manifest_path, sha256_file
+
+# Bump when the extraction changes shape so old snapshots are rebuilt
+SNAPSHOT_VERSION = 1
+
+
+def default_snapshot_dir(data_dir):
+    """.cache/pf-snapshots, next to the pipeline manifest"""
+    return default_manifest_path(data_dir).parent / 'pf-snapshots'
+
+
+def snapshot_path(snapshot_dir, pf_path):
+    return Path(snapshot_dir) / f"{Path(pf_path).name}.pickle"
+
+
+def load_snapshot(path, pf_path, fields, sha256=None):
+    """Listings from a snapshot still valid for pf_path, or None"""
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+        st = os.stat(pf_path)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+        return None
+    if snapshot.get('fields') != tuple(fields):
+        return None
+    if snapshot.get('size') == st.st_size and snapshot.get('mtime_ns') == st.st_mtime_ns:
+        return snapshot['projects']
+    if snapshot.get('size') == st.st_size and snapshot.get('sha256') == (sha256 or sha256_file(pf_path)):
+        return snapshot['projects']
+    return None
+
+
+def save_snapshot(path, pf_path, fields, projects, sha256=None):
+    """Write the snapshot atomically (concurrent writers simply replace each other)"""
+    st = os.stat(pf_path)
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'fields': tuple(fields),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'sha256': sha256 or sha256_file(pf_path),
+        'projects': projects,
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+
+
+def cached_extract(pf_path, extract, fields, snapshot_dir, sha256=None):
+    """(listings, from_snapshot): the snapshot if valid, else extract(pf_path) and save it"""
+    path = snapshot_path(snapshot_dir, pf_path)
+    projects = load_snapshot(path, pf_path, fields, sha256)
+    if projects is not None:
+        return projects, True
+    projects = extract(pf_path)
+    try:
+        save_snapshot(path, pf_path, fields, projects, sha256)
+    except OSError as e:
+        print(f"  ⚠️ Could not save PF snapshot {path}: {e}")
+    return projects, False
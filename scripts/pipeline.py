@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Unified single-pass data pipeline.
+
+Replaces running cleanup_data.py, fix_all_issues.py and translate_files.py in
+turn. Each project is loaded once, the selected stages run in memory, and the
+project is written once at the end (only if its bytes changed):
+1. merge       - remove invalid projects and merge listed duplicates, as one transaction (cleanup_data)
+2. standardize - standardize field names, dedup images, drop dead links, fix 3D tours (cleanup_data)
+3. fix         - fix names/descriptions and enrich from PropertyFinder (fix_all_issues)
+4. dedup       - collapse duplicate gallery images by URL variant and content (image_dedup)
+5. translate   - fill missing Arabic/English project fields (translate_files)
+6. spatial     - backfill missing point-of-interest distances (spatial_index)
+7. images      - encode responsive derivatives of local images, record imageMeta (image_derivatives)
+8. listings    - refresh the developer and global listing shards (listing_index)
+9. facets      - apply the touched projects' deltas to the facet counts (facet_index)
+10. catalog    - sync the SQLite catalog used for ad-hoc queries (catalog_db)
+
+Stages 1-6 run per project and can be split across machines or containers
+with --shard i/N (see discovery.py). Each shard processes its part of every
+developer and writes a partial manifest to .cache/shards/; once every shard's
+data and partial manifest are in place, --reduce checks that the set is
+complete, merges it into the pipeline manifest and runs stages 7-10.
+
+Usage: python scripts/pipeline.py [--stages merge,standardize,fix,dedup,translate,spatial,images,listings,facets,catalog] [--workers N] [--full] [--profile]
+       python scripts/pipeline.py --shard i/N [--stages ...]   # on each machine
+       python scripts/pipeline.py --reduce [--stages ...]       # then once, on the merged tree
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from archive_batch import ArchiveBatch
+from catalog_db import build_catalog
+from cleanup_data import (
+    STANDARDIZE_VERSION, duplicate_map, merge_root, plan_merges, remove_invalid, set_dead_urls, standardize_deps,
+    standardize_project,
+)
+from discovery import add_shard_arguments, select_developers
+from facet_index import update_facets
+from fix_all_issues import FIX_VERSION, fix_project_data, load_pf_indexes
+from image_dedup import DEDUP_VERSION, ImageHashCache, dedupe_images
+from image_derivatives import DerivativeCache, update_image_meta
+from jsonio import read_json, write_cache, write_json
+from link_checker import load_dead_urls
+from listing_index import build_developer_shard, build_global_index
+from manifest import Manifest, add_manifest_arguments, default_manifest_path
+import profiling
+from profiling import add_profile_arguments
+from project_pool import ProjectPool, add_pool_arguments, defer_move
+from spatial_index import (
+    SPATIAL_VERSION, backfill_poi_distances, build_spatial_index, gazetteer_deps, unresolved_pois,
+)
+from translate_files import TRANSLATE_VERSION, translate_fields
+import translation_memory
+
+STAGES = ('merge', 'standardize', 'fix', 'dedup', 'translate', 'spatial', 'images', 'listings', 'facets', 'catalog')
+# Versions of the per-project stages; images, listings, facets and catalog run after them
+STAGE_VERSIONS = {
+    'merge': 1,
+    'standardize': STANDARDIZE_VERSION,
+    'fix': FIX_VERSION,
+    'dedup': DEDUP_VERSION,
+    'translate': TRANSLATE_VERSION,
+    'spatial': SPATIAL_VERSION,
+}
+SHARD_VERSION = 1
+
+# Stage selection, PF indexes, spatial index and image hashes, installed once per worker process
+_worker_stages = ()
+_worker_pf_index_map = {}
+_worker_spatial_index = None
+_worker_image_hashes = {}
+
+
+def init_worker(stages, pf_index_map, spatial_index=None, dead_urls=(), image_hashes=None):
+    global _worker_stages, _worker_pf_index_map, _worker_spatial_index, _worker_image_hashes
+    _worker_stages = stages
+    _worker_pf_index_map = pf_index_map
+    _worker_spatial_index = spatial_index
+    _worker_image_hashes = image_hashes or {}
+    set_dead_urls(dead_urls)
+
+
+def process_project(task):
+    """Pool entry point: run the selected stages over one project and write it once
+
+    task is (index_file, archived_dir, data); data is the already-merged project
+    when the merge stage loaded it, otherwise None. Returns (valid, changes,
+    unresolved), unresolved being the POI names the spatial stage could not
+    place (None without it).
+    """
+    index_file, archived_dir, data = task
+    slug = index_file.parent.name
+    profiling.set_project(index_file.parent.parent.parent.name, slug)
+    if data is None:
+        with profiling.stage('load'):
+            data = read_json(index_file)
+    changes = []
+
+    if 'standardize' in _worker_stages:
+        # cleanup_data only keeps standardize's edits when it reports a change;
+        # it reassigns top-level keys only, so a shallow copy is enough to undo them
+        original = dict(data)
+        with profiling.stage('standardize_project'):
+            data, stage_changes = standardize_project(data, slug)
+        if stage_changes:
+            changes += stage_changes
+        else:
+            data = original
+
+    if 'fix' in _worker_stages:
+        with profiling.stage('fix_project'):
+            valid, stage_changes = fix_project_data(data, _worker_pf_index_map)
+        changes += stage_changes
+        if not valid:
+            defer_move(index_file.parent, archived_dir / slug)
+            print(f"  📦 Archived: {slug}")
+            return False, changes, None
+
+    if 'dedup' in _worker_stages:
+        with profiling.stage('dedup'):
+            changes += dedupe_images(data, _worker_image_hashes)
+
+    if 'translate' in _worker_stages:
+        try:
+            with profiling.stage('translate_fields'):
+                data = translate_fields(data)
+        except Exception as e:
+            print(f"  ⚠️ Translate skipped: {slug}: {e}")
+
+    unresolved = None
+    if 'spatial' in _worker_stages:
+        with profiling.stage('spatial'):
+            if backfill_poi_distances(data, _worker_spatial_index):
+                changes.append('poi_distances')
+            unresolved = unresolved_pois(data, _worker_spatial_index)
+
+    with profiling.stage('write'):
+        written = write_json(index_file, data)
+    if written:
+        print(f"  ✓ {slug}: {', '.join(changes) or 'updated'}")
+    return True, changes, unresolved
+
+
+def stages_version(stages, pf_hash, image_hashes=None):
+    """Manifest version/deps for the selected stage combination
+
+    The spatial stage's dep is per project (see spatial_index.gazetteer_deps)
+    and is added by run_developer.
+    """
+    version = '+'.join(f"{stage}{STAGE_VERSIONS[stage]}" for stage in stages if stage in STAGE_VERSIONS)
+    deps = {'pf_dump': pf_hash} if 'fix' in stages else {}
+    if 'standardize' in stages:
+        deps.update(standardize_deps())
+    if 'dedup' in stages:
+        deps['image_hashes'] = image_hashes
+    if 'translate' in stages:
+        deps['translation_memory'] = translation_memory.get().human_version()
+    return version, deps
+
+
+def shard_select(dev, shard):
+    """Slug filter for one --shard, or None; a duplicate goes to the shard of the project it merges into"""
+    if shard is None:
+        return None
+    merges = duplicate_map(dev)
+    return lambda slug: shard.contains(f"{dev}/{merge_root(merges, slug)}")
+
+
+def shard_dir(data_dir):
+    """.cache/shards, next to the pipeline manifest"""
+    return default_manifest_path(data_dir).parent / 'shards'
+
+
+def shard_manifest_path(data_dir, shard):
+    return shard_dir(data_dir) / f"pipeline-{shard.index}-of-{shard.count}.json"
+
+
+def read_shard_manifests(data_dir):
+    """Partial manifests of the --shard runs; raises ValueError unless they are one complete set"""
+    paths = sorted(shard_dir(data_dir).glob('pipeline-*-of-*.json'))
+    partials = [read_json(path) for path in paths]
+    if not partials:
+        raise ValueError(f"no shard manifests in {shard_dir(data_dir)}")
+    if any(partial.get('version') != SHARD_VERSION for partial in partials):
+        raise ValueError("shard manifests from another pipeline version; rerun the shards")
+    counts = {partial['shard'][1] for partial in partials}
+    if len(counts) > 1:
+        raise ValueError(f"shard manifests of different runs ({', '.join(path.name for path in paths)})")
+    count = counts.pop()
+    missing = sorted(set(range(1, count + 1)) - {partial['shard'][0] for partial in partials})
+    if missing:
+        raise ValueError(f"missing shards {', '.join(f'{i}/{count}' for i in missing)}")
+    if len({tuple(partial['stages']) for partial in partials}) > 1:
+        raise ValueError("shards ran different stages")
+    return partials
+
+
+def run_developer(dev, data_dir, stages, pf_index_map, spatial_index, manifest, pf_hashes, args, batch,
+                  dead_urls=frozenset(), image_hashes=None, select=None):
+    """Run the pipeline over one developer; returns (written, archived, merged, skipped)
+
+    select, if given, limits the run to the project slugs it accepts (see shard_select).
+    """
+    projects_dir = data_dir / dev / 'projects'
+    dev_archive_dir = data_dir / '_archived' / dev
+
+    removed = merged = 0
+    merged_mains = {}
+    if 'merge' in stages:
+        # Invalid projects and duplicates are archived, and mains rewritten, in one transaction
+        removed = remove_invalid(dev, projects_dir, batch, select)
+        merged = plan_merges(dev, projects_dir, batch, select)
+        merged_mains = {Path(path): data for path, data in batch.writes.items()}
+        batch.apply()
+
+    version, deps = stages_version(stages, pf_hashes.get(dev), image_hashes and image_hashes.version())
+
+    def project_deps(index_file):
+        if 'spatial' not in stages:
+            return deps
+        recorded = manifest.recorded_deps('pipeline', index_file).get('gazetteer')
+        return {**deps, 'gazetteer': gazetteer_deps(recorded, spatial_index)}
+
+    tasks = []
+    skipped = 0
+    for proj_dir in sorted(projects_dir.iterdir()):
+        index_file = proj_dir / 'index.json'
+        if not proj_dir.is_dir() or proj_dir.name.startswith('_'):
+            continue
+        if select is not None and not select(proj_dir.name):
+            continue
+        if not index_file.exists():
+            continue
+        data = merged_mains.get(index_file)
+        if data is None and not args.full and manifest.is_current('pipeline', index_file, version,
+                                                                  project_deps(index_file)):
+            skipped += 1
+            continue
+        tasks.append((index_file, dev_archive_dir, data))
+
+    # PF dump parsed in the parent (only if needed) so forked workers share the index
+    if tasks and 'fix' in stages:
+        pf_index_map.load(dev)
+
+    processed = archived = 0
+    with ProjectPool(args.workers, args.chunksize, initializer=init_worker,
+                     initargs=(stages, pf_index_map, spatial_index, dead_urls,
+                               image_hashes and image_hashes.images)) as pool:
+        # Archive moves deferred by the fix stage are collected and applied as one batch below
+        for result in pool.run(process_project, tasks, mover=batch.plan_moves):
+            index_file = result.item[0]
+            if result.error:
+                print(f"  ⚠️ Error: {dev}/{index_file.parent.name}: {result.error}")
+                continue
+            valid, changes, unresolved = result.value
+            if valid:
+                processed += 1
+                manifest.record('pipeline', index_file, version,
+                                deps if unresolved is None else {**deps, 'gazetteer': unresolved})
+            else:
+                archived += 1
+                manifest.forget(index_file)
+    if 'fix' in stages:
+        pf_index_map.release(dev)
+
+    batch.apply()
+
+    return processed, archived + removed, merged, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the data cleanup, fix and translate stages in one pass')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"comma-separated stages to run (default: {','.join(STAGES)})")
+    parser.add_argument('--developers', default=None,
+                        help='comma-separated developers to process (default: every developer folder)')
+    add_shard_arguments(parser)
+    parser.add_argument('--reduce', action='store_true',
+                        help='merge the partial manifests of every --shard run, then run the post-project stages')
+    add_pool_arguments(parser)
+    add_manifest_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args)
+
+    stages = tuple(stage for stage in STAGES if stage in args.stages.split(','))
+    unknown = set(args.stages.split(',')) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    if args.shard and args.reduce:
+        parser.error("--shard and --reduce are separate runs")
+
+    data_dir = Path(__file__).resolve().parent.parent / 'public' / 'data'
+    batch = ArchiveBatch.open(data_dir)
+    manifest = Manifest.load(data_dir, args.manifest)
+
+    selected = select_developers(data_dir, args.developers)
+    partials = []
+    if args.reduce:
+        try:
+            partials = read_shard_manifests(data_dir)
+        except ValueError as e:
+            print(f"❌ Cannot reduce: {e}")
+            sys.exit(1)
+        # The shards ran the per-project stages; only the ones after them run here
+        stages = tuple(stage for stage in stages if stage not in STAGE_VERSIONS)
+    pf_index_map, pf_hashes = None, {}
+    if 'fix' in stages:
+        pf_index_map, pf_hashes = load_pf_indexes(data_dir, manifest, selected)
+    spatial_index = None
+    if 'spatial' in stages:
+        # Gazetteer of every developer's communities and listed projects (the listing shards as last built)
+        spatial_index = build_spatial_index(data_dir)
+    dead_urls = frozenset()
+    if 'standardize' in stages:
+        # Results of the last link_checker.py run, if any
+        dead_urls = load_dead_urls(data_dir)
+        set_dead_urls(dead_urls)
+    # Hashes from the last image_dedup.py --hash run; without them dedup matches URL variants only
+    image_hashes = ImageHashCache.load(data_dir) if 'dedup' in stages else None
+    derivatives = DerivativeCache.load(data_dir) if 'images' in stages else None
+    if 'fix' in stages or 'translate' in stages:
+        # Loaded before the pools start so forked workers share it
+        translation_memory.load()
+
+    print("=" * 70)
+    print(f"🚀 Data pipeline: {' → '.join(stages)}" + (f" (shard {args.shard})" if args.shard else ''))
+    print("=" * 70)
+
+    totals = [0, 0, 0, 0]
+    if partials:
+        for partial in partials:
+            manifest.merge(partial['manifest'])
+            totals = [t + c for t, c in zip(totals, partial['totals'])]
+        print(f"🧩 Merged {len(partials)} shard manifests ({', '.join(partials[0]['stages'])})")
+
+    for dev in selected:
+        if not (data_dir / dev / 'projects').exists():
+            continue
+        print(f"\n📁 Processing {dev}...")
+        if any(stage in STAGE_VERSIONS for stage in stages):
+            counts = run_developer(dev, data_dir, stages, pf_index_map, spatial_index, manifest, pf_hashes, args,
+                                   batch, dead_urls, image_hashes, shard_select(dev, args.shard))
+            totals = [t + c for t, c in zip(totals, counts)]
+            print(f"   Processed: {counts[0]}, Archived: {counts[1]}, Merged: {counts[2]}, Skipped (unchanged): {counts[3]}")
+        if args.shard:
+            continue
+        if 'images' in stages:
+            profiling.set_project(dev)
+            with profiling.stage('images'), ProjectPool(args.workers, args.chunksize) as pool:
+                # imageMeta is written after the pipeline entries were recorded; they are kept current
+                encoded, updated = update_image_meta(
+                    data_dir, pool, [dev], cache=derivatives,
+                    write=lambda path, data: manifest.rewrite('pipeline', path, lambda: write_json(path, data)))
+            if encoded or updated:
+                print(f"   Images: {encoded} encoded, imageMeta updated in {updated} projects")
+        if 'listings' in stages:
+            profiling.set_project(dev)
+            with profiling.stage('listings'):
+                reread, written = build_developer_shard(data_dir, dev, manifest, args.full)
+            if written:
+                print(f"   Listing shard rebuilt ({reread} projects re-read)")
+
+    if args.shard:
+        # The shard's entries of the pipeline manifest, for --reduce; the other stages need every project
+        keys = set()
+        for dev in selected:
+            select = shard_select(dev, args.shard)
+            keys.update(key for key in manifest.stages.get('pipeline', {})
+                        if key.startswith(f"{dev}/projects/") and select(key.split('/')[2]))
+        write_cache(shard_manifest_path(data_dir, args.shard), {
+            'version': SHARD_VERSION,
+            'shard': list(args.shard),
+            'stages': list(stages),
+            'developers': selected,
+            'totals': totals,
+            'manifest': manifest.extract(keys, ['pipeline']),
+        })
+        skipped = [stage for stage in stages if stage not in STAGE_VERSIONS]
+        print(f"\n🧩 Shard {args.shard} manifest written" + (f"; {', '.join(skipped)} run with --reduce" if skipped else ''))
+        stages = ()
+
+    if 'listings' in stages and build_global_index(data_dir, full=args.full):
+        print("\n🗂️  Global listing index rebuilt")
+
+    profiling.set_project(None)
+    if 'facets' in stages:
+        with profiling.stage('facets'):
+            updated, removed = update_facets(data_dir, manifest, selected, args.full)
+        print(f"\n📊 Facet counts: {updated} projects updated, {removed} removed")
+
+    if 'catalog' in stages:
+        with profiling.stage('catalog'):
+            counts = build_catalog(data_dir, manifest, developers=selected, full=args.full)
+        print(f"\n🗄️  Catalog: {', '.join(f'{kind} {up} updated, {gone} removed' for kind, (up, gone) in counts.items())}")
+
+    manifest.save()
+    translation_memory.save()
+    if partials:
+        # Reduced; a later shard set must not mix with this one
+        for path in shard_dir(data_dir).glob('pipeline-*-of-*.json'):
+            path.unlink()
+
+    print("\n" + "=" * 70)
+    print(f"📊 Total: Processed {totals[0]}, Archived {totals[1]}, Merged {totals[2]}, Skipped (unchanged) {totals[3]}")
+    if 'fix' in stages or 'translate' in stages:
+        print(f"   {translation_memory.summary()}")
+    print("=" * 70)
+
+    profiling.finish(args)
+
+
+if __name__ == '__main__':
+    main()
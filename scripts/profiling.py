@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Opt-in per-stage profiling for the data scripts.
+
+Stages are wrapped with `with profiling.stage('load'):`. When profiling is off
+this is a shared no-op context. When on, each stage records its wall time and
+net allocated memory blocks, labelled with the developer and project set by
+set_project(). Records made in pool workers travel back to the parent with
+each ProjectResult; a forked worker drops the records it inherited.
+
+The report (--profile) breaks time down per stage, per developer and per
+project, lists the slowest projects, and is written as JSON next to
+report/final-quality-report.json.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+
+from jsonio import write_json
+
+DEFAULT_REPORT = Path(__file__).resolve().parent.parent / 'report' / 'pipeline-profile.json'
+
+_enabled = False
+_records = []
+_labels = (None, None)
+_depth = 0
+_NULL = nullcontext()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_project(developer, project=None):
+    """Label subsequent stage records with a developer / project slug"""
+    global _labels
+    _labels = (developer, project)
+
+
+@contextmanager
+def _timed(name):
+    global _depth
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        _records.append((
+            name, _labels[0], _labels[1], _depth,
+            time.perf_counter() - start,
+            sys.getallocatedblocks() - blocks,
+        ))
+
+
+def stage(name):
+    """Context manager timing one stage (no-op unless profiling is enabled)"""
+    return _timed(name) if _enabled else _NULL
+
+
+def drain():
+    """Take the records collected so far (used by pool workers)"""
+    global _records, _labels
+    records, _records = _records, []
+    _labels = (None, None)
+    return records
+
+
+def add(records):
+    """Merge records sent back from a pool worker"""
+    _records.extend(records)
+
+
+# A forked pool worker starts with a copy of the parent's records; it must only
+# send back its own, or every per-developer pool would count them again
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=drain)
+
+
+def _bucket(table, key):
+    return table.setdefault(key, {'count': 0, 'wall_ms': 0.0, 'alloc_blocks': 0})
+
+
+def _add_to(bucket, wall, blocks):
+    bucket['count'] += 1
+    bucket['wall_ms'] += wall * 1000
+    bucket['alloc_blocks'] += blocks
+
+
+def _rounded(table):
+    for bucket in table.values():
+        bucket['wall_ms'] = round(bucket['wall_ms'], 3)
+    return table
+
+
+def build_report(top=20):
+    stages = {}
+    by_developer = {}
+    by_project = {}
+
+    for name, developer, project, depth, wall, blocks in _records:
+        _add_to(_bucket(stages, name), wall, blocks)
+        if developer:
+            _add_to(_bucket(by_developer.setdefault(developer, {}), name), wall, blocks)
+        if developer and project:
+            entry = by_project.setdefault(f"{developer}/{project}", {
+                'developer': developer, 'slug': project, 'wall_ms': 0.0, 'stages': {},
+            })
+            _add_to(_bucket(entry['stages'], name), wall, blocks)
+            # Only top-level stages count towards the project total (pf_matching nests in fix)
+            if depth == 0:
+                entry['wall_ms'] += wall * 1000
+
+    for entry in by_project.values():
+        entry['wall_ms'] = round(entry['wall_ms'], 3)
+        _rounded(entry['stages'])
+
+    slowest = sorted(by_project.values(), key=lambda e: e['wall_ms'], reverse=True)[:top]
+
+    return {
+        'generatedAt': datetime.now(timezone.utc).isoformat(),
+        'summary': {
+            'projects': len(by_project),
+            'records': len(_records),
+        },
+        'stages': _rounded(stages),
+        'byDeveloper': {dev: _rounded(table) for dev, table in sorted(by_developer.items())},
+        'byProject': dict(sorted(by_project.items())),
+        'slowestProjects': slowest,
+    }
+
+
+def print_summary(report, top=10):
+    print(f"\n⏱️  Stage timings ({report['summary']['projects']} projects)")
+    for name, bucket in sorted(report['stages'].items(), key=lambda kv: kv[1]['wall_ms'], reverse=True):
+        print(f"  {name:<22} {bucket['wall_ms']:>10.1f} ms  x{bucket['count']:<6} {bucket['alloc_blocks']:>+10} blocks")
+    if report['slowestProjects']:
+        print(f"  Slowest projects:")
+        for entry in report['slowestProjects'][:top]:
+            print(f"    {entry['wall_ms']:>8.2f} ms  {entry['developer']}/{entry['slug']}")
+
+
+def add_profile_arguments(parser):
+    """Add the --profile / --profile-top options shared by the data scripts"""
+    parser.add_argument('--profile', nargs='?', const=str(DEFAULT_REPORT), default=None, metavar='PATH',
+                        help=f"record per-stage timings and write them as JSON (default: {DEFAULT_REPORT.relative_to(DEFAULT_REPORT.parents[1])})")
+    parser.add_argument('--profile-top', type=int, default=20,
+                        help='number of slowest projects to list in the profile')
+
+
+def start(args):
+    """Enable profiling if --profile was given"""
+    if args.profile:
+        enable()
+
+
+def finish(args):
+    """Write and print the profile if --profile was given"""
+    if not args.profile:
+        return
+    report = build_report(args.profile_top)
+    path = Path(args.profile)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(path, report)
+    print_summary(report)
+    print(f"  Profile written to {path}")
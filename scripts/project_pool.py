@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Shared work scheduling for the per-project data scripts.
+
+Fans project files out over a process pool and hands results back in input
+order, so console output and change lists are deterministic regardless of the
+worker count:
+- Each task's stdout is captured in the worker and replayed by the parent
+- Filesystem moves requested with defer_move() are handed to the parent in
+  project order (to run's mover, e.g. an archive_batch.ArchiveBatch), so
+  archive/merge moves never race
+- Stage timings recorded by profiling in a worker are merged into the parent
+- Translation-memory entries learned in a worker are merged into the parent
+- workers=1 runs everything in-process with the same semantics
+"""
+
+import io
+import os
+import shutil
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
+
+import profiling
+import translation_memory
+
+ProjectResult = namedtuple('ProjectResult', ['item', 'value', 'output', 'moves', 'error', 'profile', 'translations'])
+
+_pending_moves = None
+_in_worker = False
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def defer_move(src, dst):
+    """Queue a move for the parent to apply after this project, in project order"""
+    if _pending_moves is None:
+        shutil.move(str(src), str(dst))
+    else:
+        _pending_moves.append((str(src), str(dst)))
+
+
+def apply_moves(moves):
+    for src, dst in moves:
+        shutil.move(src, dst)
+
+
+def _init_worker(profile, initializer, initargs):
+    global _in_worker
+    _in_worker = True
+    # Forked workers inherit the entries the parent already learned; only send back their own
+    translation_memory.drain()
+    if profile:
+        profiling.enable()
+    if initializer:
+        initializer(*initargs)
+
+
+def _run_task(func, item):
+    global _pending_moves
+    _pending_moves = []
+    output = io.StringIO()
+    value = error = None
+    try:
+        with redirect_stdout(output):
+            value = func(item)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    moves, _pending_moves = _pending_moves, None
+    # Workers ship their stage timings back; in-process runs record them directly
+    records = profiling.drain() if _in_worker else []
+    translations = translation_memory.drain() if _in_worker else None
+    profiling.set_project(None)
+    return ProjectResult(item, value, output.getvalue(), moves, error, records, translations)
+
+
+def add_pool_arguments(parser):
+    """Add the --workers / --chunksize options shared by the data scripts"""
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help='worker processes (1 = run in-process)')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='projects handed to a worker at a time (default: auto)')
+
+
+class ProjectPool:
+    """Process pool that runs one function per project file and yields ordered results"""
+
+    def __init__(self, workers=None, chunksize=None, initializer=None, initargs=()):
+        self.workers = max(1, workers or default_workers())
+        self.chunksize = chunksize
+        self.initializer = initializer
+        self.initargs = initargs
+        self.executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(profiling.is_enabled(), self.initializer, self.initargs),
+            )
+        elif self.initializer:
+            self.initializer(*self.initargs)
+        return self
+
+    def __exit__(self, *exc):
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+
+    def _chunksize(self, count):
+        if self.chunksize:
+            return self.chunksize
+        return max(1, count // (self.workers * 4))
+
+    def run(self, func, items, mover=apply_moves):
+        """Run func(item) for each item; yield ProjectResult in input order
+
+        Captured output is printed and deferred moves are applied (by mover,
+        e.g. a checkpoint journal) before each result is yielded. func must
+        be a module-level function.
+        """
+        items = list(items)
+        task = partial(_run_task, func)
+        if self.executor:
+            results = self.executor.map(task, items, chunksize=self._chunksize(len(items)))
+        else:
+            results = map(task, items)
+
+        for result in results:
+            if result.profile:
+                profiling.add(result.profile)
+            if result.translations:
+                translation_memory.merge(result.translations)
+            if result.output:
+                print(result.output, end='')
+            if result.moves:
+                mover(result.moves)
+            yield result
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Data-quality analyzer for the project catalog.
+
+Every project is loaded once into columns: one bytearray flag per quality
+field (1 = present), price columns as array('d') with NaN for missing values,
+and the gallery URLs. All counts, completeness scores and outliers are then
+computed over whole columns instead of walking each project dict field by
+field per check.
+
+Writes the two report files in their existing schema:
+- report/missing-data-analysis.json - missing-field counts and the projects
+  missing each field
+- report/final-quality-report.json  - completeness per project, per developer
+  and overall, quality tiers and achievements
+The quality report also carries two extra sections:
+- outliers  - priceMin > priceMax, prices more than OUTLIER_FACTOR x away from
+  the developer median, implausible bedroom counts
+- galleries - duplicate URLs within a gallery and images shared across projects
+
+Usage: python scripts/quality_report.py [--developers emaar,damac] [--output-dir report]
+"""
+
+import argparse
+import math
+import statistics
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from catalog_db import bedroom_counts, to_number
+from discovery import select_developers
+from jsonio import write_json
+from records import iter_records
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Fields scored for completeness, in report order
+QUALITY_FIELDS = (
+    'projectName', 'description', 'arabicDescription', 'coordinates', 'amenities', 'propertyTypes',
+    'bedrooms', 'priceRange', 'status', 'images', 'videos', 'floorPlans', 'handoverDate',
+)
+
+# missing-data-analysis breakdown key -> flag column (present when 1)
+MISSING_CHECKS = {
+    'noDescription': 'description',
+    'noArabicDescription': 'arabicDescription',
+    'noImages': 'images',
+    'noVideos': 'videos',
+    'noCoordinates': 'coordinates',
+    'noAmenities': 'amenities',
+    'incompleteAmenities': 'completeAmenities',
+    'noFloorPlans': 'floorPlans',
+    'noPriceRange': 'priceRange',
+    'noPaymentPlan': 'paymentPlan',
+    'noHandoverDate': 'handoverDate',
+}
+
+# (tier, minimum completeness %)
+QUALITY_TIERS = [('excellent', 90.0), ('good', 75.0), ('fair', 50.0), ('poor', 0.0)]
+
+# Prices this many times above or below the developer median are reported
+OUTLIER_FACTOR = 10.0
+MAX_BEDROOMS = 10
+# Images shared by the most projects listed in the galleries section
+TOP_SHARED = 20
+
+
+def non_empty(value):
+    if isinstance(value, str):
+        return bool(value.strip())
+    return value not in (None, [], (), {}, 0)
+
+
+def first(value, doc, *keys):
+    """value when non-empty, else the first non-empty doc[key]"""
+    if non_empty(value):
+        return value
+    for key in keys:
+        if non_empty(doc.get(key)):
+            return doc[key]
+    return None
+
+
+def amenities_complete(amenities):
+    """Every amenity has both an English and an Arabic name (plain strings count as English only)"""
+    if not isinstance(amenities, (list, tuple)) or not amenities:
+        return False
+    for amenity in amenities:
+        if isinstance(amenity, dict):
+            name = amenity.get('name', amenity)
+            if not isinstance(name, dict) or not non_empty(name.get('en')) or not non_empty(name.get('ar')):
+                return False
+        elif isinstance(amenity, str):
+            return False
+    return True
+
+
+class Columns:
+    """The catalog as columns: one entry per project in every column"""
+
+    def __init__(self):
+        self.developer = []
+        self.slug = []
+        self.name = []
+        self.flags = {field: bytearray() for field in (*QUALITY_FIELDS, 'completeAmenities', 'paymentPlan')}
+        self.price_min = array('d')
+        self.price_max = array('d')
+        self.max_bedrooms = array('d')
+        self.gallery = []
+
+    def __len__(self):
+        return len(self.slug)
+
+    def append(self, developer, slug, project):
+        extra = project.extra or {}
+        coords = project.coordinates
+        if isinstance(coords, dict):
+            coords = coords.get('lat'), coords.get('lng', coords.get('lon'))
+        gallery = first(project.gallery, extra, 'images') or ()
+        price_min = to_number(first(project.price_min, extra, 'startingPrice', 'price_min'))
+        price_max = to_number(first(project.price_max, extra, 'price_max'))
+        bedrooms = bedroom_counts(project.bedrooms)
+
+        present = {
+            'projectName': non_empty(project.name_en) or non_empty(project.name_ar),
+            'description': non_empty(project.description_en),
+            'arabicDescription': non_empty(project.description_ar),
+            'coordinates': isinstance(coords, tuple) and non_empty(coords[0]) and non_empty(coords[1]),
+            'amenities': non_empty(project.amenities),
+            'propertyTypes': non_empty(first(None, extra, 'propertyTypes', 'unitTypes', 'property_types')),
+            'bedrooms': bool(bedrooms),
+            'priceRange': price_min is not None or price_max is not None,
+            'status': non_empty(project.status),
+            'images': bool(gallery),
+            'videos': non_empty(first(project.video_url, extra, 'videos')),
+            'floorPlans': non_empty(first(None, extra, 'floorPlans', 'floor_plans')),
+            'handoverDate': non_empty(first(project.completion_date, extra, 'handoverDate', 'deliveryDate', 'completion_date')),
+            'completeAmenities': amenities_complete(project.amenities),
+            'paymentPlan': non_empty(first(None, extra, 'paymentPlan', 'paymentPlans', 'payment_plan')),
+        }
+        for field, column in self.flags.items():
+            column.append(1 if present[field] else 0)
+
+        self.developer.append(developer)
+        self.slug.append(slug)
+        self.name.append({'en': project.name_en, 'ar': project.name_ar} if project.name_ar is not None
+                         else {'en': project.name_en})
+        self.price_min.append(math.nan if price_min is None else price_min)
+        self.price_max.append(math.nan if price_max is None else price_max)
+        self.max_bedrooms.append(bedrooms[-1] if bedrooms else math.nan)
+        self.gallery.append([url for url in gallery if isinstance(url, str)] if isinstance(gallery, (list, tuple)) else [])
+
+
+def load_columns(data_dir, developers=None):
+    developers = select_developers(data_dir, developers)
+    columns = Columns()
+    for index_file, project in iter_records(data_dir, 'projects', developers):
+        columns.append(index_file.parent.parent.parent.name, index_file.parent.name, project)
+    return columns
+
+
+def timestamp():
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def percent(part, total):
+    return f"{part / total * 100:.1f}" if total else "0.0"
+
+
+def project_ref(columns, i):
+    return {'developer': columns.developer[i], 'slug': columns.slug[i], 'project': columns.name[i]}
+
+
+def missing_data_analysis(columns):
+    total = len(columns)
+    breakdown = {}
+    details = {}
+    for key, field in MISSING_CHECKS.items():
+        flags = columns.flags[field]
+        breakdown[key] = total - sum(flags)
+        details[key] = [project_ref(columns, i) for i, present in enumerate(flags) if not present]
+    issues = sum(breakdown.values())
+    return {
+        'generatedAt': timestamp(),
+        'summary': {
+            'totalProjects': total,
+            'totalIssues': issues,
+            'averageIssuesPerProject': f"{issues / total:.2f}" if total else "0.00",
+        },
+        'breakdown': breakdown,
+        'details': details,
+    }
+
+
+def completeness_scores(columns):
+    """Per-project count of present QUALITY_FIELDS, summed column by column"""
+    scores = [0] * len(columns)
+    for field in QUALITY_FIELDS:
+        scores = [score + flag for score, flag in zip(scores, columns.flags[field])]
+    return scores
+
+
+def price_outliers(columns):
+    found = {'priceMinAboveMax': [], 'priceFarFromMedian': [], 'bedrooms': []}
+    for i, (low, high) in enumerate(zip(columns.price_min, columns.price_max)):
+        if low > high:
+            found['priceMinAboveMax'].append({**project_ref(columns, i), 'priceMin': low, 'priceMax': high})
+
+    by_developer = {}
+    for i, price in enumerate(columns.price_min):
+        if price == price and price > 0:
+            by_developer.setdefault(columns.developer[i], []).append(i)
+    for dev, rows in by_developer.items():
+        median = statistics.median(columns.price_min[i] for i in rows)
+        for i in rows:
+            ratio = columns.price_min[i] / median
+            if ratio > OUTLIER_FACTOR or ratio < 1 / OUTLIER_FACTOR:
+                found['priceFarFromMedian'].append({
+                    **project_ref(columns, i), 'priceMin': columns.price_min[i], 'developerMedian': median,
+                })
+
+    for i, bedrooms in enumerate(columns.max_bedrooms):
+        if bedrooms > MAX_BEDROOMS:
+            found['bedrooms'].append({**project_ref(columns, i), 'maxBedrooms': int(bedrooms)})
+    return found
+
+
+def gallery_statistics(columns):
+    with_duplicates = 0
+    duplicate_images = 0
+    projects_per_image = Counter()
+    for gallery in columns.gallery:
+        unique = set(gallery)
+        if len(unique) < len(gallery):
+            with_duplicates += 1
+            duplicate_images += len(gallery) - len(unique)
+        projects_per_image.update(unique)
+    shared = [(url, count) for url, count in projects_per_image.items() if count > 1]
+    shared.sort(key=lambda item: (-item[1], item[0]))
+    return {
+        'projectsWithDuplicates': with_duplicates,
+        'duplicateImages': duplicate_images,
+        'uniqueImages': len(projects_per_image),
+        'sharedAcrossProjects': len(shared),
+        'topShared': [{'url': url, 'projects': count} for url, count in shared[:TOP_SHARED]],
+    }
+
+
+def achievements(columns):
+    total = len(columns)
+    found = [{
+        'icon': '✅',
+        'title': 'All Projects Processed',
+        'description': f"Successfully processed all {total} real estate projects",
+    }]
+    coordinates = sum(columns.flags['coordinates'])
+    if total and coordinates / total >= 0.95:
+        found.append({
+            'icon': '📍',
+            'title': 'Excellent Location Data',
+            'description': f"{coordinates / total * 100:.0f}% of projects have accurate coordinates",
+        })
+    if total and sum(columns.flags['amenities']) == total:
+        found.append({
+            'icon': '🏢',
+            'title': 'Rich Amenities Data',
+            'description': 'All projects feature comprehensive amenities listings',
+        })
+    if total and sum(columns.flags['status']) == total:
+        found.append({
+            'icon': '✅',
+            'title': 'Accurate Project Status',
+            'description': 'Project statuses identified and standardized',
+        })
+    return found
+
+
+def final_quality_report(columns):
+    total = len(columns)
+    per_project = len(QUALITY_FIELDS)
+    scores = completeness_scores(columns)
+
+    by_developer = {}
+    for dev in sorted(set(columns.developer)):
+        rows = [i for i, d in enumerate(columns.developer) if d == dev]
+        complete = sum(scores[i] for i in rows)
+        by_developer[dev] = {
+            'projects': len(rows),
+            'completeness': percent(complete, len(rows) * per_project),
+            'completeFields': complete,
+            'totalFields': len(rows) * per_project,
+        }
+
+    quality = {tier: [] for tier, _ in QUALITY_TIERS}
+    order = sorted(range(total), key=lambda i: (columns.developer[i], columns.slug[i]))
+    for i in order:
+        completeness = scores[i] / per_project * 100
+        tier = next(tier for tier, minimum in QUALITY_TIERS if completeness >= minimum)
+        quality[tier].append({
+            'developer': columns.developer[i],
+            'slug': columns.slug[i],
+            'name': columns.name[i].get('en') or columns.slug[i],
+            'completeness': f"{completeness:.1f}",
+            'fields': {field: columns.flags[field][i] for field in QUALITY_FIELDS},
+        })
+
+    complete = sum(scores)
+    return {
+        'timestamp': timestamp(),
+        'summary': {
+            'totalProjects': total,
+            'overallCompleteness': percent(complete, total * per_project),
+            'completeFields': complete,
+            'totalFields': total * per_project,
+        },
+        'byDeveloper': by_developer,
+        'quality': quality,
+        'achievements': achievements(columns),
+        'outliers': price_outliers(columns),
+        'galleries': gallery_statistics(columns),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyze catalog data quality and write the report/ files')
+    parser.add_argument('--developers', default=None, help='comma-separated developers')
+    parser.add_argument('--output-dir', default=str(REPO_ROOT / 'report'), help='where to write the reports')
+    args = parser.parse_args()
+
+    data_dir = REPO_ROOT / 'public' / 'data'
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print("🔍 Loading catalog...")
+    columns = load_columns(data_dir, select_developers(data_dir, args.developers))
+
+    missing = missing_data_analysis(columns)
+    write_json(output_dir / 'missing-data-analysis.json', missing)
+    report = final_quality_report(columns)
+    write_json(output_dir / 'final-quality-report.json', report)
+
+    print(f"\n📊 {len(columns)} projects, {report['summary']['overallCompleteness']}% complete, "
+          f"{missing['summary']['totalIssues']} missing fields")
+    for tier, projects in report['quality'].items():
+        print(f"   {tier}: {len(projects)}")
+    outliers = report['outliers']
+    print(f"   Outliers: {len(outliers['priceMinAboveMax'])} priceMin > priceMax, "
+          f"{len(outliers['priceFarFromMedian'])} far from developer median, {len(outliers['bedrooms'])} bedrooms")
+    print(f"   Galleries: {report['galleries']['projectsWithDuplicates']} with duplicates, "
+          f"{report['galleries']['sharedAcrossProjects']} images shared across projects")
+    print(f"\n✓ Reports written to {output_dir}")
+
+
+if __name__ == '__main__':
+    main()
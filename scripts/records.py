@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Compact, normalized project and community records.
+
+Project files come in two schemas: the current one (projectName/description
+as {en, ar}, galleryImages, heroImage, 3D_TourLink) and the legacy one
+(name_en/name_ar, images_gallery, image_hero, tour_3d_url). Code that reads
+either probes the alternative keys on every access. ProjectRecord and
+CommunityRecord resolve them once, at load:
+- one slot per field, no per-instance __dict__
+- developer, area, city and status strings, and image URLs, are interned,
+  so values repeated across the catalog (galleries are often shared by a
+  whole community) are stored once
+- image lists, bedrooms and amenities are tuples
+- keys the record does not model are kept, unchanged, in `extra`, as is a
+  modelled key whose value the slots cannot reproduce exactly (a plain-string
+  projectName, an {ar, en} object, a gallery given as a string, ...)
+- the file's key order is kept as a tuple shared by every record laid out
+  the same way
+
+to_dict() writes the record back out as it was loaded: the keys that were
+present, in their order and their own schema, so every file round-trips
+unchanged and cross-project stages can hold a large catalog as records and
+still emit the files' format.
+
+from_dict() validates the shape of each field it reads and raises
+jsonio.SchemaError naming the field, so read_json(path, into=...) rejects a
+malformed file while decoding it rather than in whatever stage trips on it.
+"""
+
+import sys
+from functools import partial
+from pathlib import Path
+
+from discovery import select_developers
+from jsonio import SchemaError, read_json
+
+
+def intern_text(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def first_value(data, *keys):
+    """First non-empty value among keys; else the first key present (even if empty), or None"""
+    for key in keys:
+        if data.get(key):
+            return data[key]
+    for key in keys:
+        if key in data:
+            return data[key]
+    return None
+
+
+def expect(value, types, field):
+    """value, if it is None or one of types; SchemaError otherwise"""
+    if value is not None and not isinstance(value, types):
+        raise SchemaError(f"{field}: expected {' or '.join(t.__name__ for t in types)}, got {type(value).__name__}")
+    return value
+
+
+def text_pair(data, key, legacy_en, legacy_ar):
+    """(en, ar) of a localized field, from {key: {en, ar}}, a plain string, or legacy keys"""
+    value = expect(data.get(key), (dict, str), key)
+    if isinstance(value, dict):
+        en, ar = value.get('en'), value.get('ar')
+    elif isinstance(value, str):
+        en, ar = value, data.get(legacy_ar)
+    else:
+        en, ar = data.get(legacy_en), data.get(legacy_ar)
+    return expect(en, (str,), f"{key}.en"), expect(ar, (str,), f"{key}.ar")
+
+
+def url_tuple(value, field):
+    if not isinstance(expect(value, (list, str), field), list):
+        return ()
+    return tuple(intern_text(expect(url, (str,), f"{field}[]")) for url in value)
+
+
+def coordinates_value(value):
+    """(lat, lng) for a plain {lat, lng} object; anything else is kept as is"""
+    if isinstance(value, dict) and set(value) == {'lat', 'lng'}:
+        return value['lat'], value['lng']
+    return value
+
+
+def coordinates_dict(value):
+    return {'lat': value[0], 'lng': value[1]} if isinstance(value, tuple) else value
+
+
+def as_list(value):
+    return list(value) if isinstance(value, tuple) else value
+
+
+def same(a, b):
+    """a == b, also comparing types and dict key order (so the JSON is identical)"""
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return list(a) == list(b) and all(same(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def is_filled(value):
+    """Holds data: not None, '', or an empty (or all-empty) list or object"""
+    if isinstance(value, dict):
+        return any(is_filled(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(is_filled(item) for item in value)
+    return value is not None and value != ''
+
+
+# Key orders seen so far; records laid out the same way share one tuple
+_LAYOUTS = {}
+
+
+class Record:
+    """Shared layout / extra handling of ProjectRecord and CommunityRecord"""
+
+    __slots__ = ()
+
+    # Key in the files -> value of that key rebuilt from the slots
+    VALUES = {}
+
+    def _keep(self, data):
+        """Record data's key order, and keep in extra what the slots do not reproduce"""
+        keys = tuple(data)
+        self.layout = _LAYOUTS.setdefault(keys, keys)
+        self.extra = {
+            key: value for key, value in data.items()
+            if key not in self.VALUES or not same(self.VALUES[key](self), value)
+        } or None
+
+    @property
+    def lat_lng(self):
+        """(lat, lng) as floats, or None"""
+        coordinates = self.coordinates
+        if isinstance(coordinates, dict):
+            coordinates = coordinates.get('lat'), coordinates.get('lng')
+        if not isinstance(coordinates, tuple):
+            return None
+        try:
+            return float(coordinates[0]), float(coordinates[1])
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, key, default=None):
+        """A key the record does not model"""
+        return (self.extra or {}).get(key, default)
+
+    def to_dict(self):
+        """The document as it was loaded"""
+        extra = self.extra or {}
+        return {key: extra[key] if key in extra else self.VALUES[key](self) for key in self.layout}
+
+    def filled_fields(self):
+        """Number of the document's keys that hold data"""
+        return sum(1 for value in self.to_dict().values() if is_filled(value))
+
+
+class ProjectRecord(Record):
+    """One project, in the current schema, whichever schema it was loaded from"""
+
+    __slots__ = (
+        'slug', 'developer', 'name_en', 'name_ar', 'description_en', 'description_ar', 'city',
+        'area_en', 'area_ar', 'price_min', 'price_max', 'bedrooms', 'hero_image', 'gallery',
+        'video_url', 'tour_url', 'brochure_url', 'amenities', 'coordinates', 'completion_date',
+        'status', 'layout', 'extra',
+    )
+
+    # Keys read into slots (current and legacy names), written back from them; everything else goes to extra
+    VALUES = {
+        'slug': lambda r: r.slug,
+        'developer': lambda r: r.developer,
+        'projectName': lambda r: {'en': r.name_en, 'ar': r.name_ar},
+        'name_en': lambda r: r.name_en,
+        'name_ar': lambda r: r.name_ar,
+        'description': lambda r: {'en': r.description_en, 'ar': r.description_ar},
+        'description_en': lambda r: r.description_en,
+        'description_ar': lambda r: r.description_ar,
+        'city': lambda r: r.city,
+        'area': lambda r: {'en': r.area_en, 'ar': r.area_ar},
+        'area_en': lambda r: r.area_en,
+        'area_ar': lambda r: r.area_ar,
+        'priceMin': lambda r: r.price_min,
+        'priceMax': lambda r: r.price_max,
+        'bedrooms': lambda r: as_list(r.bedrooms),
+        'heroImage': lambda r: r.hero_image,
+        'image_hero': lambda r: r.hero_image,
+        'galleryImages': lambda r: list(r.gallery),
+        'images_gallery': lambda r: list(r.gallery),
+        'videoUrl': lambda r: r.video_url,
+        'video_url': lambda r: r.video_url,
+        '3D_TourLink': lambda r: r.tour_url,
+        'tour_3d_url': lambda r: r.tour_url,
+        'brochureUrl': lambda r: r.brochure_url,
+        'brochure_url': lambda r: r.brochure_url,
+        'amenities': lambda r: as_list(r.amenities),
+        'coordinates': lambda r: coordinates_dict(r.coordinates),
+        'completionDate': lambda r: r.completion_date,
+        'status': lambda r: r.status,
+    }
+
+    @classmethod
+    def from_dict(cls, data, developer=None, slug=None):
+        expect(data, (dict,), 'project')
+        record = cls.__new__(cls)
+        record.slug = expect(data.get('slug'), (str,), 'slug') or slug
+        record.developer = intern_text(data.get('developer') or developer)
+        record.name_en, record.name_ar = text_pair(data, 'projectName', 'name_en', 'name_ar')
+        record.description_en, record.description_ar = text_pair(data, 'description', 'description_en', 'description_ar')
+        record.city = intern_text(data.get('city'))
+        area_en, area_ar = text_pair(data, 'area', 'area_en', 'area_ar')
+        record.area_en, record.area_ar = intern_text(area_en), intern_text(area_ar)
+        record.price_min = data.get('priceMin')
+        record.price_max = data.get('priceMax')
+        bedrooms = data.get('bedrooms')
+        record.bedrooms = tuple(bedrooms) if isinstance(bedrooms, list) else bedrooms
+        record.hero_image = intern_text(expect(first_value(data, 'heroImage', 'image_hero'), (str,), 'heroImage'))
+        record.gallery = url_tuple(first_value(data, 'galleryImages', 'images_gallery'), 'galleryImages')
+        record.video_url = first_value(data, 'videoUrl', 'video_url')
+        record.tour_url = first_value(data, '3D_TourLink', 'tour_3d_url')
+        record.brochure_url = first_value(data, 'brochureUrl', 'brochure_url')
+        amenities = expect(data.get('amenities'), (list, str), 'amenities')
+        record.amenities = tuple(amenities) if isinstance(amenities, list) else amenities
+        record.coordinates = coordinates_value(expect(data.get('coordinates'), (dict, list, str), 'coordinates'))
+        record.completion_date = data.get('completionDate')
+        record.status = intern_text(data.get('status'))
+        record._keep(data)
+        return record
+
+    @property
+    def images(self):
+        """Hero and gallery URLs, hero first, without repeats"""
+        return tuple(dict.fromkeys(url for url in (self.hero_image, *self.gallery) if url))
+
+
+class CommunityRecord(Record):
+    """One community (flat name_en/name_ar schema)"""
+
+    __slots__ = (
+        'slug', 'developer', 'name_en', 'name_ar', 'description_en', 'description_ar', 'city_en', 'city_ar',
+        'district_en', 'district_ar', 'hero_image', 'gallery', 'video_url', 'tour_url', 'brochure_url',
+        'coordinates', 'amenities', 'map_bounds', 'layout', 'extra',
+    )
+
+    # Slot -> key in the community files
+    FIELDS = {
+        'slug': 'slug', 'developer': 'developer', 'name_en': 'name_en', 'name_ar': 'name_ar',
+        'hero_image': 'image_hero', 'gallery': 'images_gallery', 'video_url': 'video_url',
+        'coordinates': 'coordinates', 'city_en': 'city_en', 'city_ar': 'city_ar',
+        'district_en': 'district_en', 'district_ar': 'district_ar',
+        'description_en': 'description_en', 'description_ar': 'description_ar',
+        'amenities': 'amenities', 'map_bounds': 'map_bounds', 'tour_url': 'tour_3d_url',
+        'brochure_url': 'brochure_url',
+    }
+    INTERNED = ('developer', 'city_en', 'city_ar', 'district_en', 'district_ar', 'hero_image')
+    # Every key is written back from its slot
+    VALUES = {
+        key: (lambda slot: lambda r: getattr(r, slot))(slot) for slot, key in FIELDS.items()
+    }
+    VALUES.update({
+        'images_gallery': lambda r: list(r.gallery),
+        'amenities': lambda r: as_list(r.amenities),
+        'coordinates': lambda r: coordinates_dict(r.coordinates),
+    })
+
+    @classmethod
+    def from_dict(cls, data, developer=None, slug=None):
+        expect(data, (dict,), 'community')
+        record = cls.__new__(cls)
+        for slot, key in cls.FIELDS.items():
+            setattr(record, slot, data.get(key))
+        record.slug = record.slug or slug
+        record.developer = record.developer or developer
+        for slot in cls.INTERNED:
+            setattr(record, slot, intern_text(expect(getattr(record, slot), (str,), cls.FIELDS[slot])))
+        record.gallery = url_tuple(data.get('images_gallery'), 'images_gallery')
+        if isinstance(record.amenities, list):
+            record.amenities = tuple(record.amenities)
+        record.coordinates = coordinates_value(record.coordinates)
+        record._keep(data)
+        return record
+
+
+def iter_records(data_dir, kind='projects', developers=None):
+    """(index.json path, record) of every project or community, in catalog order"""
+    developers = select_developers(data_dir, developers)
+    record_type = ProjectRecord if kind == 'projects' else CommunityRecord
+    for dev in developers:
+        folder = Path(data_dir) / dev / kind
+        if not folder.exists():
+            continue
+        for index_file in sorted(folder.glob('*/index.json')):
+            if index_file.parent.name.startswith('_'):
+                continue
+            try:
+                record = read_json(index_file, into=partial(record_type.from_dict, developer=dev, slug=index_file.parent.name))
+            except Exception as e:
+                print(f"  ⚠️ Error: {dev}/{index_file.parent.name}: {e}")
+                continue
+            yield index_file, record
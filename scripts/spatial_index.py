@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Grid spatial index over project coordinates, communities and landmarks.
+
+Points are bucketed into CELL_DEG x CELL_DEG cells, so:
+- nearest(lat, lng, k) searches rings of cells outward from the query and
+  stops once no unseen cell can hold a closer point
+- within_bbox(...) / within_bounds(map_bounds) only look at covered cells
+Distances are computed column-wise over the index's lat/lng arrays, with each
+point's cos(lat) precomputed, instead of one haversine call per pair.
+
+Points come from the listing shards as last built (projects, see
+listing_index.py; building the index never rewrites them), the communities'
+index.json (coordinates and any nearby_landmarks that carry coordinates) and
+LANDMARKS.
+
+The index also backfills mapPointsOfInterest distances: a POI whose distance
+is missing or was left as "غير متوفر" by translate_fields gets the straight-line
+distance from the project, when the POI has coordinates or its name matches a
+community, project or landmark in the index. A project depends on the index
+only through the POI names it could not place (unresolved_pois): it is
+revisited once one of them can be placed, and gazetteer edits elsewhere leave
+it alone.
+
+Usage:
+    python scripts/spatial_index.py --near 25.08,55.14 [-k 10]
+    python scripts/spatial_index.py --bbox 25.0,55.1,25.2,55.3
+    python scripts/spatial_index.py --inside nakheel/palm-jumeirah
+    python scripts/spatial_index.py --backfill [--full]
+"""
+
+import argparse
+import math
+import re
+from array import array
+from pathlib import Path
+
+from discovery import select_developers
+from jsonio import read_json, write_json
+from listing_index import listing_row, member_files, read_shard, shard_path
+from manifest import Manifest, add_manifest_arguments
+
+# Bump when backfill_poi_distances changes so incremental runs revisit every project
+SPATIAL_VERSION = 1
+
+# ~2 km cells at Dubai's latitude
+CELL_DEG = 0.02
+EARTH_RADIUS_KM = 6371.0
+
+# Approximate centre points of landmarks often listed as points of interest
+LANDMARKS = {
+    'Burj Khalifa': (25.1972, 55.2744),
+    'Dubai Mall': (25.1985, 55.2796),
+    'Burj Al Arab': (25.1412, 55.1853),
+    'Mall of the Emirates': (25.1181, 55.2006),
+    'Ibn Battuta Mall': (25.0443, 55.1185),
+    'Dubai International Airport': (25.2532, 55.3657),
+    'Al Maktoum International Airport': (24.8960, 55.1614),
+    'Dubai Frame': (25.2355, 55.3004),
+    'Dubai Marina': (25.0805, 55.1403),
+}
+
+UNAVAILABLE_AR = 'غير متوفر'
+WORD_SPLIT = re.compile(r'[^a-z0-9]+')
+
+
+def name_key(text):
+    return ' '.join(w for w in WORD_SPLIT.split(str(text or '').lower()) if w)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def point_coordinates(value):
+    """(lat, lng) from {lat, lng|lon} / {latitude, longitude}, or None"""
+    if not isinstance(value, dict):
+        return None
+    lat = value.get('lat', value.get('latitude'))
+    lng = value.get('lng', value.get('lon', value.get('longitude')))
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    if not (lat or lng) or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+def parse_bounds(value):
+    """(south, west, north, east) from {north, south, east, west}, {sw, ne} or [[s, w], [n, e]]"""
+    try:
+        if isinstance(value, dict):
+            if 'north' in value:
+                return (float(value['south']), float(value['west']), float(value['north']), float(value['east']))
+            sw, ne = point_coordinates(value.get('sw') or value.get('southWest')), \
+                point_coordinates(value.get('ne') or value.get('northEast'))
+            if sw and ne:
+                return sw[0], sw[1], ne[0], ne[1]
+        elif isinstance(value, (list, tuple)) and len(value) == 2:
+            (s, w), (n, e) = value
+            return float(s), float(w), float(n), float(e)
+    except (KeyError, TypeError, ValueError):
+        pass
+    return None
+
+
+class SpatialIndex:
+    """Points with attached items (dicts), bucketed into a lat/lng grid"""
+
+    def __init__(self, cell_deg=CELL_DEG):
+        self.cell_deg = cell_deg
+        self.lats = array('d')
+        self.lngs = array('d')
+        self.lat_rad = array('d')
+        self.lng_rad = array('d')
+        self.cos_lats = array('d')
+        self.items = []
+        self.cells = {}
+        self.names = {}
+        self.cell_range = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def cell(self, lat, lng):
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lng / self.cell_deg))
+
+    def add(self, lat, lng, item):
+        point = len(self.items)
+        self.lats.append(lat)
+        self.lngs.append(lng)
+        self.lat_rad.append(math.radians(lat))
+        self.lng_rad.append(math.radians(lng))
+        self.cos_lats.append(math.cos(math.radians(lat)))
+        self.items.append(item)
+        ci, cj = self.cell(lat, lng)
+        self.cells.setdefault((ci, cj), []).append(point)
+        if self.cell_range is None:
+            self.cell_range = [ci, ci, cj, cj]
+        else:
+            r = self.cell_range
+            r[0], r[1], r[2], r[3] = min(r[0], ci), max(r[1], ci), min(r[2], cj), max(r[3], cj)
+        key = name_key(item.get('name'))
+        if key:
+            self.names.setdefault(key, point)
+        return point
+
+    def distances(self, lat, lng, points):
+        """Haversine km from (lat, lng) to each point, over the coordinate columns"""
+        lat_r, lng_r = math.radians(lat), math.radians(lng)
+        cos_lat = math.cos(lat_r)
+        lats, lngs, cos_lats = self.lat_rad, self.lng_rad, self.cos_lats
+        sin, asin, sqrt = math.sin, math.asin, math.sqrt
+        out = []
+        for p in points:
+            dlat = sin((lats[p] - lat_r) / 2)
+            dlng = sin((lngs[p] - lng_r) / 2)
+            h = dlat * dlat + cos_lat * cos_lats[p] * dlng * dlng
+            out.append(2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(h))))
+        return out
+
+    def _ring(self, ci, cj, r):
+        if r == 0:
+            yield ci, cj
+            return
+        for dj in range(-r, r + 1):
+            yield ci - r, cj + dj
+            yield ci + r, cj + dj
+        for di in range(-r + 1, r):
+            yield ci + di, cj - r
+            yield ci + di, cj + r
+
+    def nearest(self, lat, lng, k=10, max_km=None, kind=None):
+        """Up to k (km, item) pairs closest to (lat, lng), nearest first"""
+        if not self.items:
+            return []
+        ci, cj = self.cell(lat, lng)
+        lo_i, hi_i, lo_j, hi_j = self.cell_range
+        # A point r rings out is at least r cell widths away; east-west widths shrink with latitude
+        max_lat = min(90.0, max(abs(lat), abs(lo_i * self.cell_deg), abs((hi_i + 1) * self.cell_deg)))
+        cell_km = self.cell_deg * math.pi / 180 * EARTH_RADIUS_KM * max(0.01, math.cos(math.radians(max_lat)))
+        max_ring = max(abs(lo_i - ci), abs(hi_i - ci), abs(lo_j - cj), abs(hi_j - cj))
+        found = []
+        for r in range(max_ring + 1):
+            points = [p for cell in self._ring(ci, cj, r) for p in self.cells.get(cell, ())
+                      if kind is None or self.items[p].get('kind') == kind]
+            found.extend(zip(self.distances(lat, lng, points), points))
+            found.sort()
+            del found[k:]
+            reach = r * cell_km
+            if (len(found) == k and found[-1][0] <= reach) or (max_km is not None and reach > max_km):
+                break
+        return [(km, self.items[p]) for km, p in found if max_km is None or km <= max_km]
+
+    def within_bbox(self, south, west, north, east, kind=None):
+        """Items inside the box, in insertion order"""
+        si, wj = self.cell(south, west)
+        ni, ej = self.cell(north, east)
+        if (ni - si + 1) * (ej - wj + 1) > len(self.cells):
+            cells = [cell for cell in self.cells if si <= cell[0] <= ni and wj <= cell[1] <= ej]
+        else:
+            cells = [(i, j) for i in range(si, ni + 1) for j in range(wj, ej + 1)]
+        points = sorted(
+            p for cell in cells for p in self.cells.get(cell, ())
+            if south <= self.lats[p] <= north and west <= self.lngs[p] <= east
+        )
+        return [self.items[p] for p in points if kind is None or self.items[p].get('kind') == kind]
+
+    def within_bounds(self, map_bounds, kind=None):
+        box = parse_bounds(map_bounds)
+        return self.within_bbox(*box, kind=kind) if box else []
+
+    def locate(self, name):
+        """(lat, lng) of the community, project or landmark with this exact name, or None"""
+        point = self.names.get(name_key(name))
+        return None if point is None else (self.lats[point], self.lngs[point])
+
+
+def listing_rows(data_dir, dev):
+    """Rows of the developer's listing shard; read from the projects (nothing written) if it was never built"""
+    shard = read_shard(shard_path(data_dir, dev))
+    if shard is not None:
+        return shard['projects']
+    rows = []
+    for slug, index_file in member_files(data_dir, dev).items():
+        try:
+            rows.append(listing_row(read_json(index_file), slug))
+        except Exception:
+            continue
+    return rows
+
+
+def build_spatial_index(data_dir, developers=None):
+    """Index of every project (from the listing shards), community and landmark"""
+    developers = select_developers(data_dir, developers)
+    index = SpatialIndex()
+    for name, (lat, lng) in LANDMARKS.items():
+        index.add(lat, lng, {'kind': 'landmark', 'name': name})
+
+    for dev in developers:
+        communities_dir = Path(data_dir) / dev / 'communities'
+        for index_file in sorted(communities_dir.glob('*/index.json')) if communities_dir.exists() else []:
+            try:
+                community = read_json(index_file)
+            except Exception:
+                continue
+            slug = index_file.parent.name
+            coords = point_coordinates(community.get('coordinates'))
+            if coords:
+                index.add(*coords, {'kind': 'community', 'developer': dev, 'slug': slug,
+                                    'name': community.get('name_en') or slug,
+                                    'map_bounds': community.get('map_bounds')})
+            for landmark in community.get('nearby_landmarks') or []:
+                coords = isinstance(landmark, dict) and point_coordinates(landmark.get('coordinates') or landmark)
+                if coords:
+                    index.add(*coords, {'kind': 'landmark', 'name': landmark.get('name_en') or landmark.get('name')})
+
+    for dev in developers:
+        for row in listing_rows(data_dir, dev):
+            coords = point_coordinates(row.get('coordinates'))
+            if coords:
+                name = row.get('projectName')
+                index.add(*coords, {'kind': 'project', 'developer': dev, 'slug': row['slug'],
+                                    'name': name.get('en') if isinstance(name, dict) else name})
+    return index
+
+
+def poi_needs_distance(poi):
+    distance = poi.get('distance')
+    if distance is None or distance == '':
+        return True
+    if not isinstance(distance, dict):
+        return False
+    en, ar = str(distance.get('en') or '').lower(), distance.get('ar') or ''
+    has_en = 'minute' in en or 'km' in en
+    return not has_en and ar in ('', UNAVAILABLE_AR)
+
+
+def backfill_poi_distances(project, index):
+    """Fill missing mapPointsOfInterest distances from coordinates; returns the number filled"""
+    pois = project.get('mapPointsOfInterest')
+    origin = point_coordinates(project.get('coordinates'))
+    if not isinstance(pois, list) or not origin:
+        return 0
+    filled = 0
+    for poi in pois:
+        if not isinstance(poi, dict) or not poi_needs_distance(poi):
+            continue
+        name = poi.get('name')
+        if isinstance(name, dict):
+            name = name.get('en')
+        coords = point_coordinates(poi.get('coordinates')) or index.locate(name)
+        if not coords:
+            continue
+        km = haversine_km(origin[0], origin[1], coords[0], coords[1])
+        poi['distance'] = {'en': f"{km:.1f} km", 'ar': f"{km:.1f} كم"}
+        filled += 1
+    return filled
+
+
+def unresolved_pois(project, index):
+    """Name keys of the POIs still missing a distance that neither they nor the index can place"""
+    pois = project.get('mapPointsOfInterest')
+    if not isinstance(pois, list) or not point_coordinates(project.get('coordinates')):
+        return []
+    names = set()
+    for poi in pois:
+        if not isinstance(poi, dict) or not poi_needs_distance(poi) or point_coordinates(poi.get('coordinates')):
+            continue
+        name = poi.get('name')
+        key = name_key(name.get('en') if isinstance(name, dict) else name)
+        if key and index.locate(key) is None:
+            names.add(key)
+    return sorted(names)
+
+
+def gazetteer_deps(recorded, index):
+    """Manifest dep of a project recorded with unresolved_pois: the names the index still cannot place
+
+    Equal to the recorded list until one of them can be placed. A list written
+    by an older version (or none) never matches, so the project is revisited.
+    """
+    if not isinstance(recorded, list):
+        return None
+    return [name for name in recorded if index.locate(name) is None]
+
+
+def backfill_developer(data_dir, dev, index, manifest, full=False):
+    """Backfill POI distances in a developer's projects; returns (projects updated, skipped)"""
+    projects_dir = Path(data_dir) / dev / 'projects'
+    if not projects_dir.exists():
+        return 0, 0
+    updated = skipped = 0
+    for index_file in sorted(projects_dir.glob('*/index.json')):
+        if index_file.parent.name.startswith('_'):
+            continue
+        recorded = manifest.recorded_deps('spatial', index_file).get('gazetteer')
+        if not full and manifest.is_current('spatial', index_file, SPATIAL_VERSION,
+                                            {'gazetteer': gazetteer_deps(recorded, index)}):
+            skipped += 1
+            continue
+        try:
+            project = read_json(index_file)
+        except Exception as e:
+            print(f"  ⚠️ Error: {dev}/{index_file.parent.name}: {e}")
+            continue
+        if backfill_poi_distances(project, index) and write_json(index_file, project):
+            updated += 1
+            print(f"  📍 {dev}/{index_file.parent.name}: POI distances backfilled")
+        manifest.record('spatial', index_file, SPATIAL_VERSION, {'gazetteer': unresolved_pois(project, index)})
+    return updated, skipped
+
+
+def print_items(results):
+    for result in results:
+        km, item = result if isinstance(result, tuple) else (None, result)
+        where = f"{item['developer']}/{item['slug']}" if item.get('slug') else item.get('name')
+        distance = f"{km:7.2f} km  " if km is not None else ''
+        print(f"  {distance}{item['kind']:<10} {where}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the spatial index or backfill POI distances')
+    parser.add_argument('--near', metavar='LAT,LNG', help='print the nearest points')
+    parser.add_argument('-k', type=int, default=10, help='number of nearest points')
+    parser.add_argument('--kind', choices=['project', 'community', 'landmark'], default=None)
+    parser.add_argument('--bbox', metavar='S,W,N,E', help='print the points inside a box')
+    parser.add_argument('--inside', metavar='DEV/COMMUNITY', help="print the points inside a community's map_bounds")
+    parser.add_argument('--backfill', action='store_true', help='backfill missing mapPointsOfInterest distances')
+    parser.add_argument('--developers', default=None, help='comma-separated developers')
+    add_manifest_arguments(parser)
+    args = parser.parse_args()
+
+    data_dir = Path(__file__).resolve().parent.parent / 'public' / 'data'
+    developers = select_developers(data_dir, args.developers)
+
+    index = build_spatial_index(data_dir)
+    print(f"📍 Spatial index: {len(index)} points in {len(index.cells)} cells")
+
+    if args.near:
+        lat, lng = (float(v) for v in args.near.split(','))
+        print_items(index.nearest(lat, lng, args.k, kind=args.kind))
+    if args.bbox:
+        print_items(index.within_bbox(*(float(v) for v in args.bbox.split(',')), kind=args.kind))
+    if args.inside:
+        dev, slug = args.inside.split('/', 1)
+        community = next((item for item in index.items
+                          if item['kind'] == 'community' and item['developer'] == dev and item['slug'] == slug), None)
+        if not community or not parse_bounds(community.get('map_bounds')):
+            print(f"  ⚠️ No map_bounds for {args.inside}")
+        else:
+            print_items(index.within_bounds(community['map_bounds'], kind=args.kind))
+    if args.backfill:
+        # Queries are read-only; only a backfill touches the projects and the manifest
+        manifest = Manifest.load(data_dir, args.manifest)
+        total = 0
+        for dev in developers:
+            updated, skipped = backfill_developer(data_dir, dev, index, manifest, args.full)
+            print(f"  {dev}: {updated} updated, {skipped} skipped (unchanged)")
+            total += updated
+        print(f"\n📊 POI distances backfilled in {total} projects")
+        manifest.save()
+
+
+if __name__ == '__main__':
+    main()
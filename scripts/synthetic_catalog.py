@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Synthetic catalog generator for benchmarking the data scripts.
+
+Builds a tree shaped like the real one at any multiple of the current catalog
+size (BASE_PROJECTS projects, split across developers like public/data):
+- public/data/<dev>/projects/<slug>/index.json with the real field mix:
+  projectName, galleryImages, amenities, mapPointsOfInterest, propertyTypes,
+  plus a share of legacy-schema projects (name_en, images_gallery,
+  tour_3d_url), duplicate images, placeholder slugs and nameless projects
+- public/data/<dev>/index.json and meta.json (what translate_files.py reads)
+- public/data/<dev>.md PropertyFinder dumps with a __NEXT_DATA__ payload,
+  listing most projects (exact and near titles) plus unrelated listings
+
+Output is deterministic for a given scale and seed.
+
+Usage: python scripts/synthetic_catalog.py OUT_DIR [--scale 10] [--seed 42]
+"""
+
+import argparse
+import random
+from pathlib import Path
+
+from bench_pf_match import SUFFIXES, make_word
+from fix_all_issues import PF_FILES
+from jsonio import dumps_line, write_json
+from pf_matcher import slugify
+
+# Project count of the catalog the benchmarks scale from
+BASE_PROJECTS = 447
+
+# Share of projects per developer, as in public/data
+DEVELOPER_WEIGHTS = {
+    'emaar': 144,
+    'damac': 50,
+    'sobha': 49,
+    'nakheel': 47,
+    'binghatti': 32,
+}
+
+AREAS = [
+    ('Dubai Marina', 'دبي مارينا'), ('Business Bay', 'الخليج التجاري'),
+    ('Dubai Hills Estate', 'دبي هيلز استيت'), ('Palm Jumeirah', 'نخلة جميرا'),
+    ('Jumeirah Village Circle', 'قرية جميرا الدائرية'), ('Downtown Dubai', 'وسط مدينة دبي'),
+    ('', ''),
+]
+AMENITIES = [
+    'Infinity Pool', 'Swimming Pool', 'Gym', 'Fitness Centre', 'Kids Play Area',
+    'Spa', 'Wellness Centre', 'Business Centre', 'BBQ Area', 'Landscaped Garden',
+    'Jogging Track', 'Tennis Court', 'Concierge', 'Covered Parking', 'Retail Outlets',
+]
+POIS = [
+    ('Burj Khalifa', 'Landmark'), ('Dubai Mall', 'Mall'), ('Dubai International Airport', 'Airport'),
+    ('Jumeirah Beach', 'Beach'), ('Dubai Marina', 'Landmark'), ('Al Safa Park', 'Park'),
+    ('Emirates Golf Club', 'Club'), ('Metro Station', 'Station'),
+]
+PROPERTY_TYPES = ['Apartment', 'Villa', 'Townhouse', 'Penthouse', 'Duplex', 'Studio']
+STATUSES = ['Off Plan', 'Under Construction', 'Ready', 'Unknown']
+PAYMENT_PLANS = ['60/40', '70/30', '80/20', '50/50 Post Handover']
+INVALID_SLUGS = ['projects', 'communities', 'test', 'unknown']
+
+
+def make_title(rng):
+    words = ' '.join(make_word(rng) for _ in range(rng.randint(1, 2)))
+    return f"{words} {rng.choice(SUFFIXES)}".strip()
+
+
+def image_urls(rng, slug, count):
+    base = f"https://images.example.com/{slug}"
+    return [f"{base}/gallery-{i:02d}-{rng.randrange(16 ** 6):06x}.jpg" for i in range(count)]
+
+
+def developer_counts(scale):
+    """Projects per developer for a catalog of scale x BASE_PROJECTS"""
+    total = round(BASE_PROJECTS * scale)
+    weight_sum = sum(DEVELOPER_WEIGHTS.values())
+    counts = {dev: total * weight // weight_sum for dev, weight in DEVELOPER_WEIGHTS.items()}
+    counts['emaar'] += total - sum(counts.values())
+    return counts
+
+
+def make_project(rng, dev, slug, title):
+    """One project index.json; mostly the current schema with the quirks the scripts fix"""
+    area_en, area_ar = rng.choice(AREAS)
+    gallery = image_urls(rng, slug, rng.randint(0, 18))
+    if gallery and rng.random() < 0.2:
+        gallery += rng.sample(gallery, min(3, len(gallery)))
+    bedrooms = sorted(rng.sample(range(0, 6), rng.randint(0, 4)))
+    if bedrooms and rng.random() < 0.1:
+        bedrooms = bedrooms + bedrooms[:1]
+    price = rng.randint(600_000, 30_000_000) if rng.random() < 0.6 else None
+
+    project = {
+        'slug': slug,
+        'developer': dev,
+        'projectName': {'en': title, 'ar': title if rng.random() < 0.5 else ''},
+        'description': {
+            'en': f"{title} is a new development in {area_en or 'Dubai'}. " * rng.randint(1, 6),
+            'ar': '',
+        },
+        'city': 'Dubai',
+        'area': {'en': area_en, 'ar': area_ar},
+        'priceMin': price,
+        'priceMax': price and price * 2,
+        'bedrooms': bedrooms,
+        'heroImage': gallery[0] if gallery else '',
+        'galleryImages': gallery,
+        'videoUrl': '',
+        '3D_TourLink': 'https://sobha.cloud/' if dev == 'sobha' and rng.random() < 0.3 else '',
+        'brochureUrl': '',
+        'amenities': rng.sample(AMENITIES, rng.randint(0, 10)),
+        'coordinates': {'lat': round(rng.uniform(24.8, 25.35), 6), 'lng': round(rng.uniform(55.0, 55.45), 6)},
+        'completionDate': '',
+        'status': rng.choice(STATUSES),
+    }
+
+    roll = rng.random()
+    if roll < 0.1:
+        # Legacy schema, as still found in older scrapes
+        project.pop('projectName')
+        project['name_en'] = title
+        project['name_ar'] = ''
+        project['images_gallery'] = project.pop('galleryImages')
+        project['image_hero'] = project.pop('heroImage')
+        project['tour_3d_url'] = project.pop('3D_TourLink')
+        project['description_en'] = project.pop('description')['en']
+    elif roll < 0.12:
+        # Nameless projects are archived by fix_all_issues
+        project['projectName'] = {}
+
+    if rng.random() < 0.4:
+        # Localized blocks filled in by translate_fields
+        project['summary'] = {'en': '', 'ar': ''}
+        project['heroCopy'] = {'en': {}, 'ar': {}}
+        project['insights'] = {'en': '', 'ar': ''}
+        project['city'] = {'en': 'Dubai', 'ar': 'دبي'}
+        project['amenities'] = [
+            {'name': {'en': name, 'ar': ''}, 'description': {'en': '', 'ar': ''}}
+            for name in project['amenities']
+        ]
+        project['mapPointsOfInterest'] = [
+            {
+                'name': {'en': name, 'ar': ''},
+                'category': {'en': category, 'ar': ''},
+                'distance': {'en': f"{rng.randint(1, 40)} minutes", 'ar': ''},
+            }
+            for name, category in rng.sample(POIS, rng.randint(1, 6))
+        ]
+        project['propertyTypes'] = [{'en': t, 'ar': ''} for t in rng.sample(PROPERTY_TYPES, rng.randint(1, 3))]
+
+    return project
+
+
+def make_pf_listing(rng, title):
+    """One PropertyFinder listing, with the enrichment fields and some that are dropped at load"""
+    slug = slugify(title)
+    return {
+        'id': rng.randrange(10 ** 8),
+        'title': title,
+        'startingPrice': rng.randint(600_000, 30_000_000),
+        'paymentPlans': rng.sample(PAYMENT_PLANS, rng.randint(0, 2)),
+        'amenities': [{'id': i, 'name': name} for i, name in enumerate(rng.sample(AMENITIES, rng.randint(0, 8)))],
+        'location': {
+            'fullName': 'Dubai',
+            'coordinates': {'lat': round(rng.uniform(24.8, 25.35), 6), 'lon': round(rng.uniform(55.0, 55.45), 6)},
+        },
+        'deliveryDate': f"{rng.randint(2025, 2030)}-{rng.randint(1, 12):02d}-01T00:00:00.000Z",
+        'bedrooms': [str(b) for b in sorted(rng.sample(range(1, 6), rng.randint(1, 3)))],
+        'images': [f"https://static.example.com/{slug}/{i}/medium.webp" for i in range(rng.randint(0, 8))],
+        'description': f"{title} by the developer. " * rng.randint(5, 30),
+        'stockAvailability': rng.choice(['available', 'sold_out']),
+    }
+
+
+def pf_dump_html(dev, listings):
+    payload = {
+        'props': {'pageProps': {'devResult': {
+            'developer': {'name': dev.title(), 'slug': dev},
+            'projects': {'data': listings, 'meta': {'total': len(listings)}},
+        }}},
+        'page': '/en/new-projects/developers/[slug]',
+    }
+    return (
+        '<!DOCTYPE html><html><head><title>New projects</title></head><body><div id="__next"></div>'
+        f'<script id="__NEXT_DATA__" type="application/json">{dumps_line(payload)}</script>'
+        '</body></html>'
+    )
+
+
+def generate_catalog(root, scale=1, seed=42, pf_listing_ratio=1.5):
+    """Write a synthetic public/data tree under root; returns {dev: project count}"""
+    rng = random.Random(seed)
+    data_dir = Path(root) / 'public' / 'data'
+    counts = developer_counts(scale)
+
+    for dev, count in counts.items():
+        projects_dir = data_dir / dev / 'projects'
+        projects_dir.mkdir(parents=True, exist_ok=True)
+        titles = {}
+        for i in range(count):
+            if i < len(INVALID_SLUGS) and i * 100 < count:
+                slug, title = INVALID_SLUGS[i], INVALID_SLUGS[i].title()
+            else:
+                title = make_title(rng)
+                slug = slugify(title)
+                while slug in titles or slug in INVALID_SLUGS:
+                    title = make_title(rng)
+                    slug = slugify(title)
+            titles[slug] = title
+            proj_dir = projects_dir / slug
+            proj_dir.mkdir(exist_ok=True)
+            write_json(proj_dir / 'index.json', make_project(rng, dev, slug, title))
+
+        # Most projects are listed on PF (some under a slightly different title); the rest is noise
+        listings = []
+        for title in titles.values():
+            if rng.random() < 0.7:
+                listings.append(make_pf_listing(rng, title if rng.random() < 0.6 else f"{title} by {dev.title()}"))
+        while len(listings) < count * pf_listing_ratio:
+            listings.append(make_pf_listing(rng, make_title(rng)))
+        rng.shuffle(listings)
+        (data_dir / PF_FILES[dev]).write_text(pf_dump_html(dev, listings), encoding='utf-8')
+
+        write_json(data_dir / dev / 'index.json', {
+            'developer': dev,
+            'total_projects': count,
+            'projects': [{'slug': slug, 'name': title} for slug, title in titles.items()],
+        })
+        write_json(data_dir / dev / 'meta.json', {
+            'developer': dev,
+            'slug': dev,
+            'description': {'en': f"{dev.title()} is a Dubai developer.", 'ar': ''},
+            'statistics': {'projects': count},
+            'projects': list(titles),
+        })
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic data tree for benchmarks')
+    parser.add_argument('out_dir', help='root to write public/data under')
+    parser.add_argument('--scale', type=float, default=1, help=f'multiple of the {BASE_PROJECTS}-project catalog')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    counts = generate_catalog(args.out_dir, args.scale, args.seed)
+    print(f"✓ Generated {sum(counts.values())} projects under {Path(args.out_dir) / 'public' / 'data'}")
+    for dev, count in counts.items():
+        print(f"  {dev}: {count}")
+
+
+if __name__ == '__main__':
+    main()
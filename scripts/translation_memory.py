@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Persistent en→ar translation memory shared by the data scripts.
+
+Entries are keyed by field type (amenity_name, property_type, place_name, ...)
+and the normalized English text (lower case, collapsed whitespace), and stored
+in report/translation-memory.json:
+
+    {"entries": {"property_type": {"apartment": {"en": "Apartment", "ar": "شقة", "source": "rule"}}}}
+
+- source "rule": resolved by the caller's rule table; re-resolved when the
+  caller's rules version changes
+- source "copy": no rule matched and the English was kept; these are the
+  entries waiting for a translator
+- source "human": set by hand (change "ar" and set "source": "human"); never
+  overwritten, and used before any rule
+
+lookup() is fronted by an in-process LRU, so each distinct string is resolved
+once per process. Entries learned in pool workers travel back to the parent
+with each ProjectResult (like profiling records), and the parent saves them,
+so later runs resolve every known string from the store.
+
+Usage: python scripts/translation_memory.py [--pending]   # summary, or list untranslated entries
+"""
+
+import argparse
+import hashlib
+from collections import Counter, OrderedDict
+from pathlib import Path
+
+from jsonio import dumps, read_json, write_json
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / 'report' / 'translation-memory.json'
+
+MEMORY_VERSION = 1
+# Distinct (field, text) pairs kept in the in-process LRU
+LRU_SIZE = 4096
+
+_memory = None
+
+
+def normalize(text):
+    return ' '.join(str(text).split()).lower()
+
+
+def keep_english(text):
+    """Resolver for fields without a rule table: keep the English until a translator sets it"""
+    return text
+
+
+def rules_version(*tables):
+    """Short hash of a caller's rule tables, stored with the entries they produced"""
+    return hashlib.sha256(dumps(tables)).hexdigest()[:16]
+
+
+class TranslationMemory:
+    """On-disk translation entries with an LRU front and hit/miss counters"""
+
+    def __init__(self, path, entries=None, lru_size=LRU_SIZE):
+        self.path = Path(path)
+        self.entries = entries or {}
+        self.lru_size = lru_size
+        self.lru = OrderedDict()
+        self.learned = {}
+        self.stats = Counter()
+
+    @classmethod
+    def load(cls, path=None):
+        path = Path(path) if path else DEFAULT_PATH
+        try:
+            data = read_json(path)
+            if data.get('version') == MEMORY_VERSION:
+                # "en" and "ar" are plain strings; entries written otherwise are dropped and resolved again
+                entries = {
+                    field: {key: entry for key, entry in field_entries.items() if isinstance(entry.get('ar'), str)}
+                    for field, field_entries in (data.get('entries') or {}).items()
+                }
+                return cls(path, entries)
+        except (OSError, ValueError):
+            pass
+        return cls(path)
+
+    def lookup(self, field, text, resolve, rules=None):
+        """Arabic for text: from the LRU, then the store, else resolve(text) (and remember it)"""
+        key = (field, normalize(text))
+        try:
+            value = self.lru[key]
+            self.lru.move_to_end(key)
+            self.stats['lru_hits'] += 1
+            return value
+        except KeyError:
+            pass
+
+        entry = self.entries.get(field, {}).get(key[1])
+        if entry and (entry.get('source') == 'human' or entry.get('rules') == rules):
+            self.stats['store_hits'] += 1
+        else:
+            self.stats['misses'] += 1
+            value = resolve(text)
+            entry = {'en': text, 'ar': value, 'source': 'copy' if value == text else 'rule'}
+            if rules:
+                entry['rules'] = rules
+            self.entries.setdefault(field, {})[key[1]] = entry
+            self.learned[key] = entry
+
+        self.lru[key] = entry['ar']
+        if len(self.lru) > self.lru_size:
+            self.lru.popitem(last=False)
+        return entry['ar']
+
+    def drain(self):
+        """Entries learned and counters since the last drain (sent back by pool workers)"""
+        payload = (self.learned, dict(self.stats))
+        self.learned = {}
+        self.stats = Counter()
+        return payload
+
+    def merge(self, payload):
+        """Add a worker's learned entries (human entries are kept) and counters"""
+        learned, stats = payload
+        for (field, key), entry in learned.items():
+            current = self.entries.setdefault(field, {}).get(key)
+            if not current or current.get('source') != 'human':
+                self.entries[field][key] = entry
+        self.stats.update(stats)
+
+    def human_version(self):
+        """Short hash of the hand-set entries, for manifest deps"""
+        human = {}
+        for field, entries in sorted(self.entries.items()):
+            hand_set = {key: entry['ar'] for key, entry in sorted(entries.items()) if entry.get('source') == 'human'}
+            # Fields without hand-set entries are left out, so learning new entries keeps the version
+            if hand_set:
+                human[field] = hand_set
+        return hashlib.sha256(dumps(human)).hexdigest()[:16]
+
+    def counts(self):
+        return Counter(entry.get('source') for entries in self.entries.values() for entry in entries.values())
+
+    def save(self):
+        entries = {
+            field: dict(sorted(self.entries[field].items()))
+            for field in sorted(self.entries) if self.entries[field]
+        }
+        if not entries and not self.path.exists():
+            return False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        return write_json(self.path, {'version': MEMORY_VERSION, 'entries': entries})
+
+
+def get():
+    """The process's translation memory, loaded on first use"""
+    global _memory
+    if _memory is None:
+        _memory = TranslationMemory.load()
+    return _memory
+
+
+def load(path=None):
+    """Load the memory explicitly (before starting a pool, so forked workers share it)"""
+    global _memory
+    _memory = TranslationMemory.load(path)
+    return _memory
+
+
+def lookup(field, text, resolve, rules=None):
+    return get().lookup(field, text, resolve, rules)
+
+
+def drain():
+    """Learned entries of this process, or None when there is nothing to send"""
+    if _memory is None or not (_memory.learned or _memory.stats):
+        return None
+    return _memory.drain()
+
+
+def merge(payload):
+    get().merge(payload)
+
+
+def summary():
+    memory = get()
+    stats, counts = memory.stats, memory.counts()
+    return (f"🈯 Translation memory: {stats['lru_hits']} LRU hits, {stats['store_hits']} store hits, "
+            f"{stats['misses']} misses; {sum(counts.values())} entries "
+            f"({counts['human']} human, {counts['rule']} rule, {counts['copy']} untranslated)")
+
+
+def save():
+    """Write the memory if it was used"""
+    if _memory is not None:
+        _memory.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize the translation memory')
+    parser.add_argument('--pending', action='store_true', help='list entries still copied from English')
+    args = parser.parse_args()
+
+    memory = get()
+    print(summary())
+    if args.pending:
+        for field, entries in sorted(memory.entries.items()):
+            for entry in entries.values():
+                if entry.get('source') == 'copy':
+                    print(f"  {field:<16} {entry['en']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The data scripts import each other as top-level modules; translate_files.py sits at the root
+sys.path.insert(0, str(ROOT / 'scripts'))
+sys.path.insert(1, str(ROOT))
@@ -0,0 +1,88 @@
+import pytest
+
+import archive_batch
+from archive_batch import ArchiveBatch, rollback
+from jsonio import read_json, write_json
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    data_dir = tmp_path / 'data'
+    for slug in ('cove', 'cove-phase-2', 'bay'):
+        project_dir = data_dir / 'damac' / 'projects' / slug
+        project_dir.mkdir(parents=True)
+        write_json(project_dir / 'index.json', {'slug': slug})
+    (data_dir / '_archived' / 'damac' / 'bay').mkdir(parents=True)
+    return data_dir
+
+
+def snapshot(data_dir):
+    return {
+        path.relative_to(data_dir).as_posix(): path.read_bytes()
+        for path in sorted(data_dir.rglob('*')) if path.is_file()
+    }
+
+
+def plan(data_dir, state_dir):
+    projects = data_dir / 'damac' / 'projects'
+    batch = ArchiveBatch.open(data_dir, state_dir)
+    batch.write(projects / 'cove' / 'index.json', {'slug': 'cove', 'galleryImages': ['/a.webp']})
+    batch.archive(projects / 'cove-phase-2')
+    batch.archive(projects / 'bay')
+    return batch
+
+
+def fail_on(call, exception):
+    calls = []
+
+    def rename(src, dst):
+        calls.append(src)
+        if len(calls) == call:
+            raise exception
+        archive_batch.os.rename(src, dst)
+    return rename
+
+
+def test_apply_writes_and_moves_with_suffix(data_dir, tmp_path):
+    batch = plan(data_dir, tmp_path / 'state')
+    assert batch.moves[str(data_dir / 'damac' / 'projects' / 'bay')].endswith('bay-2')
+    assert batch.apply() == 3
+    assert read_json(data_dir / 'damac' / 'projects' / 'cove' / 'index.json')['galleryImages'] == ['/a.webp']
+    assert (data_dir / '_archived' / 'damac' / 'cove-phase-2' / 'index.json').exists()
+    assert (data_dir / '_archived' / 'damac' / 'bay-2' / 'index.json').exists()
+    assert not (tmp_path / 'state' / 'current').exists()
+
+
+def test_failed_apply_is_undone(data_dir, tmp_path, monkeypatch):
+    before = snapshot(data_dir)
+    batch = plan(data_dir, tmp_path / 'state')
+    monkeypatch.setattr(archive_batch, 'rename', fail_on(2, OSError('disk full')))
+    with pytest.raises(OSError):
+        batch.apply()
+    assert snapshot(data_dir) == before
+    assert not (tmp_path / 'state' / 'current').exists()
+
+
+def test_rollback_undoes_the_last_batch(data_dir, tmp_path):
+    before = snapshot(data_dir)
+    plan(data_dir, tmp_path / 'state').apply()
+    assert snapshot(data_dir) != before
+    assert rollback(data_dir, tmp_path / 'state') == 3
+    assert snapshot(data_dir) == before
+    assert rollback(data_dir, tmp_path / 'state') is None
+
+
+def test_interrupted_batch_is_rolled_back_on_open(data_dir, tmp_path, monkeypatch):
+    before = snapshot(data_dir)
+    batch = plan(data_dir, tmp_path / 'state')
+    monkeypatch.setattr(archive_batch, 'rename', fail_on(2, KeyboardInterrupt()))
+    with pytest.raises(KeyboardInterrupt):
+        batch.apply()
+    assert (tmp_path / 'state' / 'current' / 'journal').exists()
+    assert snapshot(data_dir) != before
+
+    monkeypatch.undo()
+    ArchiveBatch.open(data_dir, tmp_path / 'state')
+    assert snapshot(data_dir) == before
+    assert not (tmp_path / 'state' / 'current').exists()
+    assert rollback(data_dir, tmp_path / 'state') is None
@@ -0,0 +1,41 @@
+import cleanup_data
+from archive_batch import ArchiveBatch
+from jsonio import read_json, write_json
+from near_duplicates import approved_merges
+
+
+def approve(tmp_path, monkeypatch, *clusters):
+    path = tmp_path / 'duplicate-suggestions.json'
+    write_json(path, {'clusters': [
+        {'developer': 'damac', 'main': main, 'duplicates': duplicates, 'approved': True}
+        for main, duplicates in clusters
+    ]})
+    monkeypatch.setattr(cleanup_data, 'approved_merges', lambda dev: approved_merges(dev, path))
+
+
+def test_approved_pair_reversing_an_exact_entry_is_dropped(tmp_path, monkeypatch, capsys):
+    approve(tmp_path, monkeypatch, ('bay-by-cavalli', ['damac-bay-by-cavalli']), ('damac-hills', ['hills']))
+    merges = cleanup_data.duplicate_map('damac')
+    assert merges['bay-by-cavalli'] == 'damac-bay-by-cavalli'
+    assert 'damac-bay-by-cavalli' not in merges
+    assert merges['hills'] == 'damac-hills'
+    assert 'Ignoring approved merge damac/damac-bay-by-cavalli' in capsys.readouterr().out
+
+    projects_dir = tmp_path / 'data' / 'damac' / 'projects'
+    for slug in ('bay-by-cavalli', 'damac-bay-by-cavalli'):
+        (projects_dir / slug).mkdir(parents=True)
+        write_json(projects_dir / slug / 'index.json', {'slug': slug, 'galleryImages': [f"/{slug}.webp"]})
+    batch = ArchiveBatch(tmp_path / 'data', state_dir=tmp_path / 'state')
+    cleanup_data.plan_merges('damac', projects_dir, batch,
+                             select=lambda slug: slug in ('bay-by-cavalli', 'damac-bay-by-cavalli'))
+    batch.apply()
+    assert not (projects_dir / 'bay-by-cavalli').exists()
+    merged = read_json(projects_dir / 'damac-bay-by-cavalli' / 'index.json')
+    assert set(merged['galleryImages']) == {'/bay-by-cavalli.webp', '/damac-bay-by-cavalli.webp'}
+
+
+def test_approved_pairs_closing_a_cycle_are_dropped(tmp_path, monkeypatch):
+    approve(tmp_path, monkeypatch, ('tower-a', ['tower-b']), ('tower-b', ['tower-a']))
+    assert cleanup_data.duplicate_map('damac') == {
+        'tower-b': 'tower-a', **cleanup_data.EXACT_DUPLICATES['damac'],
+    }
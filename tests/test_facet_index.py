@@ -0,0 +1,40 @@
+import json
+
+from facet_index import FacetIndex, facets_path, update_facets
+from jsonio import read_json
+from manifest import Manifest
+
+
+def add_project(data_dir, slug, **fields):
+    folder = data_dir / 'acme' / 'projects' / slug
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / 'index.json').write_text(json.dumps(fields))
+    return folder
+
+
+def test_status_case_is_normalized(tmp_path):
+    manifest = Manifest(tmp_path / 'manifest.json', tmp_path)
+    add_project(tmp_path, 'a', status='Unknown')
+    add_project(tmp_path, 'b', status='unknown')
+    add_project(tmp_path, 'c', status='Under Construction')
+    add_project(tmp_path, 'd', status='under_construction')
+    facets = FacetIndex(tmp_path / 'state.json')
+    assert facets.sync(tmp_path, manifest) == (4, 0)
+    assert facets.document()['facets']['status'] == {'under_construction': 2, 'unknown': 2}
+
+
+def test_counts_follow_changes_and_removals(tmp_path, monkeypatch):
+    monkeypatch.setattr('facet_index.default_state_path', lambda data_dir: tmp_path / 'state.json')
+    manifest = Manifest(tmp_path / 'manifest.json', tmp_path)
+    add_project(tmp_path, 'a', status='Completed', priceMin=1500000)
+    removed = add_project(tmp_path, 'b', status='Completed', priceMin=3000000)
+    assert update_facets(tmp_path, manifest) == (2, 0)
+    assert update_facets(tmp_path, manifest) == (0, 0)
+
+    add_project(tmp_path, 'a', status='Ready', priceMin=1500000)
+    (removed / 'index.json').unlink()
+    removed.rmdir()
+    assert update_facets(tmp_path, manifest) == (1, 1)
+    facets = read_json(facets_path(tmp_path))['facets']
+    assert facets['status'] == {'ready': 1}
+    assert facets['price'] == {'1m-2m': 1}
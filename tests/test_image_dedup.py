@@ -0,0 +1,22 @@
+from image_dedup import dedupe_images, url_variant
+
+
+def test_sizes_share_a_key_crops_do_not():
+    key, rank = url_variant('https://cdn.example.com/a.jpg?w=640&q=80&crop=entropy')
+    assert url_variant('https://cdn.example.com/a.jpg?crop=entropy&w=1920&fm=webp') == (key, 1920 * 1920)
+    assert rank == 640 * 640
+    assert url_variant('https://cdn.example.com/a.jpg?w=640&crop=faces')[0] != key
+    assert url_variant('https://cdn.example.com/a.jpg?w=640&fit=crop')[0] != url_variant('https://cdn.example.com/a.jpg?w=640')[0]
+
+
+def test_gallery_keeps_both_crops_and_the_largest_size():
+    project = {'galleryImages': [
+        'https://cdn.example.com/a.jpg?w=640&crop=top',
+        'https://cdn.example.com/a.jpg?w=1280&crop=top',
+        'https://cdn.example.com/a.jpg?w=640&crop=bottom',
+    ]}
+    assert dedupe_images(project, {})
+    assert project['galleryImages'] == [
+        'https://cdn.example.com/a.jpg?w=1280&crop=top',
+        'https://cdn.example.com/a.jpg?w=640&crop=bottom',
+    ]
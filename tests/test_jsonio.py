@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+import jsonio
+from jsonio import dumps, loads, read_json, write_json
+
+
+def stdlib(data):
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+@pytest.mark.parametrize('value', [
+    1e-05, -2.5e-07, 0.00012, 0.0001, 9.99e-05, 5e-324, 1e16, 1.5e+300, 0.0, -0.0, 25.2048, 2 ** 70,
+])
+def test_dumps_matches_stdlib(value):
+    for data in (value, [value], {'lat': value}, {'coordinates': [{'lat': 25.1, 'lng': value}]}):
+        assert dumps(data) == stdlib(data)
+
+
+def test_dumps_matches_stdlib_for_a_document():
+    data = {
+        'projectName': {'en': 'Cove', 'ar': 'كوف'},
+        'priceMin': 1200000,
+        'coordinates': {'lat': 25.2048, 'lng': 55.2708},
+        'nearbyPlaces': [{'name': 'Mall', 'distance': '2 km', 'score': 3e-05}],
+        'text': 'x: 0.00001, y',
+        'empty': [],
+        'none': None,
+    }
+    assert dumps(data) == stdlib(data)
+    assert loads(dumps(data)) == data
+
+
+def test_write_json_skips_unchanged_files(tmp_path):
+    path = tmp_path / 'index.json'
+    assert write_json(path, {'lat': 1e-05})
+    mtime = path.stat().st_mtime_ns
+    assert not write_json(path, {'lat': 1e-05})
+    assert path.stat().st_mtime_ns == mtime
+    assert path.read_bytes() == stdlib({'lat': 1e-05})
+    assert read_json(path) == {'lat': 1e-05}
+
+
+def test_stdlib_backend(monkeypatch):
+    monkeypatch.setattr(jsonio, 'orjson', None)
+    data = {'lat': 1e-05, 'name': 'دبي'}
+    assert dumps(data) == stdlib(data)
+    assert loads(dumps(data)) == data
@@ -0,0 +1,93 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import cleanup_data
+from link_checker import LinkCache, check_urls, load_dead_urls
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Stand-in media server: /ok, /no-head (405 on HEAD), /gone (404) and /moved (301 to /ok)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        if self.path == '/no-head':
+            self.respond(405)
+        else:
+            self.do_GET(body=False)
+
+    def do_GET(self, body=True):
+        if self.path == '/ok':
+            self.respond(200, {'Content-Type': 'image/webp', 'Content-Length': '5000', 'ETag': '"v1"'},
+                         b'x' * 5000 if body else b'', length=False)
+        elif self.path == '/no-head' and self.headers.get('Range') == 'bytes=0-0':
+            self.respond(206, {'Content-Type': 'image/jpeg', 'Content-Range': 'bytes 0-0/8000'}, b'x')
+        elif self.path == '/moved':
+            self.respond(301, {'Location': '/ok'})
+        else:
+            self.respond(404, body=b'missing' if body else b'')
+
+    def respond(self, status, headers=None, body=b'', length=True):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if length:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_check_against_local_server(server, tmp_path):
+    refused = f"http://127.0.0.1:{closed_port()}/ok"
+    urls = [f"{server}/ok", f"{server}/no-head", f"{server}/gone", f"{server}/moved", refused]
+    cache = LinkCache(tmp_path / 'link-cache.json')
+    assert asyncio.run(check_urls(urls, cache, timeout=5)) == 5
+    results = cache.results
+
+    ok = results[f"{server}/ok"]
+    assert (ok['status'], ok['contentType'], ok['size'], ok['etag']) == (200, 'image/webp', 5000, '"v1"')
+    # HEAD rejected: a one-byte ranged GET, sized from Content-Range
+    no_head = results[f"{server}/no-head"]
+    assert (no_head['status'], no_head['contentType'], no_head['size']) == (206, 'image/jpeg', 8000)
+    assert results[f"{server}/gone"]['status'] == 404
+    moved = results[f"{server}/moved"]
+    assert (moved['status'], moved['finalUrl']) == (200, f"{server}/ok")
+    assert results[refused]['status'] is None and 'error' in results[refused]
+
+    # Only the 404 is dead: a refused connection never marks media dead
+    cache.save()
+    assert load_dead_urls(tmp_path, cache.path) == {f"{server}/gone"}
+
+
+def test_dead_urls_feed_cleanup(monkeypatch):
+    monkeypatch.setattr(cleanup_data, 'DEAD_URLS', frozenset({'https://cdn/gone.jpg', 'https://cdn/hero.jpg'}))
+    project, changes = cleanup_data.standardize_project({
+        'heroImage': 'https://cdn/hero.jpg',
+        'galleryImages': ['https://cdn/gone.jpg', 'https://cdn/a.jpg', 'https://cdn/b.jpg'],
+    }, 'cove')
+    assert 'removed_dead_images' in changes and 'removed_dead_hero' in changes
+    assert 'https://cdn/gone.jpg' not in project['images_gallery']
+    assert project.get('image_hero') != 'https://cdn/hero.jpg'
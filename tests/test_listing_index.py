@@ -0,0 +1,65 @@
+import json
+
+from jsonio import read_json
+from listing_index import build_developer_shard, build_global_index, global_path, shard_path
+from manifest import Manifest
+
+
+def add_project(data_dir, dev, slug, **fields):
+    folder = data_dir / dev / 'projects' / slug
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / 'index.json').write_text(json.dumps({'projectName': {'en': slug}, **fields}))
+    return folder / 'index.json'
+
+
+def test_developer_shard_rereads_only_changed_projects(tmp_path):
+    manifest = Manifest(tmp_path / 'manifest.json', tmp_path)
+    add_project(tmp_path, 'acme', 'a', priceMin=1)
+    changed = add_project(tmp_path, 'acme', 'b', priceMin=2)
+    assert build_developer_shard(tmp_path, 'acme', manifest) == (2, True)
+    assert build_developer_shard(tmp_path, 'acme', manifest) == (0, False)
+
+    changed.write_text(json.dumps({'projectName': {'en': 'b'}, 'priceMin': 3}))
+    assert build_developer_shard(tmp_path, 'acme', manifest) == (1, True)
+    rows = read_json(shard_path(tmp_path, 'acme'))['projects']
+    assert [(row['slug'], row['priceMin']) for row in rows] == [('a', 1), ('b', 3)]
+
+
+def test_global_index_rebuilt_on_full_and_developer_order(tmp_path):
+    manifest = Manifest(tmp_path / 'manifest.json', tmp_path)
+    for dev in ('beta', 'acme'):
+        add_project(tmp_path, dev, 'x')
+        build_developer_shard(tmp_path, dev, manifest)
+    assert build_global_index(tmp_path)
+    assert [row['developer'] for row in read_json(global_path(tmp_path))['projects']] == ['acme', 'beta']
+    assert not build_global_index(tmp_path)
+
+    # Same shard versions, older developer order
+    document = read_json(global_path(tmp_path))
+    document['shards'] = dict(reversed(list(document['shards'].items())))
+    global_path(tmp_path).write_text(json.dumps(document))
+    assert build_global_index(tmp_path)
+
+    # Same shard versions, hand-edited rows: only --full notices
+    document = read_json(global_path(tmp_path))
+    document['projects'] = []
+    global_path(tmp_path).write_text(json.dumps(document))
+    assert not build_global_index(tmp_path)
+    assert build_global_index(tmp_path, full=True)
+    assert read_json(global_path(tmp_path))['count'] == 2
+
+
+def test_legacy_schema_rows(tmp_path):
+    manifest = Manifest(tmp_path / 'manifest.json', tmp_path)
+    folder = tmp_path / 'acme' / 'projects' / 'old'
+    folder.mkdir(parents=True)
+    (folder / 'index.json').write_text(json.dumps({
+        'name_en': 'Old Town', 'name_ar': 'البلدة القديمة', 'area_en': 'Downtown',
+        'image_hero': '/images/old/hero.webp', 'priceMin': 5,
+    }))
+    build_developer_shard(tmp_path, 'acme', manifest)
+    [row] = read_json(shard_path(tmp_path, 'acme'))['projects']
+    assert row['projectName'] == {'en': 'Old Town', 'ar': 'البلدة القديمة'}
+    assert row['area'] == {'en': 'Downtown', 'ar': None}
+    assert row['heroImage'] == '/images/old/hero.webp'
+    assert (row['slug'], row['priceMin']) == ('old', 5)
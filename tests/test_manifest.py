@@ -0,0 +1,67 @@
+import os
+
+from manifest import Manifest
+
+
+def project(data_dir, slug, text='{}'):
+    index_file = data_dir / 'dev' / 'projects' / slug / 'index.json'
+    index_file.parent.mkdir(parents=True, exist_ok=True)
+    index_file.write_text(text)
+    return index_file
+
+
+def test_skips_unchanged_file(tmp_path):
+    index_file = project(tmp_path, 'a')
+    manifest = Manifest(tmp_path / 'manifest.json', tmp_path)
+    assert not manifest.is_current('fix', index_file, 1)
+    manifest.record('fix', index_file, 1, {'pf_dump': 'x'})
+    assert manifest.is_current('fix', index_file, 1, {'pf_dump': 'x'})
+    assert manifest.key(index_file) == 'dev/projects/a/index.json'
+
+
+def test_invalidated_by_content_version_and_deps(tmp_path):
+    index_file = project(tmp_path, 'a')
+    manifest = Manifest(tmp_path / 'manifest.json', tmp_path)
+    manifest.record('fix', index_file, 1, {'pf_dump': 'x'})
+    assert not manifest.is_current('fix', index_file, 2, {'pf_dump': 'x'})
+    assert not manifest.is_current('fix', index_file, 1, {'pf_dump': 'y'})
+    assert not manifest.is_current('standardize', index_file, 1, {'pf_dump': 'x'})
+
+    # Same size, new mtime: the hash is recomputed and the change is seen
+    index_file.write_text('[]')
+    os.utime(index_file, ns=(1, 1))
+    assert not manifest.is_current('fix', index_file, 1, {'pf_dump': 'x'})
+
+
+def test_save_load_and_prune(tmp_path):
+    kept, gone = project(tmp_path, 'a'), project(tmp_path, 'b')
+    manifest = Manifest.load(tmp_path, tmp_path / 'manifest.json')
+    manifest.record('fix', kept, 1)
+    manifest.record('fix', gone, 1)
+    gone.unlink()
+    manifest.save()
+
+    manifest = Manifest.load(tmp_path, tmp_path / 'manifest.json')
+    assert manifest.is_current('fix', kept, 1)
+    assert manifest.key(gone) not in manifest.stages['fix']
+    manifest.forget(kept)
+    assert not manifest.is_current('fix', kept, 1)
+
+
+def test_unreadable_manifest_starts_empty(tmp_path):
+    (tmp_path / 'manifest.json').write_text('{not json')
+    manifest = Manifest.load(tmp_path, tmp_path / 'manifest.json')
+    assert manifest.files == {} and manifest.stages == {}
+
+
+def test_rewrite_keeps_only_current_entries_current(tmp_path):
+    current, stale = project(tmp_path, 'a'), project(tmp_path, 'b')
+    manifest = Manifest(tmp_path / 'manifest.json', tmp_path)
+    manifest.record('pipeline', current, 1, {'pf_dump': 'x'})
+    manifest.record('pipeline', stale, 1, {'pf_dump': 'x'})
+    stale.write_text('{"edited": true}')
+
+    assert manifest.rewrite('pipeline', current, lambda: current.write_text('{"imageMeta": {}}') > 0)
+    assert manifest.is_current('pipeline', current, 1, {'pf_dump': 'x'})
+    assert manifest.rewrite('pipeline', stale, lambda: stale.write_text('{"imageMeta": {}}') > 0)
+    assert not manifest.is_current('pipeline', stale, 1, {'pf_dump': 'x'})
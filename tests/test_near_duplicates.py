@@ -0,0 +1,52 @@
+import near_duplicates
+from near_duplicates import build_suggestions, name_key, variant_markers
+from records import ProjectRecord
+
+
+def test_brand_words_discovered_once_on_first_use(monkeypatch):
+    calls = []
+    monkeypatch.setattr(near_duplicates, '_brand_words', None)
+    monkeypatch.setattr(near_duplicates, 'discover_developers', lambda: calls.append(1) or ['acme'])
+    assert name_key('Acme Marina Views by Emaar') == 'marina views'
+    assert name_key('The Acme Tower') == 'tower'
+    assert calls == [1]
+
+
+def test_variant_markers(monkeypatch):
+    monkeypatch.setattr(near_duplicates, '_brand_words', set(near_duplicates.BRAND_WORDS))
+    assert variant_markers('creek-views-phase-02') == ('2',)
+    assert variant_markers('tower-b-ii') == ('b', 'ii')
+    assert variant_markers('creek-views') == ()
+
+
+def records(monkeypatch, dev, projects):
+    monkeypatch.setattr(near_duplicates, '_brand_words', set(near_duplicates.BRAND_WORDS))
+    return [
+        near_duplicates.Record(dev, slug, ProjectRecord.from_dict({'slug': slug, **data}))
+        for slug, data in projects.items()
+    ]
+
+
+def test_exact_duplicates_orient_the_main(monkeypatch):
+    found = records(monkeypatch, 'damac', {
+        'bay-by-cavalli': {'projectName': {'en': 'Bay by Cavalli', 'ar': 'باي'}, 'city': 'Dubai', 'status': 'Ready'},
+        'damac-bay-by-cavalli': {'projectName': {'en': 'DAMAC Bay by Cavalli', 'ar': ''}},
+    })
+    [cluster] = build_suggestions(found, 0.8)['clusters']
+    assert cluster['main'] == 'bay-by-cavalli'
+
+    exact = {'damac': {'bay-by-cavalli': 'damac-bay-by-cavalli'}}
+    [cluster] = build_suggestions(found, 0.8, exact=exact)['clusters']
+    assert (cluster['main'], cluster['duplicates']) == ('damac-bay-by-cavalli', ['bay-by-cavalli'])
+
+
+def test_master_community_is_not_a_duplicate(monkeypatch):
+    coordinates = {'lat': 25.18, 'lng': 55.31}
+    found = records(monkeypatch, 'sobha', {
+        slug: {'coordinates': coordinates} for slug in (
+            'sobha-hartland', 'hartland-estates', 'hartland-greens', 'hartland-quad-homes',
+            'creek-vistas', 'creek-vistas-reserve',
+        )
+    })
+    clusters = build_suggestions(found, 0.8)['clusters']
+    assert [(c['main'], c['duplicates']) for c in clusters] == [('creek-vistas', ['creek-vistas-reserve'])]
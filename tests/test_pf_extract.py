@@ -0,0 +1,44 @@
+import json
+
+from pf_extract import iter_pf_projects
+
+
+def next_data(projects_text):
+    return ('<script id="__NEXT_DATA__" type="application/json">'
+            '{"props":{"pageProps":{"devResult":{"projects":{"data":' + projects_text + '}}}}}</script>')
+
+
+def script(data):
+    return f'<script type="application/json">{json.dumps(data)}</script>'
+
+
+def test_streams_next_data_projects(tmp_path):
+    dump = tmp_path / 'dev.md'
+    dump.write_text('<html>' + next_data('[{"title": "A"}, {"title": "B", "n": [1, {"x": "]"}]}]') + '</html>')
+    assert [p['title'] for p in iter_pf_projects(dump)] == ['A', 'B']
+
+
+def test_broken_off_next_data_falls_back_to_scripts(tmp_path):
+    # The first project is complete, the array is not; no partial list may be passed on
+    dump = tmp_path / 'dev.md'
+    dump.write_text(script({'x': {'projects': [{'title': 'A'}, {'title': 'B'}]}})
+                    + '<script id="__NEXT_DATA__" type="application/json">'
+                    '{"props":{"pageProps":{"devResult":{"projects":{"data":[{"title": "A"}, {"title": "B", "x": [')
+    assert [p['title'] for p in iter_pf_projects(dump)] == ['A', 'B']
+
+
+def test_projects_are_decoded_one_at_a_time(tmp_path, capsys):
+    # Structurally complete, so projects are streamed; the bad one ends the stream
+    dump = tmp_path / 'dev.md'
+    dump.write_text(next_data('[{"title": "A"}, {"title": B}]'))
+    projects = iter_pf_projects(dump)
+    assert next(projects)['title'] == 'A'
+    assert list(projects) == []
+    assert 'Error extracting' in capsys.readouterr().out
+
+
+def test_missing_or_empty_dump(tmp_path):
+    empty = tmp_path / 'empty.md'
+    empty.write_text('')
+    assert list(iter_pf_projects(empty)) == []
+    assert list(iter_pf_projects(tmp_path / 'missing.md')) == []
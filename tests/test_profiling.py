@@ -0,0 +1,24 @@
+import profiling
+from project_pool import ProjectPool
+
+
+def timed_task(item):
+    with profiling.stage('task'):
+        return item
+
+
+def test_pool_workers_do_not_resend_parent_records():
+    profiling.drain()
+    profiling.enable()
+    try:
+        with profiling.stage('parent'):
+            pass
+        # Two pools in a row, as the scripts run one per developer
+        for _ in range(2):
+            with ProjectPool(2, 1) as pool:
+                assert [result.value for result in pool.run(timed_task, range(4))] == [0, 1, 2, 3]
+        names = [record[0] for record in profiling.drain()]
+    finally:
+        profiling._enabled = False
+    assert names.count('parent') == 1
+    assert names.count('task') == 8
@@ -0,0 +1,73 @@
+import pytest
+
+from jsonio import SchemaError, dumps, read_json, write_json
+from records import CommunityRecord, ProjectRecord
+
+
+def test_current_schema_round_trips_byte_identical():
+    data = {
+        'projectName': {'en': 'Cove', 'ar': 'كوف'},
+        'slug': 'cove',
+        'developer': 'damac',
+        'description': {'en': 'Waterfront homes', 'ar': ''},
+        'priceMin': 1200000,
+        'bedrooms': ['1', '2'],
+        'heroImage': '/images/cove/hero.webp',
+        'galleryImages': ['/images/cove/1.webp'],
+        'amenities': [{'name': {'en': 'Pool', 'ar': 'مسبح'}}],
+        'coordinates': {'lat': 25.2, 'lng': 55.3},
+        'nearbyPlaces': [{'name': 'Mall', 'distance': '2 km'}],
+    }
+    record = ProjectRecord.from_dict(data)
+    assert dumps(record.to_dict()) == dumps(data)
+    assert record.extra == {'nearbyPlaces': data['nearbyPlaces']}
+
+
+def test_odd_shapes_are_kept_as_loaded():
+    data = {
+        'name_en': 'Cove',
+        'projectName': 'Cove',
+        'description': {'ar': 'وصف', 'en': 'Description'},
+        'images_gallery': '/images/cove/1.webp',
+        'coordinates': {'lng': 55.3, 'lat': 25.2},
+        'status': None,
+    }
+    record = ProjectRecord.from_dict(data, developer='damac', slug='cove')
+    assert dumps(record.to_dict()) == dumps(data)
+    assert set(record.extra) == {'projectName', 'description', 'images_gallery', 'coordinates'}
+    assert record.name_en == 'Cove' and record.gallery == ()
+    assert record.lat_lng == (25.2, 55.3)
+
+
+def test_community_without_optional_keys_gains_no_nulls():
+    data = {'slug': 'hills', 'name_en': 'Hills', 'images_gallery': [], 'coordinates': [25.1, 55.2]}
+    record = CommunityRecord.from_dict(data, developer='emaar')
+    assert record.to_dict() == data
+    assert list(record.to_dict()) == list(data)
+    assert record.developer == 'emaar' and record.extra is None
+
+
+def test_layout_is_shared():
+    first = ProjectRecord.from_dict({'slug': 'a', 'projectName': {'en': 'A', 'ar': ''}})
+    second = ProjectRecord.from_dict({'slug': 'b', 'projectName': {'en': 'B', 'ar': ''}})
+    assert first.layout is second.layout
+
+
+def test_filled_fields_ignores_empty_values():
+    record = ProjectRecord.from_dict({
+        'slug': 'cove',
+        'projectName': {'en': 'Cove', 'ar': ''},
+        'description': {'en': None, 'ar': None},
+        'area': {'en': '', 'ar': ''},
+        'galleryImages': [],
+        'amenities': [{'name': {'en': '', 'ar': ''}}],
+        'priceMin': 0,
+    })
+    assert record.filled_fields() == 3
+
+
+def test_schema_error_names_the_file_and_field(tmp_path):
+    path = tmp_path / 'index.json'
+    write_json(path, {'slug': 'cove', 'galleryImages': [1, 2]})
+    with pytest.raises(SchemaError, match='index.json: galleryImages'):
+        read_json(path, into=ProjectRecord.from_dict)
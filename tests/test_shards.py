@@ -0,0 +1,60 @@
+import pytest
+
+import pipeline
+from discovery import Shard, parse_shard
+from jsonio import write_cache
+from manifest import Manifest
+
+
+def test_shards_partition_every_project():
+    keys = [f"damac/project-{i}" for i in range(200)]
+    shards = [Shard(i, 3) for i in (1, 2, 3)]
+    owners = [[shard for shard in shards if shard.contains(key)] for key in keys]
+    assert all(len(owner) == 1 for owner in owners)
+    assert all(any(owner == [shard] for owner in owners) for shard in shards)
+    assert parse_shard('2/3') == (2, 3) and str(parse_shard('2/3')) == '2/3'
+
+
+def test_duplicate_goes_to_the_shard_of_its_main(monkeypatch):
+    monkeypatch.setattr(pipeline, 'duplicate_map', lambda dev: {'cove-2': 'cove-1', 'cove-1': 'cove'})
+    for shard in (Shard(1, 4), Shard(2, 4), Shard(3, 4), Shard(4, 4)):
+        select = pipeline.shard_select('damac', shard)
+        assert select('cove-2') == select('cove-1') == select('cove') == shard.contains('damac/cove')
+    assert pipeline.shard_select('damac', None) is None
+
+
+def test_partial_manifests_merge(tmp_path):
+    manifest = Manifest(tmp_path / 'manifest.json', tmp_path)
+    manifest.files = {'d/projects/a/index.json': {'sha256': 'a'}, 'd/projects/b/index.json': {'sha256': 'b'}}
+    manifest.stages = {'pipeline': {key: {'sha256': entry['sha256'], 'version': 'v', 'deps': {}}
+                                    for key, entry in manifest.files.items()}}
+    partial = manifest.extract(['d/projects/a/index.json'], ['pipeline'])
+    assert list(partial['files']) == list(partial['stages']['pipeline']) == ['d/projects/a/index.json']
+
+    reduced = Manifest(tmp_path / 'manifest.json', tmp_path)
+    reduced.merge(partial)
+    reduced.merge(manifest.extract(['d/projects/b/index.json'], ['pipeline']))
+    assert reduced.files == manifest.files and reduced.stages == manifest.stages
+
+
+def test_read_shard_manifests_wants_one_complete_set(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, 'shard_dir', lambda data_dir: tmp_path)
+
+    def write(index, count, stages=('fix',)):
+        write_cache(tmp_path / f"pipeline-{index}-of-{count}.json", {
+            'version': pipeline.SHARD_VERSION, 'shard': [index, count], 'stages': list(stages),
+        })
+
+    with pytest.raises(ValueError, match='no shard manifests'):
+        pipeline.read_shard_manifests(tmp_path)
+    write(1, 2)
+    with pytest.raises(ValueError, match='missing shards 2/2'):
+        pipeline.read_shard_manifests(tmp_path)
+    write(2, 2, ('fix', 'translate'))
+    with pytest.raises(ValueError, match='different stages'):
+        pipeline.read_shard_manifests(tmp_path)
+    write(2, 2)
+    assert len(pipeline.read_shard_manifests(tmp_path)) == 2
+    write(1, 3)
+    with pytest.raises(ValueError, match='different runs'):
+        pipeline.read_shard_manifests(tmp_path)
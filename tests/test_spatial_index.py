@@ -0,0 +1,65 @@
+import json
+
+from listing_index import shard_path
+from spatial_index import (
+    SpatialIndex, backfill_poi_distances, build_spatial_index, gazetteer_deps, unresolved_pois,
+)
+
+
+def poi(name, **fields):
+    return {'name': {'en': name, 'ar': name}, **fields}
+
+
+def test_nearest_and_bbox():
+    index = SpatialIndex()
+    index.add(25.20, 55.27, {'kind': 'landmark', 'name': 'A'})
+    index.add(25.08, 55.14, {'kind': 'landmark', 'name': 'B'})
+    index.add(25.25, 55.30, {'kind': 'project', 'name': 'C'})
+    assert [item['name'] for _, item in index.nearest(25.19, 55.26, 2)] == ['A', 'C']
+    assert [item['name'] for item in index.within_bbox(25.0, 55.0, 25.22, 55.28)] == ['A', 'B']
+    assert [item['name'] for _, item in index.nearest(25.19, 55.26, 2, kind='landmark')] == ['A', 'B']
+
+
+def test_project_depends_only_on_names_it_could_not_place():
+    index = SpatialIndex()
+    index.add(25.20, 55.27, {'kind': 'landmark', 'name': 'Dubai Mall'})
+    project = {
+        'coordinates': {'lat': 25.10, 'lng': 55.20},
+        'mapPointsOfInterest': [
+            poi('Dubai Mall'),
+            poi('Creek Tower'),
+            poi('Own Point', coordinates={'lat': 25.0, 'lng': 55.0}),
+            poi('Metro', distance={'en': '5 minutes', 'ar': '5 دقائق'}),
+        ],
+    }
+    assert backfill_poi_distances(project, index) == 2
+    recorded = unresolved_pois(project, index)
+    assert recorded == ['creek tower']
+
+    # Unrelated gazetteer changes leave the dep as recorded
+    index.add(25.0, 55.1, {'kind': 'community', 'name': 'Somewhere Else'})
+    assert gazetteer_deps(recorded, index) == recorded
+    # Once the missing name can be placed the project is revisited
+    index.add(25.2, 55.3, {'kind': 'project', 'name': 'Creek Tower'})
+    assert gazetteer_deps(recorded, index) == []
+    assert gazetteer_deps('0123abcd', index) is None
+
+    assert unresolved_pois({'mapPointsOfInterest': [poi('Creek Tower')]}, index) == []
+
+
+def test_build_reads_listing_shards_without_writing(tmp_path):
+    folder = tmp_path / 'acme' / 'projects' / 'tower'
+    folder.mkdir(parents=True)
+    (folder / 'index.json').write_text(json.dumps({
+        'projectName': {'en': 'Tower'}, 'coordinates': {'lat': 25.1, 'lng': 55.2},
+    }))
+    index = build_spatial_index(tmp_path)
+    assert index.locate('Tower') == (25.1, 55.2)
+    assert not shard_path(tmp_path, 'acme').exists()
+
+    shard_path(tmp_path, 'acme').write_text(json.dumps({'developer': 'acme', 'projects': [
+        {'slug': 'tower', 'projectName': {'en': 'Tower'}, 'coordinates': {'lat': 25.3, 'lng': 55.4}},
+    ]}))
+    before = shard_path(tmp_path, 'acme').read_bytes()
+    assert build_spatial_index(tmp_path).locate('Tower') == (25.3, 55.4)
+    assert shard_path(tmp_path, 'acme').read_bytes() == before
@@ -0,0 +1,61 @@
+import pytest
+
+import translation_memory
+from jsonio import read_json, write_json
+from translation_memory import TranslationMemory
+from translate_files import translate_fields
+
+
+@pytest.fixture
+def memory(tmp_path, monkeypatch):
+    memory = TranslationMemory(tmp_path / 'translation-memory.json')
+    monkeypatch.setattr(translation_memory, '_memory', memory)
+    return memory
+
+
+def test_human_entries_win_and_rules_are_reresolved(memory):
+    assert memory.lookup('property_type', 'Villa', lambda text: 'فيلا', rules='r1') == 'فيلا'
+    memory.entries['property_type']['villa'].update(ar='فيلا مستقلة', source='human')
+    memory.lru.clear()
+    assert memory.lookup('property_type', ' villa ', lambda text: 'x', rules='r2') == 'فيلا مستقلة'
+
+    memory.lookup('place_name', 'Creek', lambda text: 'الخور', rules='r1')
+    memory.lru.clear()
+    assert memory.lookup('place_name', 'Creek', lambda text: 'خور دبي', rules='r2') == 'خور دبي'
+
+
+def test_human_version_ignores_learned_entries(memory):
+    version = memory.human_version()
+    memory.lookup('amenity_name', 'Gym', translation_memory.keep_english)
+    memory.save()
+    assert TranslationMemory.load(memory.path).human_version() == version
+
+    memory.entries['amenity_name']['gym'].update(ar='نادي رياضي', source='human')
+    assert memory.human_version() != version
+
+
+def test_entries_are_plain_strings(memory):
+    write_json(memory.path, {'version': translation_memory.MEMORY_VERSION, 'entries': {
+        'amenity_description': {'pool': {'en': 'Pool', 'ar': {'en': 'A pool', 'ar': 'مسبح'}, 'source': 'rule'}},
+        'amenity_name': {'pool': {'en': 'Pool', 'ar': 'مسبح', 'source': 'human'}},
+    }})
+    loaded = TranslationMemory.load(memory.path)
+    assert 'pool' not in loaded.entries['amenity_description']
+    assert loaded.entries['amenity_name']['pool']['ar'] == 'مسبح'
+
+
+def test_amenity_descriptions_translated_only_where_present(memory):
+    data = {'amenities': [
+        {'name': {'en': 'Infinity Pool', 'ar': 'مسبح لا متناهي'}, 'description': {'en': '', 'ar': ''}},
+        {'name': {'en': 'Kids Play Area', 'ar': 'منطقة لعب'}},
+        'Gym',
+    ]}
+    translate_fields(data)
+    pool, play, gym = data['amenities']
+    assert pool['description']['en'].startswith('A luxurious swimming pool')
+    assert pool['description']['ar'].startswith('مسبح فاخر')
+    assert 'description' not in play and gym == 'Gym'
+
+    memory.save()
+    entries = read_json(memory.path)['entries']['amenity_description']
+    assert all(isinstance(entry['en'], str) and isinstance(entry['ar'], str) for entry in entries.values())
@@ -1,7 +1,117 @@
 #!/usr/bin/env python3
-import json
+import argparse
 import os
 import glob
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+from discovery import discover_developers
+from jsonio import read_json, write_json
+from keyword_rules import KeywordMatcher
+from listing_index import SHARD_NAME as LISTING_SHARD
+from manifest import Manifest, add_manifest_arguments
+import profiling
+from profiling import add_profile_arguments
+from project_pool import ProjectPool, add_pool_arguments
+import translation_memory
+
+DATA_DIR = "public/data"
+
+# رفع الرقم عند تغيير translate_fields لإعادة معالجة كل الملفات
+TRANSLATE_VERSION = 3
+
+# جداول قواعد التصنيف: تُطبّق أول قاعدة تظهر إحدى كلماتها في النص الإنجليزي (بالأحرف الصغيرة)
+# تُجمّع كل جدول مرة واحدة في مطابق واحد، لذا لا تزيد تكلفة الترجمة بإضافة قواعد جديدة
+AMENITY_RULES = [
+    (('pool',), {
+        'ar': "مسبح فاخر للاستجمام والترفيه مع إطلالات خلابة",
+        'en': "A luxurious swimming pool for recreation and entertainment with stunning views",
+    }),
+    (('gym', 'fitness'), {
+        'ar': "مركز لياقة بدنية مجهز بأحدث الأجهزة الرياضية",
+        'en': "A fitness center equipped with the latest sports equipment",
+    }),
+    (('play', 'kids'), {
+        'ar': "منطقة آمنة وممتعة للأطفال مزودة بألعاب ترفيهية وتعليمية",
+        'en': "A safe and fun area for children equipped with entertaining and educational games",
+    }),
+    (('spa', 'wellness'), {
+        'ar': "مركز صحي متكامل يوفر خدمات العافية والاسترخاء",
+        'en': "An integrated wellness center providing health and relaxation services",
+    }),
+    (('business',), {
+        'ar': "مركز أعمال مجهز بأحدث التقنيات لخدمة احتياجات العمل",
+        'en': "A business center equipped with the latest technologies to serve work needs",
+    }),
+]
+AMENITY_DEFAULT = {
+    'ar': "وسيلة راحة راقية توفر تجربة استثنائية للمقيمين",
+    'en': "A premium amenity providing exceptional experience for residents",
+}
+
+POI_CATEGORY_RULES = [
+    (('park',), 'حديقة'),
+    (('mall', 'shopping'), 'مركز تسوق'),
+    (('airport',), 'مطار'),
+    (('beach',), 'شاطئ'),
+    (('station',), 'محطة'),
+    (('club',), 'نادي'),
+    (('landmark',), 'معلم'),
+]
+POI_CATEGORY_DEFAULT = 'معلم'
+
+# الأنواع غير المعروفة تبقى بالاسم الإنجليزي
+PROPERTY_TYPE_RULES = [
+    (('apartment',), 'شقة'),
+    (('villa',), 'فيلا'),
+    (('townhouse',), 'تاون هاوس'),
+    (('penthouse',), 'بنتهاوس'),
+    (('duplex',), 'دوبلكس'),
+]
+
+# ترجمة أسماء الأماكن الشائعة (مطابقة تامة)
+PLACE_NAMES = {
+    'Downtown Dubai': 'وسط مدينة دبي',
+    'Dubai International Airport': 'مطار دبي الدولي',
+    'Palm Jumeirah': 'نخلة جميرا',
+    'Burj Khalifa': 'برج خليفة',
+    'Dubai Marina': 'دبي مارينا',
+    'Jumeirah Beach': 'شاطئ جميرا',
+    'Al Maktoum Airport': 'مطار آل مكتوم',
+    'Dubai Mall': 'دبي مول',
+    'Mall of the Emirates': 'مول الإمارات',
+    'Business Bay': 'الخليج التجاري'
+}
+
+AMENITY_MATCHER = KeywordMatcher(AMENITY_RULES, AMENITY_DEFAULT)
+POI_CATEGORY_MATCHER = KeywordMatcher(POI_CATEGORY_RULES, POI_CATEGORY_DEFAULT)
+PROPERTY_TYPE_MATCHER = KeywordMatcher(PROPERTY_TYPE_RULES)
+
+# نسخة الجداول أعلاه: تُعاد ترجمة مدخلات ذاكرة الترجمة الآلية عند تغييرها
+TRANSLATION_RULES = translation_memory.rules_version(
+    AMENITY_RULES, AMENITY_DEFAULT, POI_CATEGORY_RULES, POI_CATEGORY_DEFAULT, PROPERTY_TYPE_RULES, PLACE_NAMES,
+)
+
+def needs_arabic(field):
+    """الحقل بلا ترجمة عربية، أو نُسخ فيه النص الإنجليزي كما هو"""
+    return bool(field.get('en')) and (not field.get('ar') or field.get('ar') == field.get('en'))
+
+def translate(kind, text, resolve):
+    """ترجمة عبر ذاكرة الترجمة: التصحيحات اليدوية أولاً ثم جداول القواعد"""
+    return translation_memory.lookup(kind, text, resolve, TRANSLATION_RULES)
+
+def amenity_description(name):
+    return AMENITY_MATCHER.match(name.lower())
+
+def poi_category(category):
+    return POI_CATEGORY_MATCHER.match(category.lower())
+
+def place_name(name):
+    return PLACE_NAMES.get(name, name)
+
+def property_type(name):
+    return PROPERTY_TYPE_MATCHER.match(name.lower()) or name
 
 def translate_fields(data):
     """ترجمة الحقول الفارغة في البيانات"""
@@ -36,27 +146,24 @@ def translate_fields(data):
     # ترجمة amenities إذا كانت فارغة
     if 'amenities' in data:
         for amenity in data['amenities']:
+            # المرافق قد تكون نصوصًا فقط أو بدون وصف (مثل مرافق PropertyFinder)
+            if not isinstance(amenity, dict) or not isinstance(amenity.get('name'), dict):
+                continue
+            if needs_arabic(amenity['name']):
+                # أسماء المرافق المنسوخة من الإنجليزية (مثل مرافق PropertyFinder) تُستبدل بترجمتها إن وُجدت
+                arabic = translation_memory.lookup('amenity_name', amenity['name']['en'], translation_memory.keep_english)
+                if arabic != amenity['name']['en']:
+                    amenity['name']['ar'] = arabic
+            # لا يُضاف وصف للمرافق التي ليس لها وصف أصلاً
+            if not isinstance(amenity.get('description'), dict):
+                continue
             if not amenity['description'].get('ar') and amenity['name'].get('en'):
                 # ترجمة وصف المرافق بناءً على الاسم الإنجليزي
-                amenity_name = amenity['name']['en'].lower()
-                if 'pool' in amenity_name:
-                    amenity['description']['ar'] = "مسبح فاخر للاستجمام والترفيه مع إطلالات خلابة"
-                    amenity['description']['en'] = "A luxurious swimming pool for recreation and entertainment with stunning views"
-                elif 'gym' in amenity_name or 'fitness' in amenity_name:
-                    amenity['description']['ar'] = "مركز لياقة بدنية مجهز بأحدث الأجهزة الرياضية"
-                    amenity['description']['en'] = "A fitness center equipped with the latest sports equipment"
-                elif 'play' in amenity_name or 'kids' in amenity_name:
-                    amenity['description']['ar'] = "منطقة آمنة وممتعة للأطفال مزودة بألعاب ترفيهية وتعليمية"
-                    amenity['description']['en'] = "A safe and fun area for children equipped with entertaining and educational games"
-                elif 'spa' in amenity_name or 'wellness' in amenity_name:
-                    amenity['description']['ar'] = "مركز صحي متكامل يوفر خدمات العافية والاسترخاء"
-                    amenity['description']['en'] = "An integrated wellness center providing health and relaxation services"
-                elif 'business' in amenity_name:
-                    amenity['description']['ar'] = "مركز أعمال مجهز بأحدث التقنيات لخدمة احتياجات العمل"
-                    amenity['description']['en'] = "A business center equipped with the latest technologies to serve work needs"
-                else:
-                    amenity['description']['ar'] = f"وسيلة راحة راقية توفر تجربة استثنائية للمقيمين"
-                    amenity['description']['en'] = f"A premium amenity providing exceptional experience for residents"
+                # الوصف الإنجليزي من جدول القواعد، وترجمته العربية عبر ذاكرة الترجمة (نص لكل لغة)
+                description = amenity_description(amenity['name']['en'])
+                amenity['description']['ar'] = translate('amenity_description', description['en'],
+                                                         lambda text: description['ar'])
+                amenity['description']['en'] = description['en']
     
     # ترجمة mapPointsOfInterest إذا كانت فارغة
     if 'mapPointsOfInterest' in data:
@@ -65,24 +172,8 @@ def translate_fields(data):
             for poi in data['mapPointsOfInterest']:
                 if isinstance(poi, dict):
                     if 'category' in poi and isinstance(poi['category'], dict):
-                        if not poi['category'].get('ar') and poi['category'].get('en'):
-                            category_en = poi['category']['en'].lower()
-                            if 'park' in category_en:
-                                poi['category']['ar'] = 'حديقة'
-                            elif 'mall' in category_en or 'shopping' in category_en:
-                                poi['category']['ar'] = 'مركز تسوق'
-                            elif 'airport' in category_en:
-                                poi['category']['ar'] = 'مطار'
-                            elif 'beach' in category_en:
-                                poi['category']['ar'] = 'شاطئ'
-                            elif 'station' in category_en:
-                                poi['category']['ar'] = 'محطة'
-                            elif 'club' in category_en:
-                                poi['category']['ar'] = 'نادي'
-                            elif 'landmark' in category_en:
-                                poi['category']['ar'] = 'معلم'
-                            else:
-                                poi['category']['ar'] = 'معلم'
+                        if needs_arabic(poi['category']):
+                            poi['category']['ar'] = translate('poi_category', poi['category']['en'], poi_category)
                     
                     if 'distance' in poi and isinstance(poi['distance'], dict):
                         if not poi['distance'].get('ar') and poi['distance'].get('en'):
@@ -97,83 +188,93 @@ def translate_fields(data):
                                 poi['distance']['ar'] = "غير متوفر"
                     
                     if 'name' in poi and isinstance(poi['name'], dict):
-                        if not poi['name'].get('ar') and poi['name'].get('en'):
-                            name_en = poi['name']['en']
-                            # ترجمة أسماء الأماكن الشائعة
-                            translations = {
-                                'Downtown Dubai': 'وسط مدينة دبي',
-                                'Dubai International Airport': 'مطار دبي الدولي',
-                                'Palm Jumeirah': 'نخلة جميرا',
-                                'Burj Khalifa': 'برج خليفة',
-                                'Dubai Marina': 'دبي مارينا',
-                                'Jumeirah Beach': 'شاطئ جميرا',
-                                'Al Maktoum Airport': 'مطار آل مكتوم',
-                                'Dubai Mall': 'دبي مول',
-                                'Mall of the Emirates': 'مول الإمارات',
-                                'Business Bay': 'الخليج التجاري'
-                            }
-                            poi['name']['ar'] = translations.get(name_en, name_en)
+                        if needs_arabic(poi['name']):
+                            poi['name']['ar'] = translate('place_name', poi['name']['en'], place_name)
     
     # ترجمة propertyTypes إذا كانت فارغة
     if 'propertyTypes' in data:
         for prop_type in data['propertyTypes']:
-            if not prop_type.get('ar') and prop_type.get('en'):
-                type_en = prop_type['en'].lower()
-                if 'apartment' in type_en:
-                    prop_type['ar'] = 'شقة'
-                elif 'villa' in type_en:
-                    prop_type['ar'] = 'فيلا'
-                elif 'townhouse' in type_en:
-                    prop_type['ar'] = 'تاون هاوس'
-                elif 'penthouse' in type_en:
-                    prop_type['ar'] = 'بنتهاوس'
-                elif 'duplex' in type_en:
-                    prop_type['ar'] = 'دوبلكس'
-                else:
-                    prop_type['ar'] = prop_type['en']
+            if not isinstance(prop_type, dict):
+                continue
+            if needs_arabic(prop_type):
+                prop_type['ar'] = translate('property_type', prop_type['en'], property_type)
     
     return data
 
-def process_directory(directory):
-    """معالجة جميع ملفات JSON في المجلد"""
+def translate_file(file_path):
+    """ترجمة ملف JSON واحد وحفظه"""
+    profiling.set_project(os.path.basename(os.path.dirname(file_path)), os.path.basename(file_path))
+    try:
+        with profiling.stage('load'):
+            data = read_json(file_path)
+        
+        # ترجمة الحقول الفارغة
+        with profiling.stage('translate_fields'):
+            data = translate_fields(data)
+        
+        # حفظ الملف فقط إذا تغير محتواه
+        with profiling.stage('write'):
+            written = write_json(file_path, data)
+        if written:
+            print(f"✓ Updated: {os.path.basename(file_path)}")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Error processing {file_path}: {str(e)}")
+        return False
+
+def process_directory(directory, pool, manifest, full=False):
+    """معالجة جميع ملفات JSON في المجلد، مع تخطي الملفات غير المتغيرة"""
     pattern = os.path.join(directory, "*.json")
-    files = glob.glob(pattern)
+    # ملفات القوائم المولدة (listing_index.py) ليست بيانات مطور
+    files = sorted(f for f in glob.glob(pattern) if os.path.basename(f) != LISTING_SHARD)
     
-    print(f"Processing {len(files)} files in {directory}")
+    skipped = 0
+    # التصحيحات اليدوية في ذاكرة الترجمة تعيد معالجة الملفات
+    deps = {'translation_memory': translation_memory.get().human_version()}
+    if not full:
+        pending = [f for f in files if not manifest.is_current('translate', f, TRANSLATE_VERSION, deps)]
+        skipped = len(files) - len(pending)
+        files = pending
     
-    for file_path in files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # ترجمة الحقول الفارغة
-            data = translate_fields(data)
-            
-            # حفظ الملف المحدث
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            print(f"✓ Updated: {os.path.basename(file_path)}")
-            
-        except Exception as e:
-            print(f"✗ Error processing {file_path}: {str(e)}")
+    print(f"Processing {len(files)} files in {directory} (skipped {skipped} unchanged)")
+    
+    for result in pool.run(translate_file, files):
+        if result.value:
+            manifest.record('translate', result.item, TRANSLATE_VERSION, deps)
+    return skipped
 
 def main():
     """الدالة الرئيسية"""
-    directories = [
-        "public/data/damas",
-        "public/data/emaar", 
-        "public/data/nakheel",
-        "public/data/sobha"
-    ]
-    
-    for directory in directories:
-        if os.path.exists(directory):
-            process_directory(directory)
-        else:
-            print(f"Directory not found: {directory}")
-    
-    print("\nTranslation completed!")
+    parser = argparse.ArgumentParser(description='Fill in missing Arabic/English fields')
+    add_pool_arguments(parser)
+    add_manifest_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args)
+    
+    manifest = Manifest.load(DATA_DIR, args.manifest)
+    # تحميل ذاكرة الترجمة قبل إنشاء العمليات لتشاركها
+    translation_memory.load()
+    
+    # كل مجلد مطور تحت public/data
+    directories = [os.path.join(DATA_DIR, dev) for dev in discover_developers(DATA_DIR)]
+    
+    total_skipped = 0
+    with ProjectPool(args.workers, args.chunksize) as pool:
+        for directory in directories:
+            if os.path.exists(directory):
+                total_skipped += process_directory(directory, pool, manifest, args.full)
+            else:
+                print(f"Directory not found: {directory}")
+    
+    manifest.save()
+    translation_memory.save()
+    
+    print(f"\nTranslation completed! Skipped (unchanged): {total_skipped}")
+    print(translation_memory.summary())
+    
+    profiling.finish(args)
 
 if __name__ == "__main__":
     main()